@@ -1,5 +1,61 @@
 import re
-from typing import List
+from typing import Any, Dict, Iterable, List
+
+try:
+    from ai.keywords import has_keyword
+except ImportError:  # loaded by file path from ai/predict.py or ai/train_model.py
+    from keywords import has_keyword
+
+
+_WORD_RE = re.compile(r"\w+")
+# Scene headings: capture full heading after INT./EXT.
+_SCENE_HEADING_RE = re.compile(r"^\s*(INT\.|EXT\.)\s*(.+)$", flags=re.IGNORECASE)
+_NON_DIALOGUE_CHAR_RE = re.compile(r"[^A-Z0-9 ]")
+# Scene breakdown headings that came from a script line (rather than "Opening" / "Scene N").
+_SOURCE_HEADING_RE = re.compile(r"^\s*(INT|EXT)", flags=re.IGNORECASE)
+
+
+def _is_dialogue_line(ln: str) -> bool:
+    # Mostly uppercase and short (common format for character names), but not a scene heading.
+    return (
+        len(ln) <= 40
+        and not _NON_DIALOGUE_CHAR_RE.search(ln.upper())
+        and any(c.isalpha() for c in ln)
+        and not _SCENE_HEADING_RE.match(ln)
+    )
+
+
+def _is_dialogue_candidate(ln: str) -> bool:
+    # To avoid counting dialogue as action, uppercase short lines never count as action lines.
+    return len(ln) <= 40 and ln == ln.upper() and any(c.isalpha() for c in ln) and not _SCENE_HEADING_RE.match(ln)
+
+
+def _is_action_line(ln: str) -> bool:
+    # Action lines: presence of action keywords (ai.keywords.ACTION_WORDS), excluding dialogue lines
+    return has_keyword(ln, "action") and not _is_dialogue_candidate(ln)
+
+
+def _line_features(lines: Iterable[str], scene_headings: List[str]) -> List[int]:
+    action_lines = 0
+    dialogue_lines = 0
+    for ln in lines:
+        m = _SCENE_HEADING_RE.match(ln)
+        if m:
+            # store normalized heading text (uppercase)
+            scene_headings.append(m.group(2).strip().upper())
+        if _is_dialogue_line(ln):
+            dialogue_lines += 1
+        if _is_action_line(ln):
+            action_lines += 1
+    return [action_lines, dialogue_lines]
+
+
+def count_action_lines(description: str, content: Iterable[str]) -> int:
+    """Action lines among a scene's ``content`` lines (``description`` is their joined text)."""
+    # The keyword scan of the whole scene is much cheaper than classifying every line.
+    if not has_keyword(description, "action"):
+        return 0
+    return sum(1 for ln in content if _is_action_line(ln))
 
 
 def extract_features_from_text(text: str) -> List[float]:
@@ -18,53 +74,43 @@ def extract_features_from_text(text: str) -> List[float]:
         return [0.0, 0, 0, 0, 0]
 
     # Normalize word count
-    words = re.findall(r"\w+", text)
-    total_words = len(words)
-    normalized_words = total_words / 100.0
+    normalized_words = len(_WORD_RE.findall(text)) / 100.0
 
-    # Split into non-empty lines
     lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+    scene_headings: List[str] = []
+    action_lines, dialogue_lines = _line_features(lines, scene_headings)
+    unique_scenes = len(set(scene_headings))
+    return [normalized_words, unique_scenes, action_lines, dialogue_lines, unique_scenes]
 
-    # Scene headings: capture full heading after INT./EXT.
-    scene_heading_pattern = re.compile(r"^\s*(INT\.|EXT\.)\s*(.+)$", flags=re.IGNORECASE)
-    scene_headings = []
-    for ln in lines:
-        m = scene_heading_pattern.match(ln)
-        if m:
-            # store normalized heading text (uppercase)
-            scene_headings.append(m.group(2).strip().upper())
 
-    unique_scenes = len(set(scene_headings))
-    unique_locations = len(set(scene_headings))
+def extract_features_from_scenes(scenes: List[Dict[str, Any]]) -> List[float]:
+    """Same vector as :func:`extract_features_from_text`, from an already parsed scene breakdown.
 
-    # Dialogue detection: lines that are mostly uppercase and short (common format for character names)
-    dialogue_lines = 0
-    for ln in lines:
-        # Remove punctuation for the test
-        token = re.sub(r"[^A-Z0-9 ]", "", ln.upper())
-        # Consider a dialogue heading if it's all uppercase and relatively short
-        if token and token == ln.upper() and len(ln) <= 40 and any(c.isalpha() for c in ln):
-            # But ensure this line isn't a scene heading like INT. or EXT.
-            if not scene_heading_pattern.match(ln):
-                dialogue_lines += 1
-
-    # Action lines: presence of action keywords, excluding dialogue lines
-    action_keywords = [r"\bRUN\b", r"\bFIGHT\b", r"\bEXPLOSION\b", r"\bCHASE\b", r"\bSHOOT\b", r"\bKILL\b"]
-    action_re = re.compile("|".join(action_keywords), flags=re.IGNORECASE)
-    action_lines = 0
-    # To avoid counting dialogue as action, skip lines detected as dialogue headings
-    dialogue_candidates = set()
-    for ln in lines:
-        if ln and ln == ln.upper() and len(ln) <= 40 and any(c.isalpha() for c in ln) and not scene_heading_pattern.match(ln):
-            dialogue_candidates.add(ln)
+    ``scenes`` are the dicts produced by ``app.ai_integration.naive_scene_breakdown``:
+    word counts are reused, and only heading lines plus the content lines of
+    scenes whose text has an action keyword at all are looked at again.
+    """
+    if not scenes:
+        return [0.0, 0, 0, 0, 0]
 
-    for ln in lines:
-        if ln in dialogue_candidates:
-            continue
-        if action_re.search(ln):
-            action_lines += 1
+    total_words = 0
+    scene_headings: List[str] = []
+    action_lines = 0
+    dialogue_lines = 0
+    for scene in scenes:
+        total_words += scene.get("word_count", 0)
+        heading = scene.get("heading") or ""
+        if _SOURCE_HEADING_RE.match(heading):
+            total_words += len(_WORD_RE.findall(heading))
+            action, dialogue = _line_features([heading], scene_headings)
+            action_lines += action
+            dialogue_lines += dialogue
+        content = scene.get("content", [])
+        dialogue_lines += sum(1 for ln in content if _is_dialogue_line(ln))
+        action_lines += count_action_lines(scene.get("description", ""), content)
 
-    return [normalized_words, unique_scenes, action_lines, dialogue_lines, unique_locations]
+    unique_scenes = len(set(scene_headings))
+    return [total_words / 100.0, unique_scenes, action_lines, dialogue_lines, unique_scenes]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,182 @@
+"""Whole-word keyword lexicons and a shared multi-pattern matcher.
+
+Every lexicon (scene tone, sentiment weights, genre hints, action words) is
+compiled into one word-level Aho-Corasick automaton. Text is lower-cased and
+split into ``\\w+`` tokens once; when every term is a single word each token
+is resolved with one dictionary lookup, otherwise the automaton is walked
+token by token so multi-word phrases match too. Either way a pass costs the
+same however many terms the lexicons hold. Matching is on whole words:
+"run" does not fire inside "brunch", nor "gun" inside "begun".
+"""
+from __future__ import annotations
+
+import re
+from collections import Counter, defaultdict, deque
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+
+TONE_WORDS: Dict[str, Tuple[str, ...]] = {
+    "action": ("explosion", "explosions", "chase", "chases", "fight", "fights", "gun", "guns", "run", "runs", "running"),
+    "romance": ("kiss", "kisses", "love", "loves", "romantic", "heart"),
+    "drama": ("cry", "cries", "crying", "tear", "tears", "argue", "argues", "scream", "screams"),
+    "comedy": ("laugh", "laughs", "laughing", "joke", "jokes", "funny", "smile", "smiles"),
+    "thriller": ("mystery", "dark", "shadow", "shadows", "whisper", "whispers"),
+}
+POSITIVE_WEIGHTS: Dict[str, float] = {
+    "hope": 1.2,
+    "laugh": 1.1,
+    "love": 1.5,
+    "joy": 1.0,
+    "win": 1.3,
+    "success": 1.4,
+}
+NEGATIVE_WEIGHTS: Dict[str, float] = {
+    "fear": 1.2,
+    "cry": 1.1,
+    "death": 1.5,
+    "lose": 1.3,
+    "dark": 1.0,
+    "anger": 1.4,
+}
+# Whole-word forms scored with their stem's weight, so "loved" and "darkness" still count.
+SENTIMENT_FORMS: Dict[str, Tuple[str, ...]] = {
+    "hope": ("hope", "hopes", "hoped", "hoping", "hopeful", "hopefully"),
+    "laugh": ("laugh", "laughs", "laughed", "laughing", "laughter"),
+    "love": ("love", "loves", "loved", "lovely", "lover", "lovers"),
+    "joy": ("joy", "joys", "joyful", "joyous"),
+    "win": ("win", "wins", "winning", "winner", "winners"),
+    "success": ("success", "successes", "successful", "successfully"),
+    "fear": ("fear", "fears", "feared", "fearing", "fearful"),
+    "cry": ("cry", "cries", "cried", "crying"),
+    "death": ("death", "deaths", "deathly"),
+    "lose": ("lose", "loses", "losing", "loser", "losers"),
+    "dark": ("dark", "darker", "darkest", "darken", "darkened", "darkness"),
+    "anger": ("anger", "angered", "angers"),
+}
+# Checked in this order; the first genre with a hit wins.
+GENRE_WORDS: Dict[str, Tuple[str, ...]] = {
+    "action": ("explosion", "explosions", "chase", "chases", "chased", "gun", "guns", "gunfire", "gunshot", "gunshots"),
+    "romance": ("romance", "romances", "kiss", "kisses", "kissed", "kissing", "wedding", "weddings"),
+    "thriller": ("mystery", "detective", "detectives", "shadow", "shadows", "shadowy"),
+    "comedy": ("laugh", "laughs", "laughed", "laughing", "laughter", "funny", "joke", "jokes", "joked", "joker"),
+}
+ACTION_WORDS: Tuple[str, ...] = ("run", "fight", "explosion", "chase", "shoot", "kill")
+
+_WORD = re.compile(r"\w+")
+# For ASCII text: lower-case letters, keep digits and "_", turn everything else into a space.
+_TOKEN_TABLE = bytes(
+    ord(chr(code).lower()) if chr(code).isalnum() or chr(code) == "_" else ord(" ") for code in range(128)
+) + b" " * 128
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased ``\\w+`` words of ``text``."""
+    if text.isascii():
+        return text.encode("ascii").translate(_TOKEN_TABLE).decode("ascii").split()
+    return _WORD.findall(text.lower())
+
+
+class KeywordAutomaton:
+    """Count hits for ``{lexicon: {label: terms}}`` in a single pass over the text's words."""
+
+    def __init__(self, lexicons: Mapping[str, Mapping[str, Iterable[str]]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._outputs: List[List[Tuple[str, str]]] = [[]]
+        self._has_phrases = False
+        for lexicon, labels in lexicons.items():
+            for label, terms in labels.items():
+                for term in terms:
+                    self._add(tokenize(term), (lexicon, label))
+        self._fail = self._link()
+        # Outputs of one-word states, for the phrase-free fast path.
+        self._words = {
+            word: tuple(self._outputs[state]) for word, state in self._goto[0].items() if self._outputs[state]
+        }
+
+    def _add(self, words: List[str], output: Tuple[str, str]) -> None:
+        if not words:
+            raise ValueError("keyword terms must contain at least one word")
+        self._has_phrases = self._has_phrases or len(words) > 1
+        state = 0
+        for word in words:
+            following = self._goto[state].get(word)
+            if following is None:
+                following = len(self._goto)
+                self._goto[state][word] = following
+                self._goto.append({})
+                self._outputs.append([])
+            state = following
+        if output not in self._outputs[state]:
+            self._outputs[state].append(output)
+
+    def _link(self) -> List[int]:
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, following in self._goto[state].items():
+                queue.append(following)
+                fallback = fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = fail[fallback]
+                target = self._goto[fallback].get(word, 0)
+                fail[following] = target if target != following else 0
+                # A phrase ending here also ends every shorter term that is its suffix.
+                self._outputs[following] = self._outputs[following] + self._outputs[fail[following]]
+        return fail
+
+    def count(self, text: str) -> Dict[str, Counter]:
+        """``{lexicon: Counter(label -> hits)}``; a lexicon without hits reads as an empty Counter."""
+        hits: Dict[str, Counter] = defaultdict(Counter)
+        tokens = tokenize(text)
+        if not self._has_phrases:
+            # Every step (lookup, filter, flatten, tally) runs in C; no Python code per token.
+            found = Counter(chain.from_iterable(filter(None, map(self._words.get, tokens))))
+            for (lexicon, label), occurrences in found.items():
+                hits[lexicon][label] = occurrences
+            return hits
+
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for token in tokens:
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for lexicon, label in outputs[state]:
+                hits[lexicon][label] += 1
+        return hits
+
+    def contains(self, text: str, lexicon: str) -> bool:
+        """Whether any term of ``lexicon`` occurs in ``text``."""
+        if self._has_phrases:
+            return bool(self.count(text)[lexicon])
+        return any(
+            found == lexicon
+            for found, _ in chain.from_iterable(filter(None, map(self._words.get, tokenize(text))))
+        )
+
+
+@lru_cache(maxsize=1)
+def default_automaton() -> KeywordAutomaton:
+    """All of the built-in lexicons compiled together."""
+    return KeywordAutomaton(
+        {
+            "tone": TONE_WORDS,
+            "positive": {word: SENTIMENT_FORMS.get(word, (word,)) for word in POSITIVE_WEIGHTS},
+            "negative": {word: SENTIMENT_FORMS.get(word, (word,)) for word in NEGATIVE_WEIGHTS},
+            "genre": GENRE_WORDS,
+            "action": {"action": ACTION_WORDS},
+        }
+    )
+
+
+def keyword_hits(text: str) -> Dict[str, Counter]:
+    """Hit counts for every built-in lexicon from one pass over ``text``."""
+    return default_automaton().count(text)
+
+
+def has_keyword(text: str, lexicon: str) -> bool:
+    """Whether ``text`` contains any term of the built-in ``lexicon``."""
+    return default_automaton().contains(text, lexicon)
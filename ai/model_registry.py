@@ -0,0 +1,186 @@
+"""Process-wide registry of the pickled models under ``ai/models``.
+
+Every caller used to ``joblib.load`` its model on each analysis, request or
+prediction. ``get_registry().get(path)`` loads a model once per process and
+hands out the same ``LoadedModel`` until the file changes:
+
+* each lookup is a ``stat``; only when the modification time or size moved
+  is the file hashed, and only a new SHA-256 loads it again (a touched but
+  identical file keeps the loaded model);
+* a reload builds the new ``LoadedModel`` completely before it replaces the
+  old one in a single dict assignment, so callers get either the old or the
+  new model, never a partial one, and a caller holding the old one keeps
+  using it safely;
+* a file that fails to load (e.g. caught mid-write) leaves the previous
+  model in service and is not retried until it changes again; ``save_model``
+  writes through a temporary file and ``os.replace`` to avoid that;
+* models are loaded with joblib's ``mmap_mode`` (``MODEL_MMAP_MODE``,
+  default ``r``), so plain NumPy arrays in an uncompressed dump map the
+  file read-only and their pages are shared by every process that loads
+  it. Estimators that copy their arrays on unpickling (scikit-learn's tree
+  nodes do) still get a private copy per process, loaded once.
+
+A model's ``version`` is the start of its SHA-256; ``stats()`` lists the
+loaded models with versions and load times for ``/metrics``.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import joblib
+
+
+MODELS_DIR = Path(__file__).resolve().parent / "models"
+DEFAULT_MMAP_MODE = "r"
+
+
+def mmap_mode() -> Optional[str]:
+    """joblib ``mmap_mode`` for model files; an empty ``MODEL_MMAP_MODE`` loads them into memory."""
+    return os.getenv("MODEL_MMAP_MODE", DEFAULT_MMAP_MODE) or None
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    path: Path
+    model: Any
+    sha256: str
+    mtime_ns: int
+    size: int
+    loaded_at: datetime
+    load_seconds: float
+
+    @property
+    def version(self) -> str:
+        return self.sha256[:12]
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "name": self.path.name,
+            "type": type(self.model).__name__,
+            "version": self.version,
+            "sha256": self.sha256,
+            "loaded_at": self.loaded_at.isoformat(),
+            "load_seconds": round(self.load_seconds, 4),
+        }
+
+
+class ModelRegistry:
+    def __init__(self, mmap_mode: Optional[str] = DEFAULT_MMAP_MODE):
+        self.mmap_mode = mmap_mode
+        self._entries: Dict[Path, LoadedModel] = {}
+        # (mtime, size) of files that failed to load, so they are not retried until they change
+        self._failed: Dict[Path, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.reloads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    def get(self, path) -> LoadedModel:
+        """The model stored at ``path``, loading it when it is new or its content changed.
+
+        Raises when the file is missing or has never loaded successfully.
+        """
+        path = Path(path).resolve()
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        entry = self._entries.get(path)
+        if entry is not None and (entry.mtime_ns, entry.size) == signature:
+            return entry
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and (entry.mtime_ns, entry.size) == signature:
+                return entry
+            if self._failed.get(path) == signature:
+                if entry is None:
+                    raise RuntimeError(f"Model {path.name} failed to load: {self.last_error}")
+                return entry
+            digest = file_sha256(path)
+            if entry is not None and entry.sha256 == digest:
+                entry = replace(entry, mtime_ns=signature[0], size=signature[1])
+            else:
+                try:
+                    entry = self._load(path, digest, signature)
+                except Exception as exc:
+                    self.failures += 1
+                    self.last_error = f"{path.name}: {exc}"
+                    self._failed[path] = signature
+                    if entry is None:
+                        raise
+                    return entry
+            self._failed.pop(path, None)
+            self._entries[path] = entry
+            return entry
+
+    def _load(self, path: Path, digest: str, signature: Tuple[int, int]) -> LoadedModel:
+        started = time.perf_counter()
+        model = joblib.load(path, mmap_mode=self.mmap_mode)
+        elapsed = time.perf_counter() - started
+        if path in self._entries:
+            self.reloads += 1
+        self.loads += 1
+        return LoadedModel(
+            path=path,
+            model=model,
+            sha256=digest,
+            mtime_ns=signature[0],
+            size=signature[1],
+            loaded_at=datetime.utcnow(),
+            load_seconds=elapsed,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "models": [entry.info() for entry in list(self._entries.values())],
+            "mmap_mode": self.mmap_mode,
+            "loads": self.loads,
+            "reloads": self.reloads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+_default_registry: Optional[ModelRegistry] = None
+_default_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    """Return the process-wide registry configured from the environment."""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = ModelRegistry(mmap_mode=mmap_mode())
+        return _default_registry
+
+
+def load_model(path) -> Any:
+    return get_registry().get(path).model
+
+
+def save_model(model: Any, path) -> Path:
+    """Dump ``model`` uncompressed (so it can be memory-mapped) and swap it in atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def ensure_dirs() -> None:
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
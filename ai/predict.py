@@ -1,5 +1,4 @@
 from pathlib import Path
-import joblib
 import re
 from typing import Tuple
 import pandas as pd
@@ -32,6 +31,24 @@ def _load_features():
 extract_features_from_text = _load_features()
 
 
+def _load_registry():
+    try:
+        from .model_registry import get_registry as _get
+        return _get
+    except Exception:
+        # fallback: load model_registry.py from the same directory
+        fp = _P(__file__).resolve().parent / "model_registry.py"
+        spec = _il.spec_from_file_location("ai_model_registry", str(fp))
+        if spec is None or spec.loader is None:
+            raise ImportError("Could not load model_registry.py")
+        mod = _il.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        return mod.get_registry
+
+
+get_registry = _load_registry()
+
+
 MODEL_FILE = Path(__file__).resolve().parent / "ai_model.pkl"
 
 
@@ -39,7 +56,7 @@ def load_model(model_path: Path = None):
     mp = Path(model_path) if model_path else MODEL_FILE
     if not mp.exists():
         raise FileNotFoundError(f"Model file not found at {mp}")
-    return joblib.load(mp)
+    return get_registry().get(mp).model
 
 
 def extract_text_from_pdf(path: str) -> str:
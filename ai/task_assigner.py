@@ -3,7 +3,8 @@ from typing import Dict, Any, List
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier
-from .utils import MODELS_DIR, save_model, load_model, ensure_dirs
+from .keywords import has_keyword
+from .model_registry import MODELS_DIR, ensure_dirs, load_model, save_model
 
 
 MODEL_PATH = MODELS_DIR / 'task_assigner.pkl'
@@ -51,15 +52,21 @@ def train_task_assigner(force: bool = False) -> Path:
 def assign_tasks_from_breakdown(breakdown: Dict[str, Any], crew_list: List[Dict[str, Any]], model_path: str = None) -> List[Dict[str, Any]]:
     mp = Path(model_path) if model_path else MODEL_PATH
     m = load_model(mp)
-    assignments = []
     scenes = breakdown.get('scenes', [])
-    for i, s in enumerate(scenes):
-        scene_length = len(s.get('content', []))
-        action_density = sum(1 for ln in s.get('content', []) if any(w in ln.upper() for w in ('CHASE','EXPLOSION','RUN','FIGHT'))) / max(1, scene_length)
-        num_chars = len(breakdown.get('characters', []))
-        X = pd.DataFrame([{'scene_length': scene_length, 'action_density': action_density, 'num_chars': num_chars}])
-        role_id = int(m.predict(X)[0])
-        role = {0: 'VFX Lead', 1: 'Audio Lead', 2: 'Editor', 3: 'Grip'}.get(role_id, 'General')
+    if not len(scenes):
+        return []
+    num_chars = len(breakdown.get('characters', []))
+    rows = []
+    for s in scenes:
+        content = s.get('content', [])
+        scene_length = len(content)
+        action_density = sum(1 for ln in content if has_keyword(ln, 'action')) / max(1, scene_length)
+        rows.append({'scene_length': scene_length, 'action_density': action_density, 'num_chars': num_chars})
+    # one predict call for every scene
+    role_ids = m.predict(pd.DataFrame(rows))
+    assignments = []
+    for i, role_id in enumerate(role_ids):
+        role = {0: 'VFX Lead', 1: 'Audio Lead', 2: 'Editor', 3: 'Grip'}.get(int(role_id), 'General')
         # simple round-robin assignment
         crew_member = crew_list[i % max(1, len(crew_list))]
         assignments.append({'scene_index': i, 'role': role, 'assigned_to': crew_member.get('crew_id')})
@@ -1,19 +1,22 @@
-from collections import Counter
+from array import array
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
-from zipfile import ZipFile
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import json
+import os
 import re
+import time
+from concurrent.futures.process import BrokenProcessPool
 from xml.etree import ElementTree
 
-import joblib
-
 try:
-    from ai.features import extract_features_from_text
+    from ai.features import extract_features_from_scenes
 except Exception:  # pragma: no cover - optional dependency fallback
-    def extract_features_from_text(text: str):  # type: ignore
+    def extract_features_from_scenes(scenes):  # type: ignore
         return [0.0, 0, 0, 0, 0]
 
 
@@ -29,22 +32,22 @@ try:
 except Exception:  # pragma: no cover - optional dependency fallback
     assign_tasks_from_breakdown = None
 
+from ai import keywords
+from ai.model_registry import LoadedModel, get_registry
 from app.crud import crud
-
-try:
-    import pdfplumber
-except Exception:  # pragma: no cover - optional dependency at runtime
-    pdfplumber = None
-
-try:
-    from PyPDF2 import PdfReader
-except Exception:  # pragma: no cover - fallback if PyPDF2 unavailable
-    PdfReader = None
-
-try:
-    from pdfminer.high_level import extract_text as pdfminer_extract_text
-except Exception:  # pragma: no cover - optional dependency at runtime
-    pdfminer_extract_text = None
+from app.crud.bulk import AnalysisWriter
+from app.services import (
+    budget_inference,
+    character_registry,
+    docx_extraction,
+    pdf_extraction,
+    scene_diff,
+    screenplay_formats,
+    text_normalisation,
+    worker_pool,
+)
+from app.services.extraction_cache import ExtractionCache, file_sha256, get_extraction_cache
+from app.services.scene_table import SceneTable
 
 MODEL_PATH = Path(__file__).resolve().parents[1] / 'ai' / 'models' / 'budget_model.pkl'
 DATASET_PATH = Path(__file__).resolve().parents[1] / 'ai' / 'dummy_dataset.csv'
@@ -56,14 +59,45 @@ SCENE_HEADING_PATTERN = re.compile(
     r"^\s*(INT(?:/EXT)?|EXT(?:/INT)?)(?:\.|\s|:|-)+\s*(.*)$",
     flags=re.IGNORECASE,
 )
+_HEADING_PREFIX_PATTERN = re.compile(r"^\s*(INT(?:/EXT)?|EXT(?:/INT)?)(?:\.|\s|:)+\s*", flags=re.IGNORECASE)
+_HEADING_SEPARATOR_PATTERN = re.compile(r"\s*[-–—]\s*")
+_HEADING_TAIL_PATTERN = re.compile(r"\b([A-Z ]{3,})$")
 
 
 class ScriptExtractionError(RuntimeError):
     """Raised when the uploaded script cannot be converted into readable text."""
 
 
-_NON_ASCII_PATTERN = re.compile(r"[^\x09\x0A\x0D\x20-\x7E]+")
-_MULTISPACE_PATTERN = re.compile(r"[ \t]+")
+# Bump whenever extraction or cleaning changes so cached results are invalidated.
+EXTRACTOR_VERSION = "4"
+# A page of screenplay carries well over this many characters once extracted.
+MIN_CHARS_PER_PAGE = 400
+# From this many scenes on, plain-text breakdowns finalise scenes on the worker pool.
+DEFAULT_PARALLEL_MIN_SCENES = 2000
+# Smallest batch (in script lines) shipped to a worker, so pickling stays small next to the work.
+PARALLEL_MIN_BATCH_LINES = 4000
+
+
+@dataclass
+class ExtractionResult:
+    text: str
+    extractor: str
+    score: int
+    attempts: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class SourceProgress:
+    """How far a chunk stream has read into its script: characters, or pages for a PDF page stream."""
+    done: int = 0
+    total: Optional[int] = None
+
+    def fraction(self) -> Optional[float]:
+        if not self.total:
+            return None
+        return min(1.0, self.done / self.total)
+
+
 TIME_OF_DAY_KEYWORDS = {
     "DAY",
     "NIGHT",
@@ -80,33 +114,51 @@ TIME_OF_DAY_KEYWORDS = {
 }
 
 
+# The line boundaries str.splitlines() uses; "\r\n" counts as one.
+_LINE_PATTERN = re.compile(r"([^\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]*)(?:\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029])")
+
+
+def _iter_text_lines(text: str) -> Iterator[str]:
+    """Lazy ``text.splitlines()``."""
+    end = 0
+    for match in _LINE_PATTERN.finditer(text):
+        end = match.end()
+        yield match.group(1)
+    if end < len(text):
+        yield text[end:]
+
+
 def _clean_script_text(text: str) -> str:
-    if not text:
-        return ""
+    return text_normalisation.normalise(text)
 
-    normalised = text.replace("\ufeff", "").replace("\r\n", "\n").replace("\r", "\n")
-    # Remove form-feed and other page break markers
-    normalised = normalised.replace("\x0c", "\n")
-    # Drop non-ascii noise and control sequences (keep whitespace and printable)
-    normalised = _NON_ASCII_PATTERN.sub(" ", normalised)
-    # Collapse excessive spaces per line
-    normalised = "\n".join(
-        _MULTISPACE_PATTERN.sub(" ", line).strip()
-        for line in normalised.splitlines()
-    )
-    # Remove blank sequences
-    normalised = re.sub(r"\n{3,}", "\n\n", normalised)
-    return normalised.strip()
+
+def _iter_clean_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Streaming counterpart of ``_clean_script_text`` working one chunk (page) at a time.
+
+    Yields the same non-blank lines in the same order; only runs of blank
+    lines, which scene detection ignores, are not collapsed.
+    """
+    started = False
+    for chunk in chunks:
+        for line in text_normalisation.iter_normalised_lines(chunk):
+            if not started:
+                # leading blank lines are stripped from cleaned text as well
+                if not line:
+                    continue
+                started = True
+            yield line
 
 
-def _is_meaningful(text: str) -> bool:
+def _is_meaningful(text: str, stats: Optional[text_normalisation.TextStats] = None) -> bool:
     sample = text.strip()
     if not sample:
         return False
 
     fragment = sample[:2000]
-    letters = sum(1 for ch in fragment if ch.isalpha())
-    control = sum(1 for ch in fragment if ord(ch) < 9)
+    if stats is None or len(fragment) != stats.length:
+        stats = text_normalisation.measure(fragment)
+    letters = stats.letters
+    control = stats.controls
 
     if len(fragment) < 120:
         return letters >= max(8, len(fragment) // 5) and control == 0
@@ -114,100 +166,158 @@ def _is_meaningful(text: str) -> bool:
     return letters > 30 and control < max(1, letters // 3)
 
 
-def _score_pdf_text(text: str) -> int:
-    upper = text.upper()
-    letters = sum(1 for ch in text if ch.isalpha())
-    spaces = text.count(" ")
-    newlines = text.count("\n")
-    headings = sum(1 for marker in ("INT", "EXT", "SCENE", "FADE") if marker in upper)
-    penalties = text.count("\ufffd") * 10
-    return letters + spaces * 2 + newlines * 3 + headings * 50 - penalties
+def _score_pdf_text(text: str, stats: Optional[text_normalisation.TextStats] = None) -> int:
+    stats = stats or text_normalisation.measure(text)
+    headings = text_normalisation.heading_markers(text)
+    penalties = stats.replacements * 10
+    return stats.letters + stats.spaces * 2 + stats.newlines * 3 + headings * 50 - penalties
 
 
-def _extract_text_from_pdf(path: Path) -> str:
-    # Prefer pdfplumber for higher-fidelity extraction, then PyPDF2, then pdfminer
-    candidates: List[str] = []
+def _pdf_text_quality(text: str, page_count: int, stats: Optional[text_normalisation.TextStats] = None) -> float:
+    """Score cleaned text in ``[0, 1]``: share of prose characters times page coverage.
 
-    def consider(candidate: str | None):
-        raw = (candidate or "").strip()
-        if not raw:
-            return
-        text = _clean_script_text(raw)
-        if text and _is_meaningful(text):
-            candidates.append(text)
+    Coverage is unknown without a page count, so the score is 0 and nothing is accepted early.
+    """
+    if not text or page_count <= 0:
+        return 0.0
+    stats = stats or text_normalisation.measure(text)
+    density = stats.prose / len(text)
+    coverage = min(1.0, len(text) / (page_count * MIN_CHARS_PER_PAGE))
+    return round(density * coverage, 3)
 
-    if pdfplumber is not None:
-        try:
-            with pdfplumber.open(str(path)) as pdf:
-                chunks: List[str] = []
-                for page in pdf.pages:
-                    chunk = page.extract_text() or ""
-                    if not chunk:
-                        # retry with looser tolerances
-                        chunk = page.extract_text(x_tolerance=2, y_tolerance=2) or ""
-                    chunks.append(chunk)
-                consider("\n".join(filter(None, chunks)))
-        except Exception:
-            pass
-    if PdfReader is not None:
-        try:
-            reader = PdfReader(str(path))
-            pieces = [page.extract_text() or "" for page in reader.pages]
-            consider("\n".join(filter(None, pieces)))
-        except Exception:
-            pass
-    if pdfminer_extract_text is not None:
-        try:
-            consider(pdfminer_extract_text(str(path)))
-        except Exception:
-            pass
 
-    # Final lightweight fallback: parse plain text segments from PDF content streams
-    try:
-        raw = path.read_bytes()
-    except Exception:
-        return ""
+def _extract_pdf(path: Path) -> ExtractionResult:
+    """Run the extractor cascade, stopping at the first candidate that is good enough.
 
-    text_chunks: List[str] = []
-    for match in re.finditer(rb"\((.*?)\)\s*T[Jj]", raw, re.DOTALL):
-        content = match.group(1)
-        content = content.replace(b"\\(", b"(").replace(b"\\)", b")").replace(b"\\\\", b"\\")
-        try:
-            decoded = content.decode("utf-8")
-        except UnicodeDecodeError:
-            decoded = content.decode("latin-1", errors="ignore")
-        if decoded.strip():
-            text_chunks.append(decoded)
+    The order comes from a cheap pre-scan of the file; every extractor runs
+    under the configured wall-clock budget. If no candidate clears the quality
+    threshold, the highest ``_score_pdf_text`` candidate wins as before.
+    """
+    budget, threshold, fast_first_pages = pdf_extraction.extraction_settings()
+    prescan = pdf_extraction.prescan_pdf(path)
+    candidates: List[Tuple[str, str, text_normalisation.TextStats]] = []
+    attempts: List[Dict[str, Any]] = []
 
-    fallback_text = "\n".join(text_chunks)
-    consider(fallback_text)
+    for name in pdf_extraction.plan_extractor_order(prescan, fast_first_pages):
+        started = time.perf_counter()
+        status = "rejected"
+        quality = 0.0
+        try:
+            raw = pdf_extraction.run_extractor(name, str(path), prescan, budget).strip()
+        except pdf_extraction.ExtractorTimeout:
+            raw, status = "", "timeout"
+        except Exception:
+            raw, status = "", "error"
+        text, stats = text_normalisation.normalise_and_measure(raw)
+        if text and _is_meaningful(text, stats):
+            candidates.append((name, text, stats))
+            quality = _pdf_text_quality(text, prescan.page_count, stats)
+            if quality >= threshold:
+                status = "accepted"
+        elif status == "rejected":
+            status = "empty"
+        attempts.append(
+            {
+                "extractor": name,
+                "status": status,
+                "quality": quality,
+                "seconds": round(time.perf_counter() - started, 4),
+            }
+        )
+        if status == "accepted":
+            return ExtractionResult(text=text, extractor=name, score=_score_pdf_text(text, stats), attempts=attempts)
 
     if not candidates:
-        return ""
+        return ExtractionResult(text="", extractor="none", score=0, attempts=attempts)
 
-    best = max(candidates, key=_score_pdf_text)
-    return _clean_script_text(best)
+    # Candidates are already cleaned, so their scores stand as computed.
+    extractor, text, stats = max(candidates, key=lambda item: _score_pdf_text(item[1], item[2]))
+    return ExtractionResult(text=text, extractor=extractor, score=_score_pdf_text(text, stats), attempts=attempts)
+
+
+def _extract_text_from_pdf(path: Path) -> str:
+    return _extract_pdf(path).text
 
 
 def _extract_text_from_docx(path: Path) -> str:
     try:
-        with ZipFile(path) as docx:
-            with docx.open("word/document.xml") as xml_file:
-                xml_content = xml_file.read()
+        paragraphs = list(docx_extraction.iter_docx_paragraphs(path))
     except Exception:
         return ""
+    return _clean_script_text("\n".join(paragraphs))
 
-    try:
-        tree = ElementTree.fromstring(xml_content)
-    except ElementTree.ParseError:
-        return ""
 
-    namespace = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
-    texts: List[str] = []
-    for node in tree.iter(f"{namespace}t"):
-        if node.text:
-            texts.append(node.text)
-    return _clean_script_text("\n".join(texts))
+def _extract_docx(path: Path) -> ExtractionResult:
+    text = _extract_text_from_docx(path)
+    return ExtractionResult(text=text, extractor="docx", score=_score_pdf_text(text))
+
+
+_CACHED_EXTRACTORS = {
+    ".pdf": _extract_pdf,
+    ".docx": _extract_docx,
+    ".doc": _extract_docx,
+}
+
+
+def _cache_key(path: Path, cache: ExtractionCache) -> str:
+    return cache.make_key(file_sha256(path), path.suffix.lower(), EXTRACTOR_VERSION)
+
+
+def _cached_extraction(cache: ExtractionCache, key: str) -> Optional[ExtractionResult]:
+    cached = cache.get(key)
+    if cached is None:
+        return None
+    return ExtractionResult(
+        text=cached.get("text", ""),
+        extractor=cached.get("extractor", "unknown"),
+        score=int(cached.get("score", 0)),
+    )
+
+
+def _extract_cached(
+    path: Path, cache: Optional[ExtractionCache] = None, key: Optional[str] = None
+) -> ExtractionResult:
+    """Run the extractor for ``path`` unless an identical upload was seen before.
+
+    Pass ``key`` when the caller already hashed the upload, so the file is read once.
+    """
+    extractor = _CACHED_EXTRACTORS[path.suffix.lower()]
+    cache = cache or get_extraction_cache()
+    key = key or _cache_key(path, cache)
+    cached = _cached_extraction(cache, key)
+    if cached is not None:
+        return cached
+    result = extractor(path)
+    _store_extraction(cache, key, result)
+    return result
+
+
+def _store_extraction(cache: ExtractionCache, key: str, result: ExtractionResult) -> None:
+    if result.text:
+        cache.put(
+            key,
+            {
+                "text": result.text,
+                "extractor": result.extractor,
+                "score": result.score,
+                "attempts": result.attempts,
+            },
+        )
+
+
+def _cache_streamed_pdf(
+    cache: ExtractionCache, key: str, extractor: str, pages: List[str], page_count: int, seconds: float
+) -> None:
+    """Cache a fully read page stream when the cascade would have accepted it, so the next read skips extraction."""
+    _, threshold, _ = pdf_extraction.extraction_settings()
+    text, stats = text_normalisation.normalise_and_measure("\n".join(pages).strip())
+    if not text or not _is_meaningful(text, stats):
+        return
+    quality = _pdf_text_quality(text, page_count, stats)
+    if quality < threshold:
+        return
+    attempt = {"extractor": extractor, "status": "streamed", "quality": quality, "seconds": round(seconds, 4)}
+    _store_extraction(cache, key, ExtractionResult(text, extractor, _score_pdf_text(text, stats), [attempt]))
 
 
 def _read_script_text(filepath: str) -> str:
@@ -217,16 +327,23 @@ def _read_script_text(filepath: str) -> str:
 
     suffix = p.suffix.lower()
     if suffix == ".pdf":
-        text = _extract_text_from_pdf(p)
+        text = _extract_cached(p).text
         if text:
             return text
         raise ScriptExtractionError(
             "Unable to process PDF. Please upload a readable file or try converting to text format."
         )
     elif suffix in {".docx", ".doc"}:
-        text = _extract_text_from_docx(p)
+        text = _extract_cached(p).text
         if text:
             return text
+    elif suffix in screenplay_formats.NATIVE_SUFFIXES:
+        lines: List[str] = []
+        for scene in _iter_native_scenes(p):
+            lines.append(scene["heading"])
+            lines.extend(scene["content"])
+            lines.append("")
+        return _clean_script_text("\n".join(lines))
 
     try:
         return _clean_script_text(p.read_text(encoding="utf-8"))
@@ -234,6 +351,11 @@ def _read_script_text(filepath: str) -> str:
         raise ScriptExtractionError("Unable to read uploaded script. Please ensure the file is UTF-8 compatible.") from exc
 
 
+def read_script_text(filepath: str) -> str:
+    """Cleaned text of an uploaded script in any supported format (cached for binary formats)."""
+    return _read_script_text(filepath)
+
+
 def _parse_scene_heading(heading: str | None) -> Tuple[str | None, str | None, str | None]:
     if not heading:
         return None, None, None
@@ -242,8 +364,8 @@ def _parse_scene_heading(heading: str | None) -> Tuple[str | None, str | None, s
     if not SCENE_HEADING_PATTERN.match(canonical):
         return canonical, None, None
 
-    cleaned = re.sub(r"^\s*(INT(?:/EXT)?|EXT(?:/INT)?)(?:\.|\s|:)+\s*", "", canonical, flags=re.IGNORECASE)
-    parts = [part.strip() for part in re.split(r"\s*[-–—]\s*", cleaned) if part.strip()]
+    cleaned = _HEADING_PREFIX_PATTERN.sub("", canonical)
+    parts = [part.strip() for part in _HEADING_SEPARATOR_PATTERN.split(cleaned) if part.strip()]
     location = parts[0] if parts else cleaned.strip()
 
     time_of_day = None
@@ -254,7 +376,7 @@ def _parse_scene_heading(heading: str | None) -> Tuple[str | None, str | None, s
                 time_of_day = upper_segment
                 break
     if not time_of_day:
-        tail_match = re.search(r"\b([A-Z ]{3,})$", cleaned.upper())
+        tail_match = _HEADING_TAIL_PATTERN.search(cleaned.upper())
         if tail_match and tail_match.group(1).strip() in TIME_OF_DAY_KEYWORDS:
             time_of_day = tail_match.group(1).strip()
 
@@ -264,88 +386,303 @@ def _parse_scene_heading(heading: str | None) -> Tuple[str | None, str | None, s
     return canonical, location, time_of_day
 
 
+# Line kinds assigned by the scene lexer; every line is classified exactly once.
+LINE_BLANK = "blank"
+LINE_HEADING = "heading"
+LINE_CUE = "cue"
+LINE_PARENTHETICAL = "parenthetical"
+LINE_DIALOGUE = "dialogue"
+LINE_ACTION = "action"
+_SPEECH_KINDS = frozenset((LINE_CUE, LINE_PARENTHETICAL, LINE_DIALOGUE))
+
+# Headings can only start with INT/EXT, so most lines never reach the regex.
+_HEADING_INITIALS = frozenset("IiEe")
+_HEADING_TOKENS = {"INT", "EXT"}
+# ASCII bytes outside ``\w`` become spaces so ``bytes.split`` counts words without building match objects.
+_NON_WORD_TABLE = bytes(
+    code if chr(code).isalnum() or code == ord("_") else ord(" ") for code in range(128)
+) + b" " * 128
+_WORD_PATTERN = re.compile(r"\w+")
+_ASCII_CHARACTER_PATTERN = re.compile(CHARACTER_PATTERN.pattern, flags=re.ASCII)
+# Parentheticals and cue extensions ("(CONT'D)", "(V.O.)", a bare "CONT'D") are not names.
+_NON_NAME_PATTERN = re.compile(r"\([^)\n]*\)|\bCONT['’]?D\b")
+
+
+def classify_line(line: str, previous: str = LINE_BLANK) -> str:
+    """Classify one stripped line given the kind of the line before it."""
+    if not line:
+        return LINE_BLANK
+    if line[0] in _HEADING_INITIALS and SCENE_HEADING_PATTERN.match(line):
+        return LINE_HEADING
+    if line.isupper() and 2 < len(line) <= 35:
+        # Short all-caps lines are speaker cues (and also catch shouted action such as "BANG!").
+        return LINE_CUE
+    if previous in _SPEECH_KINDS:
+        return LINE_PARENTHETICAL if line.startswith("(") else LINE_DIALOGUE
+    return LINE_ACTION
+
+
+def _count_words(text: str) -> int:
+    if text.isascii():
+        return len(text.encode("ascii").translate(_NON_WORD_TABLE).split())
+    return sum(1 for _ in _WORD_PATTERN.finditer(text))
+
+
+def _character_names(cues: Iterable[str], text: str) -> List[str]:
+    # A cue names its speaker without extensions: "JOHN (V.O.)" and "JOHN (CONT'D)" are JOHN.
+    names = {character_registry.character_key(cue) for cue in cues}
+    names.discard("")
+    if "(" in text or "CONT" in text:
+        text = _NON_NAME_PATTERN.sub(" ", text)
+    # ``\b`` only needs Unicode word rules when the text has non-ASCII characters.
+    pattern = _ASCII_CHARACTER_PATTERN if text.isascii() else CHARACTER_PATTERN
+    names.update(token for token in pattern.findall(text) if token not in _HEADING_TOKENS)
+    return sorted({name.title() for name in names})
+
+
+def _tone_of(text: str) -> str:
+    hits = keywords.keyword_hits(text)["tone"]
+    # Ties go to the label listed first in the lexicon.
+    best_label = max(keywords.TONE_WORDS, key=lambda label: hits[label])
+    return best_label if hits[best_label] > 0 else "neutral"
+
+
 def _extract_characters(lines: List[str]) -> List[str]:
-    characters: set[str] = set()
-    for line in lines:
-        token = line.strip()
-        if not token:
-            continue
-        if SCENE_HEADING_PATTERN.match(token):
-            continue
-        if token.isupper() and 2 < len(token) <= 35:
-            characters.add(token)
-        for candidate in re.findall(r"\b[A-Z][A-Z0-9]{2,}\b", token):
-            if candidate not in {"INT", "EXT"}:
-                characters.add(candidate)
-    return sorted({c.title() for c in characters})
+    kept = [token for token in (line.strip() for line in lines) if token and not SCENE_HEADING_PATTERN.match(token)]
+    cues = (token for token in kept if classify_line(token) == LINE_CUE)
+    return _character_names(cues, "\n".join(kept))
 
 
 def _infer_scene_tone(lines: List[str]) -> str:
-    joined = " ".join(line.lower() for line in lines)
-    tone_map = {
-        "action": ["explosion", "chase", "fight", "gun", "run"],
-        "romance": ["kiss", "love", "romantic", "heart"],
-        "drama": ["cry", "tear", "argue", "scream"],
-        "comedy": ["laugh", "joke", "funny", "smile"],
-        "thriller": ["mystery", "dark", "shadow", "whisper"],
-    }
-    scores: Dict[str, int] = {label: 0 for label in tone_map}
-    for label, keywords in tone_map.items():
-        scores[label] = sum(joined.count(keyword) for keyword in keywords)
-    best_label = max(scores, key=scores.get)
-    return best_label if scores.get(best_label, 0) > 0 else "neutral"
+    return _tone_of("\n".join(lines))
 
 
-def _finalise_scene(index: int, heading: str | None, lines: List[str]) -> Dict[str, Any]:
-    cleaned_lines = [ln.strip() for ln in lines if ln.strip()]
-    description = "\n".join(cleaned_lines)
-    word_count = len(re.findall(r"\w+", description))
+def _scene_dict(
+    index: int,
+    heading: str | None,
+    cleaned_lines: List[str],
+    description: str,
+    characters: List[str],
+    dialogue: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
     if not heading:
         heading = f"Scene {index}"
     canonical_heading, location, time_of_day = _parse_scene_heading(heading)
-    characters = _extract_characters(cleaned_lines)
-    tone = _infer_scene_tone(cleaned_lines)
     return {
         "index": index,
         "heading": (canonical_heading or heading).strip(),
         "description": description,
-        "word_count": word_count,
+        "word_count": _count_words(description),
         "content": cleaned_lines,
         "location": location,
         "time_of_day": time_of_day,
         "characters": characters,
-        "tone": tone,
+        # Dialogue lines per speaker, keyed by the cue as written ("JOHN (V.O.)").
+        "dialogue": dialogue or {},
+        "tone": _tone_of(description),
     }
 
 
-def naive_scene_breakdown(text: str) -> List[Dict[str, Any]]:
+def _finalise_scene(
+    index: int,
+    heading: str | None,
+    lines: List[str],
+    characters: Optional[List[str]] = None,
+    dialogue: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    cleaned_lines = [ln.strip() for ln in lines if ln.strip()]
+    description = "\n".join(cleaned_lines)
+    if characters is None:
+        characters = _extract_characters(cleaned_lines)
+    else:
+        # Native formats name their speakers; no need to guess from capitalisation.
+        characters = sorted({name.title() for name in characters})
+    return _scene_dict(index, heading, cleaned_lines, description, characters, dialogue)
+
+
+def _iter_scenes(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Single-pass scene lexer.
+
+    Each line is stripped and classified once. Cues and per-speaker dialogue
+    line counts are collected as they are seen; a scene is summarised from its joined text (word count, capitalised
+    names, tone keywords) when the next heading arrives. Content before the
+    first heading becomes an "Opening" scene.
+    """
+    index = 0
+    heading: str | None = None
+    content: List[str] = []
+    cues: set[str] = set()
+    dialogue: Dict[str, int] = {}
+    speaker = ""
+    # Blank lines before the first heading still open a (headingless) block.
+    open_block = False
+    previous = LINE_BLANK
+
+    for raw_line in lines:
+        line = raw_line.strip()
+        kind = classify_line(line, previous)
+        previous = kind
+        if kind == LINE_HEADING:
+            if heading is not None or open_block:
+                index += 1
+                description = "\n".join(content)
+                yield _scene_dict(
+                    index, heading, content, description, _character_names(cues, description), dialogue
+                )
+            match = SCENE_HEADING_PATTERN.match(line)
+            heading = line if match.group(2).strip() else line.upper()
+            content = []
+            cues = set()
+            dialogue = {}
+            open_block = False
+            continue
+        open_block = True
+        if kind == LINE_BLANK:
+            continue
+        if heading is None:
+            heading = "Opening"
+        content.append(line)
+        if kind == LINE_CUE:
+            cues.add(line)
+            speaker = line
+        elif kind == LINE_DIALOGUE:
+            dialogue[speaker] = dialogue.get(speaker, 0) + 1
+
+    if heading is not None or open_block:
+        description = "\n".join(content)
+        yield _scene_dict(index + 1, heading, content, description, _character_names(cues, description), dialogue)
+
+
+def _iter_native_scenes(path: Path) -> Iterator[Dict[str, Any]]:
+    """Scenes straight from Fountain/FDX structure, skipping text extraction and heading heuristics."""
+    blocks = screenplay_formats.iter_native_blocks(path)
+    try:
+        for index, block in enumerate(blocks, start=1):
+            heading = block.heading if block.heading is not None else "Opening"
+            yield _finalise_scene(index, heading, block.lines, block.characters, block.dialogue)
+    except (ElementTree.ParseError, UnicodeDecodeError) as exc:
+        raise ScriptExtractionError(
+            "Unable to read uploaded script. Please ensure the file is a valid Fountain or Final Draft document."
+        ) from exc
+
+
+def parallel_min_scenes() -> int:
+    return int(os.getenv("SCENE_PARALLEL_MIN_SCENES", DEFAULT_PARALLEL_MIN_SCENES))
+
+
+def _heading_offsets(lines: List[str]) -> List[int]:
+    """Positions of the lines ``classify_line`` treats as scene headings."""
+    offsets = []
+    for position, raw_line in enumerate(lines):
+        line = raw_line.strip()
+        if line and line[0] in _HEADING_INITIALS and SCENE_HEADING_PATTERN.match(line):
+            offsets.append(position)
+    return offsets
+
+
+def _scene_batches(line_count: int, headings: List[int], batches: int) -> List[Tuple[int, int]]:
+    """Cut ``[0, line_count)`` at heading lines into roughly ``batches`` ranges of similar size.
+
+    Every range but the first starts on a heading, so each batch lexes into
+    whole scenes exactly as it would inside the full script.
+    """
+    target = max(PARALLEL_MIN_BATCH_LINES, -(-line_count // max(1, batches)))
+    bounds = [0]
+    for offset in headings:
+        if offset - bounds[-1] >= target:
+            bounds.append(offset)
+    bounds.append(line_count)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _breakdown_batch(lines: List[str]) -> SceneTable:
+    # Runs on a pool worker: scene indices restart at 1 and are offset when the tables are joined.
+    # A table pickles as a handful of arrays and one string rather than thousands of dicts.
+    return SceneTable.from_scenes(_iter_scenes(lines))
+
+
+def _parallel_breakdown(lines: List[str], headings: List[int]) -> SceneTable:
+    """Lex and finalise batches of scenes on the worker pool, preserving order and numbering."""
+    workers = worker_pool.pool_size()
+    # A few batches per worker keeps them all busy when scene sizes vary.
+    batches = _scene_batches(len(lines), headings, workers * 4)
+    return SceneTable.concat(
+        worker_pool.map_ordered(_breakdown_batch, [(lines[start:stop],) for start, stop in batches])
+    )
+
+
+def _parallel_scene_table(lines: List[str], parallel: Optional[bool]) -> Optional[SceneTable]:
+    """The pool-batched breakdown when it applies (see ``naive_scene_breakdown``), else ``None``."""
+    min_scenes = parallel_min_scenes()
+    if parallel is False or worker_pool.pool_size() <= 1 or not (parallel or min_scenes > 0):
+        return None
+    headings = _heading_offsets(lines)
+    if not parallel and len(headings) < min_scenes:
+        return None
+    try:
+        return _parallel_breakdown(lines, headings)
+    except BrokenProcessPool:
+        # The next get_process_pool() call replaces the broken pool.
+        return None
+
+
+def iter_scenes(source: str | Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Yield finalised scenes one at a time.
+
+    ``source`` is script text or any iterable of text: lines from a file
+    handle, or multi-line chunks such as a PDF page stream. Nothing is read
+    past the heading that closes the scene being yielded, so stopping early
+    skips the rest of the document. For the same text the scenes are those
+    of ``naive_scene_breakdown``; like it, the text is used as given (see
+    ``stream_script_scenes`` for cleaned scenes straight from a file).
+    """
+    if isinstance(source, str):
+        return _iter_scenes(_iter_text_lines(source))
+    return _iter_scenes(line for chunk in source for line in _iter_text_lines(chunk))
+
+
+def script_scene_breakdown(script_path: str, text: str) -> List[Dict[str, Any]]:
+    """Scene breakdown for an uploaded script, using native structure when the format has it."""
+    path = Path(script_path)
+    if path.suffix.lower() in screenplay_formats.NATIVE_SUFFIXES:
+        return list(_iter_native_scenes(path))
+    return naive_scene_breakdown(text)
+
+
+def script_scene_table(script_path: str, text: str) -> SceneTable:
+    """``script_scene_breakdown`` as a ``SceneTable``, built without materialising the scene dicts."""
+    path = Path(script_path)
+    if path.suffix.lower() in screenplay_formats.NATIVE_SUFFIXES:
+        return SceneTable.from_scenes(_iter_native_scenes(path))
+    return scene_table_breakdown(text)
+
+
+def scene_table_breakdown(text: str, parallel: Optional[bool] = None) -> SceneTable:
+    """``naive_scene_breakdown`` as a ``SceneTable``."""
+    lines = text.splitlines() if text else []
+    table = _parallel_scene_table(lines, parallel)
+    if table is None:
+        table = SceneTable.from_scenes(_iter_scenes(lines))
+    if not len(table) and text.strip():
+        table = SceneTable.from_scenes([_finalise_scene(1, "Scene 1", lines)])
+    return table
+
+
+def naive_scene_breakdown(text: str, parallel: Optional[bool] = None) -> List[Dict[str, Any]]:
+    """Scene dicts for plain script text.
+
+    Scenes are independent once their boundaries are known, so long scripts
+    (``SCENE_PARALLEL_MIN_SCENES``, when the worker pool has more than one
+    worker) are split at heading lines into batches that are lexed and
+    finalised on the pool. The result is identical to the serial path.
+    ``parallel`` forces the choice either way; ``None`` decides by size.
+    """
     if not text:
         return []
 
-    scenes: List[Dict[str, Any]] = []
-    current_heading: str | None = None
-    current_lines: List[str] = []
-
-    for raw_line in text.splitlines():
-        line = raw_line.rstrip()
-        match = SCENE_HEADING_PATTERN.match(line)
-        if match:
-            if current_heading is not None or current_lines:
-                scenes.append(_finalise_scene(len(scenes) + 1, current_heading, current_lines))
-            heading_suffix = match.group(2).strip()
-            canonical_heading = match.group(0).strip()
-            if not heading_suffix:
-                canonical_heading = canonical_heading.upper()
-            current_heading = canonical_heading
-            current_lines = []
-        else:
-            if current_heading is None and line.strip():
-                # If content appears before first heading, create a synthetic heading
-                current_heading = "Opening"
-            current_lines.append(line)
-
-    if current_heading is not None or current_lines:
-        scenes.append(_finalise_scene(len(scenes) + 1, current_heading, current_lines))
+    lines = text.splitlines()
+    table = _parallel_scene_table(lines, parallel)
+    scenes = table.to_dicts() if table is not None else list(_iter_scenes(lines))
 
     if not scenes and text.strip():
         scenes.append(_finalise_scene(1, "Scene 1", text.splitlines()))
@@ -353,26 +690,142 @@ def naive_scene_breakdown(text: str) -> List[Dict[str, Any]]:
     return scenes
 
 
+def _iter_text_file(path: Path) -> Iterator[str]:
+    try:
+        with open(path, encoding="utf-8") as handle:
+            yield from handle
+    except UnicodeDecodeError as exc:
+        raise ScriptExtractionError("Unable to read uploaded script. Please ensure the file is UTF-8 compatible.") from exc
+
+
+def _iter_tracked_text(text: str, progress: Optional[SourceProgress]) -> Iterator[str]:
+    if progress is None:
+        yield text
+        return
+    progress.total = len(text)
+    for line in _iter_text_lines(text):
+        progress.done += len(line) + 1
+        yield line
+
+
+def _iter_script_chunks(path: Path, progress: Optional[SourceProgress] = None) -> Iterator[str]:
+    """Yield raw text chunks (pages for PDFs, paragraphs for DOCX, lines for text files) as they are read.
+
+    With ``progress``, already extracted text is yielded line by line and
+    ``progress`` follows how much of the source has been read (not measured
+    for streamed DOCX paragraphs).
+    """
+    suffix = path.suffix.lower()
+    if suffix not in _CACHED_EXTRACTORS:
+        if progress is None:
+            yield from _iter_text_file(path)
+            return
+        # bytes on disk against characters read: close enough for UTF-8 scripts
+        progress.total = path.stat().st_size
+        for line in _iter_text_file(path):
+            progress.done += len(line)
+            yield line
+        return
+
+    cache = get_extraction_cache()
+    key = _cache_key(path, cache)
+    cached = _cached_extraction(cache, key)
+    if cached is not None and cached.text:
+        yield from _iter_tracked_text(cached.text, progress)
+        return
+
+    if suffix == ".pdf":
+        budget, _, fast_first_pages = pdf_extraction.extraction_settings()
+        prescan = pdf_extraction.prescan_pdf(path)
+        order = pdf_extraction.plan_extractor_order(prescan, fast_first_pages)
+        if order and order[0] in {"pdfplumber", "pypdf2", "raw"}:
+            pages: List[str] = []
+            if progress is not None:
+                progress.total = prescan.page_count
+            started = time.perf_counter()
+            try:
+                for page in pdf_extraction.iter_pdf_pages_with_budget(str(path), order[0], budget):
+                    pages.append(page)
+                    if progress is not None:
+                        progress.done += 1
+                    yield page
+            except Exception:
+                if pages:
+                    raise ScriptExtractionError("PDF extraction failed part-way through the document.")
+            if pages:
+                # Only a stream read to the end is cached; a preview that stops early is not.
+                _cache_streamed_pdf(cache, key, order[0], pages, prescan.page_count, time.perf_counter() - started)
+                return
+    elif suffix in {".docx", ".doc"}:
+        produced = False
+        try:
+            for paragraph in docx_extraction.iter_docx_paragraphs(path):
+                produced = True
+                yield paragraph
+        except Exception:
+            if produced:
+                raise ScriptExtractionError("DOCX extraction failed part-way through the document.")
+        if produced:
+            return
+
+    # No page stream available: fall back to the full (cached) extractor cascade
+    text = _extract_cached(path, cache, key).text
+    if not text:
+        if suffix == ".pdf":
+            raise ScriptExtractionError(
+                "Unable to process PDF. Please upload a readable file or try converting to text format."
+            )
+        raise ScriptExtractionError("Unable to read uploaded script. Please ensure the file is UTF-8 compatible.")
+    yield from _iter_tracked_text(text, progress)
+
+
+def stream_script_scenes(filepath: str) -> Iterator[Dict[str, Any]]:
+    """Yield finalised scenes while later pages of the script are still being extracted.
+
+    Pages flow through line cleaning and heading detection lazily, so memory
+    is bounded by the largest scene rather than the whole document.
+    """
+    path = Path(filepath)
+    if not path.exists():
+        raise ScriptExtractionError("Uploaded script file could not be found for analysis.")
+    if path.suffix.lower() in screenplay_formats.NATIVE_SUFFIXES:
+        return _iter_native_scenes(path)
+    return _iter_scenes(_iter_clean_lines(_iter_script_chunks(path)))
+
+
+def preview_script_scenes(filepath: str, limit: int) -> Dict[str, Any]:
+    """The first ``limit`` scenes of a script and an estimate of how many it has in total.
+
+    Reading stops one scene past ``limit``. When the document ends first,
+    ``complete`` is true and the total is exact; otherwise the total is
+    extrapolated from the share of the source read so far, or ``None`` when
+    that share is unknown (native formats, streamed DOCX).
+    """
+    path = Path(filepath)
+    if not path.exists():
+        raise ScriptExtractionError("Uploaded script file could not be found for analysis.")
+    progress = SourceProgress()
+    if path.suffix.lower() in screenplay_formats.NATIVE_SUFFIXES:
+        scenes = _iter_native_scenes(path)
+    else:
+        scenes = iter_scenes(_iter_clean_lines(_iter_script_chunks(path, progress)))
+    try:
+        read = list(islice(scenes, limit + 1))
+    finally:
+        scenes.close()
+
+    complete = len(read) <= limit
+    estimate: Optional[int] = len(read)
+    if not complete:
+        fraction = progress.fraction()
+        estimate = max(len(read), round(len(read) / fraction)) if fraction else None
+    return {'scenes': read[:limit], 'complete': complete, 'estimated_total_scenes': estimate}
+
+
 def _analyze_script_sentiment(text: str) -> Dict[str, Any]:
-    positive_keywords = {
-        "hope": 1.2,
-        "laugh": 1.1,
-        "love": 1.5,
-        "joy": 1.0,
-        "win": 1.3,
-        "success": 1.4,
-    }
-    negative_keywords = {
-        "fear": 1.2,
-        "cry": 1.1,
-        "death": 1.5,
-        "lose": 1.3,
-        "dark": 1.0,
-        "anger": 1.4,
-    }
-    lower_text = text.lower()
-    pos_score = sum(lower_text.count(word) * weight for word, weight in positive_keywords.items())
-    neg_score = sum(lower_text.count(word) * weight for word, weight in negative_keywords.items())
+    hits = keywords.keyword_hits(text)
+    pos_score = sum(hits["positive"][word] * weight for word, weight in keywords.POSITIVE_WEIGHTS.items())
+    neg_score = sum(hits["negative"][word] * weight for word, weight in keywords.NEGATIVE_WEIGHTS.items())
     net = pos_score - neg_score
     total = pos_score + neg_score
     mood = "balanced"
@@ -385,15 +838,7 @@ def _analyze_script_sentiment(text: str) -> Dict[str, Any]:
     elif neg_score > pos_score:
         mood = "tense"
 
-    genre = "drama"
-    if any(word in lower_text for word in ("explosion", "chase", "gun")):
-        genre = "action"
-    elif any(word in lower_text for word in ("romance", "kiss", "wedding")):
-        genre = "romance"
-    elif any(word in lower_text for word in ("mystery", "detective", "shadow")):
-        genre = "thriller"
-    elif any(word in lower_text for word in ("laugh", "funny", "joke")):
-        genre = "comedy"
+    genre = next((label for label in keywords.GENRE_WORDS if hits["genre"][label]), "drama")
 
     sentiment_score = 0.0 if total == 0 else net / max(total, 1.0)
 
@@ -406,150 +851,252 @@ def _analyze_script_sentiment(text: str) -> Dict[str, Any]:
     }
 
 
-def load_budget_model():
-    if MODEL_PATH.exists():
-        try:
-            return joblib.load(MODEL_PATH)
-        except Exception:
+def budget_model_entry() -> Optional[LoadedModel]:
+    """The budget model from the process-wide registry (loaded once, reloaded when the file changes)."""
+    if not MODEL_PATH.exists():
+        # Attempt to train on the fly if a dataset is present
+        if not DATASET_PATH.exists():
             return None
-    # Attempt to train on the fly if a dataset is present
-    if DATASET_PATH.exists():
         try:
             from ai.train_model import train_model
 
             train_model(DATASET_PATH, MODEL_PATH, use_random_forest=True)
-            return joblib.load(MODEL_PATH)
         except Exception:
             return None
-    return None
+    try:
+        return get_registry().get(MODEL_PATH)
+    except Exception:
+        return None
+
 
+def load_budget_model():
+    entry = budget_model_entry()
+    return entry.model if entry is not None else None
+
+
+def _suggest_location(heading: Optional[str]) -> str:
+    heading_upper = (heading or '').upper()
+    if 'INT' in heading_upper:
+        return 'Studio/Interior'
+    if 'EXT' in heading_upper:
+        return 'Exterior/On-location'
+    return 'Unknown'
+
+
+def _scene_todo_titles(index: int, heading: Optional[str]) -> Tuple[str, str]:
+    """Generated (pre-production, post-production) to-do titles for a scene."""
+    return f'Prep Scene {index}: {heading or ""}', f'Post: VFX/Editing Scene {index}'
+
+
+def _apply_scene_revision(
+    writer: AnalysisWriter,
+    scenes: SceneTable,
+    hashes: List[str],
+    script_id: Optional[int],
+) -> Tuple[array, List[int], List[str], List[Dict[str, Any]], Dict[str, int]]:
+    """Bring the project's scene rows in line with ``scenes``, touching only what changed.
+
+    Scenes are aligned with the stored ones by content hash (see
+    ``services.scene_diff``). Unchanged and moved scenes keep their row,
+    prediction, to-dos (with their status) and schedule entry, and are only
+    renumbered; edited scenes are updated in place; inserted scenes get
+    fresh rows and deleted ones are removed along with their to-dos and
+    schedule entries. Generated to-do titles and schedule tasks follow the new
+    number and heading unless they were edited by hand.
+
+    The writes are queued on ``writer``; nothing is written until its
+    ``commit()``. Inserted and edited scenes take their budget from
+    ``scenes.predicted_budget`` (see ``services.budget_inference``); for
+    the others the stored prediction is written back into it.
+    Returns the scene row ids (0 for new scenes), the positions of the new
+    scenes in the order ``commit()`` returns their ids, the suggested
+    locations (in script order), the non-trivial changes and the change
+    counts.
+    """
+    db, project_id = writer.db, writer.project_id
+    existing = list(crud.get_scenes_by_project(db, project_id))
+    if any(row.content_hash is None for row in existing):
+        # Analyses from before content hashing have no scene links on their to-dos to carry over.
+        writer.replace_project_analysis()
+        existing = []
+    # Plain snapshots, so nothing depends on ORM rows staying loaded.
+    old = [
+        (row.id, row.index, row.heading, row.content_hash, row.predicted_budget or 0.0, row.suggested_location)
+        for row in existing
+    ]
+    todos_by_scene: Dict[int, List[Tuple[int, bool, str]]] = defaultdict(list)
+    for todo in crud.get_todos_by_project(db, project_id):
+        if todo.scene_id is not None:
+            todos_by_scene[todo.scene_id].append((todo.id, todo.is_post_production, todo.title))
+    entries_by_scene: Dict[int, List[Tuple[int, str]]] = defaultdict(list)
+    for entry in crud.get_schedule_by_project(db, project_id):
+        if entry.scene_id is not None:
+            entries_by_scene[entry.scene_id].append((entry.id, entry.task))
+
+    changes = scene_diff.align_scenes(
+        [(content_hash, heading) for _, _, heading, content_hash, _, _ in old],
+        [(content_hash, scene.heading) for content_hash, scene in zip(hashes, scenes)],
+    )
+    scene_ids = array('q', bytes(8 * len(scenes)))
+    new_rows: List[int] = []
+    suggested_locations: List[str] = [''] * len(scenes)
+    change_payloads: List[Dict[str, Any]] = []
+    scene_updates: List[Dict[str, Any]] = []
+    todo_updates: List[Dict[str, Any]] = []
+    entry_updates: List[Dict[str, Any]] = []
+
+    for change in changes:
+        if change.kind == scene_diff.DELETED:
+            scene_id, old_index, old_heading = old[change.old][:3]
+            writer.delete_scenes([scene_id])
+            change_payloads.append({'change': change.kind, 'scene_no': None, 'previous_scene_no': old_index, 'heading': old_heading})
+            continue
 
-def analyze_and_create(db, project_id: int, script_path: str):
+        s = scenes[change.new]
+        index, heading, content_hash = s.index, s.heading, hashes[change.new]
+        if change.kind == scene_diff.INSERTED:
+            predicted = scenes.predicted_budget[change.new]
+            suggested_location = _suggest_location(heading)
+            slot = writer.add_scene(
+                index=index,
+                heading=heading,
+                description=s.description,
+                word_count=s.word_count,
+                predicted_budget=predicted,
+                suggested_location=suggested_location,
+                script_id=script_id,
+                content_hash=content_hash,
+            )
+            scene_id = 0
+            new_rows.append(change.new)
+            prep_title, post_title = _scene_todo_titles(index, heading)
+            writer.add_todo(slot, prep_title, 'Pre-production checklist for scene', is_post_production=False)
+            writer.add_todo(slot, post_title, 'Post-production tasks for scene', is_post_production=True)
+            shoot_date = (datetime.utcnow().date() + timedelta(days=index)).isoformat()
+            writer.add_schedule_entry(slot, heading or f'Scene {index}', json.dumps([shoot_date]))
+            change_payloads.append({'change': change.kind, 'scene_no': index, 'previous_scene_no': None, 'heading': heading})
+        else:
+            scene_id, old_index, old_heading, _, predicted, suggested_location = old[change.old]
+            update: Dict[str, Any] = {}
+            if change.kind == scene_diff.EDITED:
+                predicted = scenes.predicted_budget[change.new]
+                suggested_location = _suggest_location(heading)
+                update.update(
+                    description=s.get('description'),
+                    word_count=s.get('word_count'),
+                    predicted_budget=predicted,
+                    suggested_location=suggested_location,
+                    content_hash=content_hash,
+                    script_id=script_id,
+                )
+            if heading != old_heading:
+                update['heading'] = heading
+                old_task = old_heading or f'Scene {old_index}'
+                entry_updates.extend(
+                    {'id': entry_id, 'task': heading or f'Scene {index}'}
+                    for entry_id, task in entries_by_scene[scene_id]
+                    if task == old_task
+                )
+            if index != old_index:
+                update['index'] = index
+            if 'index' in update or 'heading' in update:
+                old_titles = _scene_todo_titles(old_index, old_heading)
+                new_titles = _scene_todo_titles(index, heading)
+                todo_updates.extend(
+                    {'id': todo_id, 'title': new_titles[is_post]}
+                    for todo_id, is_post, title in todos_by_scene[scene_id]
+                    if title == old_titles[is_post]
+                )
+            if update:
+                scene_updates.append({'id': scene_id, **update})
+            if change.kind != scene_diff.UNCHANGED or index != old_index:
+                change_payloads.append(
+                    {'change': change.kind, 'scene_no': index, 'previous_scene_no': old_index, 'heading': heading}
+                )
+
+        scene_ids[change.new] = scene_id
+        scenes.predicted_budget[change.new] = predicted
+        suggested_locations[change.new] = suggested_location
+
+    writer.update_scenes(scene_updates)
+    writer.update_todos(todo_updates)
+    writer.update_schedule_entries(entry_updates)
+    return scene_ids, new_rows, suggested_locations, change_payloads, scene_diff.summarise(changes)
+
+
+def analyze_and_create(
+    db,
+    project_id: int,
+    script_path: str,
+    script_id: Optional[int] = None,
+    progress: Optional[Callable[[str], None]] = None,
+    run_started: Optional[Callable[[int], None]] = None,
+):
+    """Analyse a script and persist its breakdown for the project.
+
+    Re-analysing a revised script only re-predicts and rewrites the scenes
+    whose content changed; ``revision`` in the result lists what changed.
+    When ``script_id`` is given, changed scenes are stamped with it and the
+    script's scene manifest is stored for ``/scripts/{id}/diff``.
+    ``progress`` is called with each stage as it starts: ``extracting``,
+    ``parsing``, ``predicting`` and ``persisting``. ``run_started`` receives
+    the id of the analysis run once it is opened.
+    """
+    report = progress or (lambda _stage: None)
     # read and breakdown
+    report('extracting')
     text = _read_script_text(script_path)
     if not text.strip():
         raise ScriptExtractionError("Uploaded script appears to be empty after processing.")
-
-    # Reset previous analysis artefacts now that we know text is valid
-    crud.clear_project_analysis(db, project_id)
-
-    scenes = naive_scene_breakdown(text)
-    model = load_budget_model()
-
-    created = []
-    character_counts: Counter[str] = Counter()
-    prop_counts: Counter[str] = Counter()
-    scene_payloads: List[Dict[str, Any]] = []
-    budget_details: List[Dict[str, Any]] = []
-    total_budget_prediction = 0.0
-
-    for s in scenes:
-        scene_obj = crud.create_scene(
-            db,
-            project_id=project_id,
-            index=s['index'],
-            heading=s.get('heading'),
-            description=s.get('description'),
-        )
-
-        predicted = 0.0
-        if model is not None:
-            try:
-                X = [[s.get('word_count', 0), max(1, int(s.get('word_count', 0) / 100))]]
-                pred = model.predict(X)
-                predicted = float(pred[0])
-            except Exception:
-                predicted = max(1000.0, s.get('word_count', 0) * 12.0)
-        else:
-            predicted = max(1200.0, s.get('word_count', 0) * 15.0)
-
-        total_budget_prediction += predicted
-
-        heading_upper = (s.get('heading') or '').upper()
-        if 'INT' in heading_upper:
-            suggested_location = 'Studio/Interior'
-        elif 'EXT' in heading_upper:
-            suggested_location = 'Exterior/On-location'
-        else:
-            suggested_location = 'Unknown'
-
-        crud.update_scene(
-            db,
-            scene_obj.id,
-            predicted_budget=predicted,
-            suggested_location=suggested_location,
-            word_count=s.get('word_count'),
-        )
-
-        crud.create_todo(
-            db,
-            project_id=project_id,
-            title=f'Prep Scene {s["index"]}: {scene_obj.heading or ""}',
-            description='Pre-production checklist for scene',
-            is_post_production=False,
-        )
-        crud.create_todo(
-            db,
-            project_id=project_id,
-            title=f'Post: VFX/Editing Scene {s["index"]}',
-            description='Post-production tasks for scene',
-            is_post_production=True,
-        )
-
-        description = s.get('description') or ''
-        characters = {token for token in CHARACTER_PATTERN.findall(description)}
-        character_counts.update(characters)
-        prop_tokens = {
-            token
-            for token in PROP_PATTERN.findall(description)
-            if token.upper() not in characters
-        }
-        prop_counts.update(prop_tokens)
-
-        shoot_date = (datetime.utcnow().date() + timedelta(days=s['index'])).isoformat()
-        crud.create_schedule_entry(
-            db,
-            project_id=project_id,
-            task=scene_obj.heading or f'Scene {scene_obj.index}',
-            dates_json=json.dumps([shoot_date]),
-        )
-
-        created.append(
-            {
-                'scene_id': scene_obj.id,
-                'predicted_budget': predicted,
-                'suggested_location': suggested_location,
-            }
-        )
-
-        scene_payloads.append(
-            {
-                'scene_no': s['index'],
-                'location': s.get('location') or (scene_obj.heading or 'Unknown').upper(),
-                'characters': s.get('characters', []),
-                'time': s.get('time_of_day') or 'UNSPECIFIED',
-                'tone': s.get('tone', 'neutral'),
-                'word_count': s.get('word_count', 0),
-            }
+    crud.fill_global_script_text(db, Path(script_path).name, text)
+
+    # Columnar breakdown: one text buffer and typed columns instead of a dict per scene.
+    report('parsing')
+    scenes = script_scene_table(script_path, text)
+    hashes = [scene_diff.scene_content_hash(s.heading, s.description) for s in scenes]
+    budget_model = budget_model_entry()
+    report('predicting')
+    # One predict call for the whole script; only new and edited scenes keep the result.
+    inference = budget_inference.predict_scene_budgets(budget_model.model if budget_model else None, scenes)
+    # Everything the analysis persists is queued on a new analysis run, which
+    # readers only see once commit() makes it the project's active run.
+    writer = AnalysisWriter.start(db, project_id, script_id)
+    try:
+        if run_started is not None:
+            run_started(writer.run_id)
+        scene_ids, new_rows, suggested_locations, revision_changes, revision_summary = _apply_scene_revision(
+            writer, scenes, hashes, script_id
         )
-        budget_details.append(
-            {
-                'scene_no': s['index'],
-                'predicted_budget': round(predicted, 2),
-                'suggested_location': suggested_location,
+        if script_id is not None:
+            writer.set_script_manifest(script_id, [(h, s.heading, s.index) for h, s in zip(hashes, scenes)])
+        registry = character_registry.build_registry(scenes)
+        writer.replace_characters(registry)
+        scene_cast = registry.cast_by_scene()
+
+        prop_counts: Counter[str] = Counter()
+        for s in scenes:
+            characters = {name.upper() for name in scene_cast.get(s.index, [])}
+            prop_tokens = {
+                token
+                for token in PROP_PATTERN.findall(s.description)
+                if token.upper() not in characters
             }
-        )
+            prop_counts.update(prop_tokens)
 
-    # Persist actor and property insights
-    for name, count in character_counts.most_common(8):
-        crud.create_actor(db, project_id=project_id, name=name.title(), cost=float(5000 + count * 1500))
-
-    for name, count in prop_counts.most_common(6):
-        crud.create_property(db, project_id=project_id, name=name, cost=float(2000 + count * 750))
+        # Persist actor and property insights (existing rows keep their id and manual fields)
+        writer.sync_actors([(record.name, float(5000 + record.scene_count * 1500)) for record in registry.most_common(8)])
+        writer.sync_properties([(name, float(2000 + count * 750)) for name, count in prop_counts.most_common(6)])
+    except Exception:
+        writer.abort()
+        raise
+    report('persisting')
+    total_budget_prediction = sum(scenes.predicted_budget)
+    for row, scene_id in zip(new_rows, writer.commit()):
+        scene_ids[row] = scene_id
 
     crud.ensure_default_crew(db, project_id)
 
-    features = extract_features_from_text(text)
+    features = extract_features_from_scenes(scenes)
     if total_budget_prediction <= 0:
         # fallback to heuristic budget estimation using features
         total_budget_prediction = max(
@@ -577,7 +1124,7 @@ def analyze_and_create(db, project_id: int, script_path: str):
     else:
         crew_assignments = []
 
-    top_characters = [name.title() for name, _ in character_counts.most_common(5)]
+    top_characters = [record.name for record in registry.most_common(5)]
     crew_recommendations: Dict[str, str] = {}
     preferred_roles = ['Director', 'Cinematographer', 'Sound Engineer']
     crew_name_map = {crew.name: crew for crew in crew_records}
@@ -602,6 +1149,31 @@ def analyze_and_create(db, project_id: int, script_path: str):
 
     sentiment = _analyze_script_sentiment(text)
 
+    # The per-scene response lists are only built now, straight from the table columns.
+    scene_payloads = [
+        {
+            'scene_no': s.index,
+            'location': s.location or (s.heading or 'Unknown').upper(),
+            'characters': scene_cast.get(s.index, []),
+            'time': s.time_of_day or 'UNSPECIFIED',
+            'tone': s.tone or 'neutral',
+            'word_count': s.word_count,
+        }
+        for s in scenes
+    ]
+    budget_details = [
+        {
+            'scene_no': s.index,
+            'predicted_budget': round(s.predicted_budget, 2),
+            'suggested_location': location,
+        }
+        for s, location in zip(scenes, suggested_locations)
+    ]
+    created = [
+        {'scene_id': scene_id, 'predicted_budget': predicted, 'suggested_location': location}
+        for scene_id, predicted, location in zip(scene_ids, scenes.predicted_budget, suggested_locations)
+    ]
+
     return {
         'scenes': scene_payloads,
         'predicted_budget': round(total_budget_prediction, 2),
@@ -612,4 +1184,12 @@ def analyze_and_create(db, project_id: int, script_path: str):
         'crew_suggestions': crew_analysis.get('suggestions', []),
         'budget_details': budget_details,
         'created_scenes': created,
+        'budget_inference': inference.to_dict(),
+        'budget_model': budget_model.info() if budget_model else None,
+        'run_id': writer.run_id,
+        'revision': {
+            'script_id': script_id,
+            'summary': revision_summary,
+            'changes': revision_changes,
+        },
     }
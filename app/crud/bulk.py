@@ -0,0 +1,337 @@
+"""Versioned, bulk persistence for script analysis.
+
+The helpers in ``crud`` commit and refresh after every row, which for an
+analysis meant a commit per scene, to-do and schedule entry, and a failed
+or in-flight analysis left the project half rebuilt. An ``AnalysisWriter``
+records the analysis as an ``AnalysisRun`` and queues everything it writes;
+``commit()`` then:
+
+1. inserts the new rows, tagged with the run id, with one executemany
+   INSERT per table (scenes with RETURNING, so their to-dos and schedule
+   entries can point at them) and commits them; readers do not see rows of
+   a run that is not active yet (``crud.live_rows``);
+2. in a second, short transaction applies the in-place updates, marks the
+   rows the run replaces or removes as retired by it, and switches the
+   project's ``active_run_id`` to the run with one UPDATE.
+
+A project has at most one run being written. ``start`` claims the project's
+``building_run_id`` with a conditional UPDATE, so two concurrent starts
+cannot both succeed, and the swap only goes through while the run still
+holds that claim (it is lost when a stale run is failed and taken over).
+
+Nothing is deleted on this path. ``collect_retired_rows`` removes retired
+rows and the rows of failed runs afterwards with one set-based DELETE per
+table. Rows are complete when queued (predictions included), so nothing is
+updated after it is inserted.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.crud.crud import live_rows
+from app.models.models import AnalysisRun, Actor, Character, Project, Property, ScheduleEntry, Scene, Script, ToDo
+from app.services.character_registry import CharacterRegistry
+
+RUN_BUILDING = "building"
+RUN_COMPLETE = "complete"
+RUN_FAILED = "failed"
+# A run still "building" after this long is taken to have died with its process.
+STALE_RUN_AFTER = timedelta(hours=1)
+# Children before parents, so deletes never trip the scene foreign keys.
+RUN_TABLES = (ToDo, ScheduleEntry, Scene, Character, Actor, Property)
+
+
+class AnalysisInProgress(RuntimeError):
+    """Another analysis of the project is still being written."""
+
+
+class AnalysisRunAbandoned(RuntimeError):
+    """The run was failed (e.g. taken over as stale) before it could be swapped in."""
+
+
+class AnalysisWriter:
+    def __init__(self, db: Session, project_id: int, run_id: int):
+        self.db = db
+        self.project_id = project_id
+        self.run_id = run_id
+        self._reset()
+
+    @classmethod
+    def start(cls, db: Session, project_id: int, script_id: Optional[int] = None) -> "AnalysisWriter":
+        """Open a new run for the project; raises ``AnalysisInProgress`` while another one is being written.
+
+        A run still building after ``STALE_RUN_AFTER`` is failed and its claim taken over.
+        """
+        holder = db.query(Project.building_run_id).filter(Project.id == project_id).scalar()
+        if holder is not None:
+            current = db.get(AnalysisRun, holder)
+            cutoff = datetime.utcnow() - STALE_RUN_AFTER
+            if current is not None and current.status == RUN_BUILDING and current.started_at and current.started_at > cutoff:
+                raise AnalysisInProgress(f"Analysis run {holder} of this project is still in progress.")
+        run = AnalysisRun(project_id=project_id, script_id=script_id, status=RUN_BUILDING)
+        db.add(run)
+        db.flush()
+        if not _claim_project(db, project_id, holder, run.id):
+            db.rollback()
+            raise AnalysisInProgress("Another analysis of this project started at the same time.")
+        # Whatever else is marked building lost its claim (or predates it): it will never be swapped in.
+        others = db.query(AnalysisRun.id).filter(
+            AnalysisRun.project_id == project_id, AnalysisRun.status == RUN_BUILDING, AnalysisRun.id != run.id
+        )
+        for (other_id,) in others.all():
+            _fail_run(db, other_id)
+        db.commit()
+        return cls(db, project_id, run.id)
+
+    def _reset(self) -> None:
+        self._scenes: List[Dict[str, Any]] = []
+        # To-dos and schedule entries of new scenes, keyed by the scene's position in ``_scenes``
+        self._todos: List[Tuple[int, Dict[str, Any]]] = []
+        self._entries: List[Tuple[int, Dict[str, Any]]] = []
+        self._updates: Dict[type, List[Mapping]] = {Scene: [], ToDo: [], ScheduleEntry: []}
+        self._retired_scene_ids: List[int] = []
+        self._retire_all = False
+        self._named_costs: Dict[type, Sequence[Tuple[str, float]]] = {}
+        self._registry: Optional[CharacterRegistry] = None
+        self._manifest: Optional[Tuple[int, str]] = None
+
+    def add_scene(
+        self,
+        index: int,
+        heading: Optional[str],
+        description: Optional[str],
+        word_count: int,
+        predicted_budget: float,
+        suggested_location: Optional[str],
+        script_id: Optional[int] = None,
+        content_hash: Optional[str] = None,
+    ) -> int:
+        """Queue a new scene; returns its slot for ``add_todo``/``add_schedule_entry`` and ``commit()``'s ids.
+
+        Scene numbers (``index``) must be unique among the scenes of one commit.
+        """
+        self._scenes.append(
+            {
+                "project_id": self.project_id,
+                "run_id": self.run_id,
+                "index": index,
+                "heading": heading,
+                "description": description,
+                "word_count": word_count,
+                "predicted_budget": predicted_budget,
+                "suggested_location": suggested_location,
+                "script_id": script_id,
+                "content_hash": content_hash,
+            }
+        )
+        return len(self._scenes) - 1
+
+    def add_todo(self, scene_slot: int, title: str, description: Optional[str], is_post_production: bool) -> None:
+        self._todos.append(
+            (scene_slot, {"title": title, "description": description, "is_post_production": is_post_production})
+        )
+
+    def add_schedule_entry(self, scene_slot: int, task: str, dates_json: str) -> None:
+        self._entries.append((scene_slot, {"task": task, "dates_json": dates_json}))
+
+    def update_scenes(self, rows: Sequence[Mapping]) -> None:
+        """Queue ``{"id": ..., column: value}`` updates of existing scenes."""
+        self._updates[Scene].extend(rows)
+
+    def update_todos(self, rows: Sequence[Mapping]) -> None:
+        self._updates[ToDo].extend(rows)
+
+    def update_schedule_entries(self, rows: Sequence[Mapping]) -> None:
+        self._updates[ScheduleEntry].extend(rows)
+
+    def delete_scenes(self, scene_ids: Sequence[int]) -> None:
+        """Queue scenes for removal together with the to-dos and schedule entries generated for them."""
+        self._retired_scene_ids.extend(scene_ids)
+
+    def replace_project_analysis(self) -> None:
+        """Retire every current scene, to-do, schedule entry, character, actor and property of the project."""
+        self._retire_all = True
+
+    def set_script_manifest(self, script_id: int, manifest: Sequence[Sequence]) -> None:
+        self._manifest = (script_id, json.dumps([list(entry) for entry in manifest]))
+
+    def replace_characters(self, registry: CharacterRegistry) -> None:
+        self._registry = registry
+
+    def sync_actors(self, costs: Sequence[Tuple[str, float]]) -> None:
+        """Keep actors whose name is still listed (updating the cost), drop the rest, add new names."""
+        self._named_costs[Actor] = costs
+
+    def sync_properties(self, costs: Sequence[Tuple[str, float]]) -> None:
+        self._named_costs[Property] = costs
+
+    def commit(self) -> List[int]:
+        """Write the run and make it the project's active one; returns the new scene ids in slot order.
+
+        On failure the run is marked failed and the project keeps its previous run.
+        """
+        try:
+            scene_ids, named_updates = self._insert_rows()
+            self.db.commit()
+            self._swap_in(named_updates)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            self.abort()
+            raise
+        finally:
+            self._reset()
+        return scene_ids
+
+    def abort(self) -> None:
+        """Mark the run failed, hiding whatever it already inserted."""
+        _fail_run(self.db, self.run_id)
+        self.db.commit()
+
+    def _insert_rows(self) -> Tuple[List[int], Dict[type, Tuple[List[Mapping], List[int]]]]:
+        db = self.db
+        scene_ids: List[int] = []
+        if self._scenes:
+            # Matched back by scene number: ordered RETURNING would make SQLite insert row by row.
+            returned = db.execute(insert(Scene).returning(Scene.id, Scene.index), self._scenes)
+            inserted = {index: scene_id for scene_id, index in returned}
+            scene_ids = [inserted[row["index"]] for row in self._scenes]
+        tags = {"project_id": self.project_id, "run_id": self.run_id}
+        for model, children in ((ToDo, self._todos), (ScheduleEntry, self._entries)):
+            if children:
+                db.execute(insert(model), [{**row, **tags, "scene_id": scene_ids[slot]} for slot, row in children])
+        if self._registry is not None:
+            rows = [{**tags, **record.to_row()} for record in self._registry]
+            if rows:
+                db.execute(insert(Character), rows)
+
+        named_updates = {}
+        for model, costs in self._named_costs.items():
+            updates, stale, new_rows = self._plan_named_costs(model, costs)
+            if new_rows:
+                db.execute(insert(model), [{**tags, **row} for row in new_rows])
+            named_updates[model] = (updates, stale)
+        return scene_ids, named_updates
+
+    def _swap_in(self, named_updates: Dict[type, Tuple[List[Mapping], List[int]]]) -> None:
+        db = self.db
+        # First write of the transaction: a run that was failed meanwhile must not come back as complete.
+        still_building = db.query(AnalysisRun).filter(AnalysisRun.id == self.run_id, AnalysisRun.status == RUN_BUILDING)
+        if not still_building.update({AnalysisRun.status: RUN_COMPLETE}, synchronize_session=False):
+            raise AnalysisRunAbandoned(f"Analysis run {self.run_id} was failed before it could be swapped in.")
+        for model, rows in self._updates.items():
+            if rows:
+                db.bulk_update_mappings(model, rows)
+        retire = {"retired_run_id": self.run_id}
+        if self._retire_all:
+            for model in RUN_TABLES:
+                _retire(live_rows(db.query(model), model, self.project_id), retire)
+        if self._retired_scene_ids:
+            ids = self._retired_scene_ids
+            for model in (ToDo, ScheduleEntry):
+                _retire(db.query(model).filter(model.scene_id.in_(ids), model.retired_run_id.is_(None)), retire)
+            _retire(db.query(Scene).filter(Scene.id.in_(ids)), retire)
+        if self._registry is not None and not self._retire_all:
+            _retire(live_rows(db.query(Character), Character, self.project_id), retire)
+        for model, (updates, stale) in named_updates.items():
+            if updates:
+                db.bulk_update_mappings(model, updates)
+            if stale:
+                _retire(db.query(model).filter(model.id.in_(stale)), retire)
+
+        if self._manifest is not None:
+            script_id, manifest = self._manifest
+            db.query(Script).filter(Script.id == script_id).update(
+                {Script.scene_manifest: manifest}, synchronize_session=False
+            )
+        # The swap: once this transaction commits, readers see the new run.
+        swapped = (
+            db.query(Project)
+            .filter(Project.id == self.project_id, Project.building_run_id == self.run_id)
+            .update({Project.active_run_id: self.run_id, Project.building_run_id: None}, synchronize_session=False)
+        )
+        if not swapped:
+            raise AnalysisRunAbandoned(f"Analysis run {self.run_id} no longer holds the project's claim.")
+        scene_count = live_rows(db.query(Scene.id), Scene, self.project_id).count()
+        db.query(AnalysisRun).filter(AnalysisRun.id == self.run_id).update(
+            {AnalysisRun.finished_at: datetime.utcnow(), AnalysisRun.scene_count: scene_count},
+            synchronize_session=False,
+        )
+
+    def _plan_named_costs(self, model, costs: Sequence[Tuple[str, float]]):
+        """(cost updates of kept rows, ids of rows to retire, new rows) for syncing ``model`` to ``costs``."""
+        wanted = dict(costs)
+        kept: Dict[str, int] = {}
+        stale: List[int] = []
+        if not self._retire_all:
+            for row_id, name in live_rows(self.db.query(model.id, model.name), model, self.project_id):
+                if name in wanted and name not in kept:
+                    kept[name] = row_id
+                else:
+                    stale.append(row_id)
+        updates = [{"id": row_id, "cost": wanted[name]} for name, row_id in kept.items()]
+        new_rows = [{"name": name, "cost": cost} for name, cost in costs if name not in kept]
+        return updates, stale, new_rows
+
+
+def _retire(query, values: Mapping) -> None:
+    query.update(values, synchronize_session=False)
+
+
+def _claim_project(db: Session, project_id: int, holder: Optional[int], run_id: int) -> bool:
+    """Point ``building_run_id`` at ``run_id`` if it still is ``holder``; only one concurrent caller wins."""
+    current = Project.building_run_id.is_(None) if holder is None else Project.building_run_id == holder
+    claimed = (
+        db.query(Project)
+        .filter(Project.id == project_id, current)
+        .update({Project.building_run_id: run_id}, synchronize_session=False)
+    )
+    return bool(claimed)
+
+
+def _fail_run(db: Session, run_id: int) -> None:
+    # A failed run's rows are retired by the run itself, which hides them whatever run is active.
+    for model in RUN_TABLES:
+        _retire(db.query(model).filter(model.run_id == run_id), {"retired_run_id": run_id})
+    db.query(AnalysisRun).filter(AnalysisRun.id == run_id).update(
+        {AnalysisRun.status: RUN_FAILED, AnalysisRun.finished_at: datetime.utcnow()}, synchronize_session=False
+    )
+    db.query(Project).filter(Project.building_run_id == run_id).update(
+        {Project.building_run_id: None}, synchronize_session=False
+    )
+
+
+def abandon_run(db: Session, run_id: int) -> bool:
+    """Fail ``run_id`` if it is still building (its writer is gone), releasing the project's claim.
+
+    Returns whether it was; the caller commits.
+    """
+    status = db.query(AnalysisRun.status).filter(AnalysisRun.id == run_id).scalar()
+    if status != RUN_BUILDING:
+        return False
+    _fail_run(db, run_id)
+    return True
+
+
+def collect_retired_rows(db: Session, project_id: int) -> int:
+    """Delete rows retired by the active (or an earlier) run and rows of failed runs; returns the count."""
+    active = db.query(Project.active_run_id).filter(Project.id == project_id).scalar() or 0
+    collectable = select(AnalysisRun.id).where(
+        AnalysisRun.project_id == project_id,
+        or_(AnalysisRun.id <= active, AnalysisRun.status == RUN_FAILED),
+    )
+    deleted = 0
+    for model in RUN_TABLES:
+        deleted += (
+            db.query(model)
+            .filter(model.project_id == project_id, model.retired_run_id.in_(collectable))
+            .delete(synchronize_session=False)
+        )
+    db.commit()
+    return deleted
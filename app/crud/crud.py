@@ -6,10 +6,14 @@ from collections import Counter
 from datetime import datetime, timedelta
 from typing import Iterable, Optional
 
+from sqlalchemy import func, or_, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.models.models import (
     Actor,
+    AnalysisJob,
+    Character,
     Crew,
     Finance,
     GlobalScript,
@@ -19,10 +23,14 @@ from app.models.models import (
     ScheduleEntry,
     Scene,
     Script,
+    ScriptBlob,
     Task,
     ToDo,
+    UploadSession,
     User,
 )
+from app.services import script_storage
+from app.services.character_registry import CharacterRegistry
 
 
 DEFAULT_CREW_ROLES = [
@@ -222,6 +230,114 @@ def create_script(db: Session, project_id: int, filename: str, filepath: str) ->
     return script
 
 
+def create_upload_session(
+    db: Session,
+    session_id: str,
+    project_id: int,
+    filename: str,
+    total_size: int,
+    created_by: Optional[int] = None,
+) -> UploadSession:
+    session = UploadSession(
+        id=session_id,
+        project_id=project_id,
+        filename=filename,
+        total_size=total_size,
+        committed_offset=0,
+        chunk_count=0,
+        created_by=created_by,
+    )
+    db.add(session)
+    db.commit()
+    db.refresh(session)
+    return session
+
+
+def get_upload_session(db: Session, project_id: int, session_id: str) -> Optional[UploadSession]:
+    return (
+        db.query(UploadSession)
+        .filter(UploadSession.id == session_id, UploadSession.project_id == project_id)
+        .first()
+    )
+
+
+def commit_upload_chunk(
+    db: Session,
+    session: UploadSession,
+    expected_offset: int,
+    length: int,
+    manifest_sha256: str,
+) -> bool:
+    """Advance the committed offset only if nobody else moved it since ``expected_offset``."""
+    updated = (
+        db.query(UploadSession)
+        .filter(UploadSession.id == session.id, UploadSession.committed_offset == expected_offset)
+        .update(
+            {
+                UploadSession.committed_offset: expected_offset + length,
+                UploadSession.chunk_count: UploadSession.chunk_count + 1,
+                UploadSession.manifest_sha256: manifest_sha256,
+                UploadSession.updated_at: datetime.utcnow(),
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    db.refresh(session)
+    return bool(updated)
+
+
+def complete_upload_session(db: Session, session: UploadSession, script_id: int) -> None:
+    session.script_id = script_id
+    session.updated_at = datetime.utcnow()
+    db.commit()
+
+
+def delete_upload_session(db: Session, session: UploadSession) -> None:
+    db.delete(session)
+    db.commit()
+
+
+def delete_stale_upload_sessions(db: Session, older_than: datetime) -> list[str]:
+    """Drop sessions untouched since ``older_than`` and return their ids (for part-file cleanup)."""
+    stale = [row.id for row in db.query(UploadSession.id).filter(UploadSession.updated_at < older_than)]
+    if stale:
+        db.query(UploadSession).filter(UploadSession.id.in_(stale)).delete(synchronize_session=False)
+        db.commit()
+    return stale
+
+
+def create_analysis_job(
+    db: Session,
+    job_id: str,
+    project_id: int,
+    filename: str,
+    script_id: Optional[int] = None,
+    created_by: Optional[int] = None,
+) -> AnalysisJob:
+    job = AnalysisJob(
+        id=job_id,
+        project_id=project_id,
+        script_id=script_id,
+        filename=filename,
+        status="queued",
+        progress=0,
+        created_by=created_by,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_analysis_job(db: Session, project_id: int, job_id: str) -> Optional[AnalysisJob]:
+    return (
+        db.query(AnalysisJob)
+        .filter(AnalysisJob.id == job_id, AnalysisJob.project_id == project_id)
+        .first()
+    )
+
+
 def get_latest_script(db: Session, project_id: int) -> Optional[Script]:
     return (
         db.query(Script)
@@ -231,27 +347,85 @@ def get_latest_script(db: Session, project_id: int) -> Optional[Script]:
     )
 
 
+def get_script_by_id(db: Session, project_id: int, script_id: int) -> Optional[Script]:
+    return db.query(Script).filter(Script.id == script_id, Script.project_id == project_id).first()
+
+
+def get_latest_script_by_filename(db: Session, project_id: int, filename: str) -> Optional[Script]:
+    return (
+        db.query(Script)
+        .filter(Script.project_id == project_id, Script.filename == filename)
+        .order_by(Script.uploaded_at.desc(), Script.id.desc())
+        .first()
+    )
+
+
+def get_previous_analysed_script(db: Session, project_id: int, script_id: int) -> Optional[Script]:
+    """The newest script version before ``script_id`` that has a scene manifest."""
+    return (
+        db.query(Script)
+        .filter(Script.project_id == project_id, Script.id < script_id, Script.scene_manifest.isnot(None))
+        .order_by(Script.id.desc())
+        .first()
+    )
+
+
 def delete_scripts_for_project(db: Session, project_id: int) -> None:
     db.query(Script).filter(Script.project_id == project_id).delete()
     db.commit()
 
 
+def get_active_run_id(db: Session, project_id: int) -> int:
+    """The project's active analysis run, ``0`` before its first analysis."""
+    return db.query(Project.active_run_id).filter(Project.id == project_id).scalar() or 0
+
+
+def live_rows(query, model, project_id: int, active_run_id: Optional[int] = None):
+    """Restrict ``query`` to the project's rows of ``model`` that readers see.
+
+    Those are rows created by hand (no ``run_id``) and rows written by the
+    project's active analysis run or an earlier one, unless a run up to the
+    active one has retired them (see ``app.crud.bulk``). The active run is
+    read in the same statement, so one query never mixes two runs; a reader
+    of several lists passes the ``active_run_id`` it read once, so the lists
+    agree with each other too.
+    """
+    if active_run_id is None:
+        active = func.coalesce(select(Project.active_run_id).where(Project.id == project_id).scalar_subquery(), 0)
+    else:
+        active = active_run_id
+    return query.filter(
+        model.project_id == project_id,
+        or_(model.run_id.is_(None), model.run_id <= active),
+        or_(model.retired_run_id.is_(None), model.retired_run_id > active),
+    )
+
+
 def create_scene(
     db: Session,
     project_id: int,
     index: int,
     heading: Optional[str] = None,
     description: Optional[str] = None,
+    script_id: Optional[int] = None,
+    content_hash: Optional[str] = None,
 ) -> Scene:
-    scene = Scene(project_id=project_id, index=index, heading=heading, description=description)
+    scene = Scene(
+        project_id=project_id,
+        index=index,
+        heading=heading,
+        description=description,
+        script_id=script_id,
+        content_hash=content_hash,
+    )
     db.add(scene)
     db.commit()
     db.refresh(scene)
     return scene
 
 
-def get_scenes_by_project(db: Session, project_id: int) -> Iterable[Scene]:
-    return db.query(Scene).filter(Scene.project_id == project_id).order_by(Scene.index.asc()).all()
+def get_scenes_by_project(db: Session, project_id: int, active_run_id: Optional[int] = None) -> Iterable[Scene]:
+    return live_rows(db.query(Scene), Scene, project_id, active_run_id).order_by(Scene.index.asc()).all()
 
 
 def get_scene_by_id(db: Session, scene_id: int) -> Optional[Scene]:
@@ -270,15 +444,6 @@ def update_scene(db: Session, scene_id: int, **kwargs) -> Optional[Scene]:
     return scene
 
 
-def clear_project_analysis(db: Session, project_id: int) -> None:
-    db.query(Scene).filter(Scene.project_id == project_id).delete()
-    db.query(ToDo).filter(ToDo.project_id == project_id).delete()
-    db.query(Actor).filter(Actor.project_id == project_id).delete()
-    db.query(Property).filter(Property.project_id == project_id).delete()
-    db.query(ScheduleEntry).filter(ScheduleEntry.project_id == project_id).delete()
-    db.commit()
-
-
 # ---------------------------------------------------------------------------
 # To-do helpers
 # ---------------------------------------------------------------------------
@@ -290,12 +455,14 @@ def create_todo(
     title: str,
     description: Optional[str] = None,
     is_post_production: bool = False,
+    scene_id: Optional[int] = None,
 ) -> ToDo:
     todo = ToDo(
         project_id=project_id,
         title=title,
         description=description,
         is_post_production=is_post_production,
+        scene_id=scene_id,
     )
     db.add(todo)
     db.commit()
@@ -303,8 +470,8 @@ def create_todo(
     return todo
 
 
-def get_todos_by_project(db: Session, project_id: int) -> Iterable[ToDo]:
-    return db.query(ToDo).filter(ToDo.project_id == project_id).order_by(ToDo.id.asc()).all()
+def get_todos_by_project(db: Session, project_id: int, active_run_id: Optional[int] = None) -> Iterable[ToDo]:
+    return live_rows(db.query(ToDo), ToDo, project_id, active_run_id).order_by(ToDo.id.asc()).all()
 
 
 def get_todo_by_id(db: Session, todo_id: int) -> Optional[ToDo]:
@@ -353,12 +520,20 @@ def create_property(db: Session, project_id: int, name: str, cost: float = 0.0)
     return prop
 
 
-def get_actors_by_project(db: Session, project_id: int) -> Iterable[Actor]:
-    return db.query(Actor).filter(Actor.project_id == project_id).order_by(Actor.id.asc()).all()
+def get_actors_by_project(db: Session, project_id: int, active_run_id: Optional[int] = None) -> Iterable[Actor]:
+    return live_rows(db.query(Actor), Actor, project_id, active_run_id).order_by(Actor.id.asc()).all()
+
 
+def get_properties_by_project(db: Session, project_id: int, active_run_id: Optional[int] = None) -> Iterable[Property]:
+    return live_rows(db.query(Property), Property, project_id, active_run_id).order_by(Property.id.asc()).all()
 
-def get_properties_by_project(db: Session, project_id: int) -> Iterable[Property]:
-    return db.query(Property).filter(Property.project_id == project_id).order_by(Property.id.asc()).all()
+
+def get_characters_by_project(db: Session, project_id: int, active_run_id: Optional[int] = None) -> list[Character]:
+    return live_rows(db.query(Character), Character, project_id, active_run_id).order_by(Character.id.asc()).all()
+
+
+def get_character_registry(db: Session, project_id: int, active_run_id: Optional[int] = None) -> CharacterRegistry:
+    return CharacterRegistry.from_rows(get_characters_by_project(db, project_id, active_run_id))
 
 
 # ---------------------------------------------------------------------------
@@ -366,16 +541,25 @@ def get_properties_by_project(db: Session, project_id: int) -> Iterable[Property
 # ---------------------------------------------------------------------------
 
 
-def create_schedule_entry(db: Session, project_id: int, task: str, dates_json: str) -> ScheduleEntry:
-    schedule = ScheduleEntry(project_id=project_id, task=task, dates_json=dates_json)
+def create_schedule_entry(
+    db: Session,
+    project_id: int,
+    task: str,
+    dates_json: str,
+    scene_id: Optional[int] = None,
+) -> ScheduleEntry:
+    schedule = ScheduleEntry(project_id=project_id, task=task, dates_json=dates_json, scene_id=scene_id)
     db.add(schedule)
     db.commit()
     db.refresh(schedule)
     return schedule
 
 
-def get_schedule_by_project(db: Session, project_id: int) -> Iterable[ScheduleEntry]:
-    return db.query(ScheduleEntry).filter(ScheduleEntry.project_id == project_id).order_by(ScheduleEntry.id.asc()).all()
+def get_schedule_by_project(
+    db: Session, project_id: int, active_run_id: Optional[int] = None
+) -> Iterable[ScheduleEntry]:
+    query = live_rows(db.query(ScheduleEntry), ScheduleEntry, project_id, active_run_id)
+    return query.order_by(ScheduleEntry.id.asc()).all()
 
 
 def create_reminder(db: Session, project_id: int, remind_date: str, message: str) -> Reminder:
@@ -426,26 +610,77 @@ def summarise_locations(scenes: Iterable[Scene]) -> Iterable[str]:
 # Global Script helpers
 # ---------------------------------------------------------------------------
 
+def get_or_create_script_blob(db: Session, text: str) -> ScriptBlob:
+    """Return the stored body for ``text``, compressing and inserting it only if it is new."""
+    digest = script_storage.text_digest(text)
+    blob = db.query(ScriptBlob).filter(ScriptBlob.sha256 == digest).first()
+    if blob:
+        return blob
+    codec, payload = script_storage.encode_text(text)
+    blob = ScriptBlob(
+        sha256=digest,
+        codec=codec,
+        size=len(text.encode("utf-8")),
+        stored_size=len(payload),
+        data=payload,
+    )
+    try:
+        # A savepoint, so losing the race below leaves the caller's own pending work in place.
+        with db.begin_nested():
+            db.add(blob)
+    except IntegrityError:
+        # Another request stored the same content first; share its row.
+        return db.query(ScriptBlob).filter(ScriptBlob.sha256 == digest).one()
+    return blob
+
+
+def _delete_orphaned_blob(db: Session, blob_id: Optional[int]) -> None:
+    if blob_id is None:
+        return
+    still_used = db.query(GlobalScript.id).filter(GlobalScript.blob_id == blob_id).first()
+    if not still_used:
+        db.query(ScriptBlob).filter(ScriptBlob.id == blob_id).delete(synchronize_session=False)
+        db.commit()
+
+
 def create_global_script(db: Session, filename: str, content: str, uploaded_by: Optional[int] = None) -> GlobalScript:
+    """Record ``content`` (cleaned script text) under ``filename``; identical text shares one blob."""
+    blob = get_or_create_script_blob(db, content) if content else None
+    blob_id = blob.id if blob else None
     existing = get_global_script_by_filename(db, filename)
     if existing:
-        existing.content = content
+        previous_blob_id = existing.blob_id
+        existing.blob_id = blob_id
+        existing.content = None
         existing.uploaded_by = uploaded_by
         existing.uploaded_at = datetime.utcnow()
         db.commit()
         db.refresh(existing)
+        if previous_blob_id != blob_id:
+            _delete_orphaned_blob(db, previous_blob_id)
         return existing
 
-    script = GlobalScript(filename=filename, content=content, uploaded_by=uploaded_by)
+    script = GlobalScript(filename=filename, blob_id=blob_id, uploaded_by=uploaded_by)
     db.add(script)
     db.commit()
     db.refresh(script)
     return script
 
+def fill_global_script_text(db: Session, filename: str, content: str) -> Optional[GlobalScript]:
+    """Store ``content`` for a global script recorded without text (uploads defer extraction to analysis)."""
+    script = get_global_script_by_filename(db, filename)
+    if script is None or script.blob_id is not None or not content:
+        return script
+    script.blob_id = get_or_create_script_blob(db, content).id
+    script.content = None
+    db.commit()
+    return script
+
 def get_global_script_by_filename(db: Session, filename: str) -> Optional[GlobalScript]:
     return db.query(GlobalScript).filter(GlobalScript.filename == filename).first()
 
 def get_all_global_scripts(db: Session) -> list[GlobalScript]:
+    # ``content`` and the blob bodies are deferred, so listings never read script text.
     return db.query(GlobalScript).order_by(GlobalScript.uploaded_at.desc()).all()
 
 
@@ -458,8 +693,8 @@ def get_finances_by_project(db: Session, project_id: int) -> list[Finance]:
     return db.query(Finance).filter(Finance.project_id == project_id).all()
 
 
-def get_budget_per_scene(db: Session, project_id: int) -> list[dict]:
-    scenes = get_scenes_by_project(db, project_id)
+def get_budget_per_scene(db: Session, project_id: int, active_run_id: Optional[int] = None) -> list[dict]:
+    scenes = get_scenes_by_project(db, project_id, active_run_id)
     return [{"scene": scene.heading or f"Scene {scene.index}", "budget": scene.predicted_budget} for scene in scenes]
 
 
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -9,10 +9,20 @@ DEFAULT_SQLITE_URL = "sqlite:///./project.db"
 
 def _build_engine(database_url: str):
     if database_url.startswith("sqlite"):
-        return create_engine(database_url, connect_args={"check_same_thread": False})
+        engine = create_engine(database_url, connect_args={"check_same_thread": False})
+        if engine.url.database not in (None, "", ":memory:"):
+            # WAL lets readers keep serving the active analysis run while a new one is written.
+            event.listen(engine, "connect", _enable_wal)
+        return engine
     return create_engine(database_url)
 
 
+def _enable_wal(dbapi_connection, _connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
+
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", DEFAULT_SQLITE_URL)
 
 engine = _build_engine(SQLALCHEMY_DATABASE_URL)
@@ -1,17 +1,23 @@
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
 from typing import Any
 
-from fastapi import Body, Depends, FastAPI, File, HTTPException, UploadFile
+import anyio
+from fastapi import BackgroundTasks, Body, Depends, FastAPI, File, HTTPException, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 import json
-import joblib
-from pathlib import Path, Path as _Path
+from pathlib import Path
 import uvicorn
 from sqlalchemy import inspect, text
 from sqlalchemy.orm import Session
 
+from ai.model_registry import MODELS_DIR, get_registry
 from app import ai_integration, auth, auth_supabase, schemas
-from app.crud import crud
+from app.crud import bulk, crud
 from app.database.database import Base, SessionLocal, engine
+from app.services.extraction_cache import get_extraction_cache
+from app.services import analysis_jobs, scene_diff, uploads, worker_pool
 from app.services.project_snapshot import build_project_snapshot, build_project_reports
 from app.models.models import Project
 
@@ -27,7 +33,63 @@ def _ensure_script_filepath_column() -> None:
             connection.execute(text("ALTER TABLE scripts ADD COLUMN filepath VARCHAR"))
 
 
+def _ensure_global_script_blob_column() -> None:
+    inspector = inspect(engine)
+    columns = {column["name"] for column in inspector.get_columns("global_scripts")}
+    if "blob_id" not in columns:
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE global_scripts ADD COLUMN blob_id INTEGER REFERENCES script_blobs(id)"))
+
+
+def _ensure_scene_revision_columns() -> None:
+    inspector = inspect(engine)
+    wanted = {
+        "scripts": {"scene_manifest": "TEXT"},
+        "scenes": {"content_hash": "VARCHAR(64)"},
+        "todos": {"scene_id": "INTEGER REFERENCES scenes(id)"},
+        "schedules": {"scene_id": "INTEGER REFERENCES scenes(id)"},
+    }
+    with engine.begin() as connection:
+        for table, additions in wanted.items():
+            columns = {column["name"] for column in inspector.get_columns(table)}
+            for name, ddl in additions.items():
+                if name not in columns:
+                    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+
+
+def _ensure_analysis_run_columns() -> None:
+    inspector = inspect(engine)
+    run_columns = {
+        "run_id": "INTEGER REFERENCES analysis_runs(id)",
+        "retired_run_id": "INTEGER REFERENCES analysis_runs(id)",
+    }
+    wanted = {table: run_columns for table in ("scenes", "todos", "schedules", "actors", "properties", "characters")}
+    wanted["projects"] = {"active_run_id": "INTEGER", "building_run_id": "INTEGER"}
+    wanted["analysis_jobs"] = {"run_id": "INTEGER REFERENCES analysis_runs(id)"}
+    with engine.begin() as connection:
+        for table, additions in wanted.items():
+            columns = {column["name"] for column in inspector.get_columns(table)}
+            for name, ddl in additions.items():
+                if name not in columns:
+                    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+
+
+def _ensure_upload_session_script_column() -> None:
+    inspector = inspect(engine)
+    columns = {column["name"] for column in inspector.get_columns("upload_sessions")}
+    if "script_id" not in columns:
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE upload_sessions ADD COLUMN script_id INTEGER REFERENCES scripts(id)"))
+
+
 _ensure_script_filepath_column()
+_ensure_global_script_blob_column()
+_ensure_scene_revision_columns()
+_ensure_analysis_run_columns()
+_ensure_upload_session_script_column()
+
+# Upper bound for the ?limit= of the script preview endpoint
+MAX_PREVIEW_SCENES = 50
 
 app = FastAPI(title="CineHack Backend - Irene (backend)")
 
@@ -41,12 +103,23 @@ app.add_middleware(
 from app import worker
 
 
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    # Refuse before the multipart body is spooled when the client declares its size
+    if request.method == "POST" and request.url.path.endswith("/upload_script"):
+        declared = request.headers.get("content-length")
+        if declared and declared.isdigit() and int(declared) > uploads.max_upload_bytes():
+            return JSONResponse(status_code=413, content={"detail": "Upload exceeds the configured size limit"})
+    return await call_next(request)
+
+
 @app.on_event("startup")
 def startup_event():
     try:
         worker.start_worker()
     except Exception:
         pass
+    analysis_jobs.start_dispatcher(SessionLocal)
 
 
 @app.on_event("shutdown")
@@ -55,6 +128,8 @@ def shutdown_event():
         worker.stop_worker()
     except Exception:
         pass
+    analysis_jobs.stop_dispatcher()
+    worker_pool.shutdown_process_pool()
 
 # Dependency to get DB session
 def get_db():
@@ -87,6 +162,11 @@ def ensure_project_view_access(user: Any, project: Project) -> None:
 def read_root():
     return {"status": "ok", "message": "CineHack backend running. Open /docs for interactive API docs."}
 
+
+@app.get("/metrics", tags=["root"])
+def read_metrics():
+    return {"extraction_cache": get_extraction_cache().stats(), "models": get_registry().stats()}
+
 # ---------- Project endpoints ----------
 @app.post("/projects/", response_model=schemas.ProjectRead)
 def create_project(
@@ -112,26 +192,147 @@ async def upload_script(project_id: int, file: UploadFile = File(...), db: Sessi
     if not project:
         raise HTTPException(status_code=404, detail='Project not found')
     ensure_project_edit_access(user, project)
-    uploads = Path.cwd() / 'uploads'
-    uploads.mkdir(exist_ok=True)
     # sanitize filename
     filename = Path(file.filename).name
-    filepath = uploads / filename
-    # save uploaded file
-    with open(filepath, 'wb') as out_f:
-        content = await file.read()
-        out_f.write(content)
-    # Also save to global scripts
-    content_str = content.decode('utf-8', errors='ignore')
-    crud.create_global_script(db, filename=filename, content=content_str, uploaded_by=getattr(user, "id", None))
+    filepath = uploads.uploads_dir() / filename
+    # stream the upload to disk chunk by chunk
+    try:
+        await uploads.stream_upload_to_disk(file, filepath)
+    except uploads.UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    return await _register_uploaded_script(db, project_id, filename, filepath, user)
+
+
+async def _register_uploaded_script(db: Session, project_id: int, filename: str, filepath: Path, user: Any):
+    # Also record it in global scripts; the cleaned text is filled in by the first analysis,
+    # so the upload request never waits for extraction
+    crud.create_global_script(db, filename=filename, content='', uploaded_by=getattr(user, "id", None))
     return crud.create_script(db, project_id=project_id, filename=filename, filepath=str(filepath))
 
 
+# Resumable uploads: create a session, PUT byte ranges, GET the committed offset, then complete
+def _get_editable_upload_session(db: Session, project_id: int, upload_id: str, user: Any):
+    project = crud.get_project_by_id(db, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail='Project not found')
+    ensure_project_edit_access(user, project)
+    session = crud.get_upload_session(db, project_id, upload_id)
+    if not session:
+        raise HTTPException(status_code=404, detail='Upload session not found')
+    return session
+
+
+@app.post("/projects/{project_id}/uploads", response_model=schemas.UploadSessionRead, status_code=201)
+async def create_upload_session(project_id: int, payload: schemas.UploadSessionCreate, db: Session = Depends(get_db), user = Depends(auth_supabase.get_current_user_from_supabase)):
+    project = crud.get_project_by_id(db, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail='Project not found')
+    ensure_project_edit_access(user, project)
+    if payload.total_size <= 0:
+        raise HTTPException(status_code=400, detail='total_size must be positive')
+    if payload.total_size > uploads.max_upload_bytes():
+        raise HTTPException(status_code=413, detail='Upload exceeds the configured size limit')
+    cutoff = datetime.utcnow() - timedelta(hours=uploads.upload_session_ttl_hours())
+    for stale_id in crud.delete_stale_upload_sessions(db, cutoff):
+        await uploads.discard_session_files(stale_id)
+    return crud.create_upload_session(
+        db,
+        session_id=uploads.new_session_id(),
+        project_id=project_id,
+        filename=Path(payload.filename).name,
+        total_size=payload.total_size,
+        created_by=getattr(user, "id", None),
+    )
+
+
+@app.get("/projects/{project_id}/uploads/{upload_id}", response_model=schemas.UploadSessionRead)
+def get_upload_session(project_id: int, upload_id: str, db: Session = Depends(get_db), user = Depends(auth_supabase.get_current_user_from_supabase)):
+    return _get_editable_upload_session(db, project_id, upload_id, user)
+
+
+@app.put("/projects/{project_id}/uploads/{upload_id}", response_model=schemas.UploadSessionRead)
+async def put_upload_chunk(project_id: int, upload_id: str, request: Request, db: Session = Depends(get_db), user = Depends(auth_supabase.get_current_user_from_supabase)):
+    session = _get_editable_upload_session(db, project_id, upload_id, user)
+    try:
+        start, length = uploads.parse_content_range(request.headers.get("content-range"), session.total_size)
+        # Writing the range and committing it is one unit per session: a concurrent or retried
+        # request for the same offset gets a 409 instead of overwriting bytes being written.
+        async with uploads.lock_session(session.id):
+            session = _reload_upload_session(db, project_id, upload_id, user)
+            if start != session.committed_offset:
+                raise uploads.OffsetMismatch(session.committed_offset)
+            chunk_sha256 = await uploads.append_chunk(
+                uploads.session_part_path(session.id),
+                start,
+                request.stream(),
+                length,
+                expected_sha256=request.headers.get("x-chunk-sha256"),
+            )
+            manifest = uploads.chain_digest(session.manifest_sha256, chunk_sha256)
+            if not crud.commit_upload_chunk(db, session, start, length, manifest):
+                raise uploads.OffsetMismatch(session.committed_offset)
+    except uploads.SessionBusy as exc:
+        return JSONResponse(status_code=409, content={"detail": str(exc), "committed_offset": session.committed_offset})
+    except uploads.OffsetMismatch as exc:
+        return JSONResponse(status_code=409, content={"detail": str(exc), "committed_offset": exc.expected})
+    except uploads.ChunkRejected as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return session
+
+
+def _reload_upload_session(db: Session, project_id: int, upload_id: str, user: Any):
+    # Re-read under the session lock: another request may have moved or finished it meanwhile.
+    db.expire_all()
+    return _get_editable_upload_session(db, project_id, upload_id, user)
+
+
+@app.post("/projects/{project_id}/uploads/{upload_id}/complete", response_model=schemas.ScriptRead)
+async def complete_upload(project_id: int, upload_id: str, db: Session = Depends(get_db), user = Depends(auth_supabase.get_current_user_from_supabase)):
+    session = _get_editable_upload_session(db, project_id, upload_id, user)
+    try:
+        async with uploads.lock_session(session.id):
+            session = _reload_upload_session(db, project_id, upload_id, user)
+            if session.script_id is not None:
+                # Completed before (e.g. a retried request): hand back the script it published.
+                script = crud.get_script_by_id(db, project_id, session.script_id)
+                if script:
+                    return script
+                raise HTTPException(status_code=409, detail="Upload was already completed")
+            if session.committed_offset != session.total_size:
+                return JSONResponse(
+                    status_code=409,
+                    content={"detail": "Upload is incomplete", "committed_offset": session.committed_offset},
+                )
+            part_path = anyio.Path(uploads.session_part_path(session.id))
+            if not await part_path.exists():
+                raise HTTPException(status_code=409, detail="Upload data is no longer available; start a new upload")
+            filename = session.filename
+            filepath = uploads.uploads_dir() / filename
+            # The part file already holds every verified byte: publishing it is a rename, not a copy.
+            await part_path.replace(filepath)
+            script = await _register_uploaded_script(db, project_id, filename, filepath, user)
+            crud.complete_upload_session(db, session, script.id)
+            await uploads.discard_session_files(session.id)
+            return script
+    except uploads.SessionBusy as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+
+@app.delete("/projects/{project_id}/uploads/{upload_id}", status_code=204)
+async def cancel_upload(project_id: int, upload_id: str, db: Session = Depends(get_db), user = Depends(auth_supabase.get_current_user_from_supabase)):
+    session = _get_editable_upload_session(db, project_id, upload_id, user)
+    try:
+        async with uploads.lock_session(session.id):
+            await uploads.discard_session_files(session.id)
+            crud.delete_upload_session(db, session)
+    except uploads.SessionBusy as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+
 # Trigger AI analysis of an uploaded script
 @app.post("/projects/{project_id}/analyze_script")
-def analyze_script(project_id: int, filename: str = Body(..., embed=True), db: Session = Depends(get_db), user = Depends(auth_supabase.get_current_user_from_supabase)):
-    uploads = Path.cwd() / 'uploads'
-    filepath = uploads / filename
+def analyze_script(project_id: int, background_tasks: BackgroundTasks, filename: str = Body(..., embed=True), db: Session = Depends(get_db), user = Depends(auth_supabase.get_current_user_from_supabase)):
+    filepath = uploads.uploads_dir() / filename
     if not filepath.exists():
         raise HTTPException(status_code=400, detail="Uploaded script file not found on server uploads/ directory")
     project = crud.get_project_by_id(db, project_id)
@@ -139,9 +340,19 @@ def analyze_script(project_id: int, filename: str = Body(..., embed=True), db: S
         raise HTTPException(status_code=404, detail='Project not found')
     ensure_project_edit_access(user, project)
     try:
-        analysis = ai_integration.analyze_and_create(db, project_id=project_id, script_path=str(filepath))
+        script = crud.get_latest_script_by_filename(db, project_id, filename)
+        analysis = ai_integration.analyze_and_create(
+            db,
+            project_id=project_id,
+            script_path=str(filepath),
+            script_id=script.id if script else None,
+        )
     except ai_integration.ScriptExtractionError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
+    except bulk.AnalysisInProgress as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    # Rows the new run replaced are deleted after the response, off the request path.
+    background_tasks.add_task(_collect_analysis_garbage, db.get_bind(), project_id)
     snapshot = build_project_snapshot(db, project)
     response_payload = {**analysis, "snapshot": snapshot}
     # Maintain backwards compatibility with legacy clients expecting created_scenes key
@@ -149,6 +360,59 @@ def analyze_script(project_id: int, filename: str = Body(..., embed=True), db: S
     return response_payload
 
 
+def _collect_analysis_garbage(bind, project_id: int) -> None:
+    with Session(bind=bind) as db:
+        bulk.collect_retired_rows(db, project_id)
+
+
+# Queued analysis: submit returns a job id at once, the job workers run it, then poll its status and fetch the result
+def _get_viewable_analysis_job(db: Session, project_id: int, job_id: str, user: Any):
+    project = crud.get_project_by_id(db, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail='Project not found')
+    ensure_project_view_access(user, project)
+    job = crud.get_analysis_job(db, project_id, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail='Analysis job not found')
+    return project, job
+
+
+@app.post("/projects/{project_id}/analysis_jobs", response_model=schemas.AnalysisJobRead, status_code=202)
+def submit_analysis_job(project_id: int, filename: str = Body(..., embed=True), db: Session = Depends(get_db), user = Depends(auth_supabase.get_current_user_from_supabase)):
+    filename = Path(filename).name
+    if not (uploads.uploads_dir() / filename).exists():
+        raise HTTPException(status_code=400, detail="Uploaded script file not found on server uploads/ directory")
+    project = crud.get_project_by_id(db, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail='Project not found')
+    ensure_project_edit_access(user, project)
+    script = crud.get_latest_script_by_filename(db, project_id, filename)
+    return crud.create_analysis_job(
+        db,
+        job_id=analysis_jobs.new_job_id(),
+        project_id=project_id,
+        filename=filename,
+        script_id=script.id if script else None,
+        created_by=getattr(user, "id", None),
+    )
+
+
+@app.get("/projects/{project_id}/analysis_jobs/{job_id}", response_model=schemas.AnalysisJobRead)
+def get_analysis_job(project_id: int, job_id: str, db: Session = Depends(get_db), user = Depends(auth_supabase.get_current_user_from_supabase)):
+    return _get_viewable_analysis_job(db, project_id, job_id, user)[1]
+
+
+@app.get("/projects/{project_id}/analysis_jobs/{job_id}/result")
+def get_analysis_job_result(project_id: int, job_id: str, db: Session = Depends(get_db), user = Depends(auth_supabase.get_current_user_from_supabase)):
+    project, job = _get_viewable_analysis_job(db, project_id, job_id, user)
+    if job.status == analysis_jobs.FAILED:
+        raise HTTPException(status_code=409, detail=f"Analysis job failed: {job.error}")
+    if job.status != analysis_jobs.SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Analysis job is {job.status}")
+    # Same shape as the synchronous analyze_script response, with the snapshot as of now
+    return {**analysis_jobs.job_result(job), "snapshot": build_project_snapshot(db, project)}
+
+
 # User management
 @app.post("/users/", response_model=schemas.UserRead)
 def create_user(payload: schemas.UserCreateWithPassword, db: Session = Depends(get_db)):
@@ -178,6 +442,99 @@ def get_scenes(project_id: int, db: Session = Depends(get_db)):
     return crud.get_scenes_by_project(db, project_id)
 
 
+@app.get("/projects/{project_id}/scripts/{script_id}/diff", response_model=schemas.ScriptDiff)
+def get_script_diff(project_id: int, script_id: int, against: int | None = None, db: Session = Depends(get_db), user = Depends(auth_supabase.get_current_user_from_supabase)):
+    project = crud.get_project_by_id(db, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail='Project not found')
+    ensure_project_view_access(user, project)
+    script = crud.get_script_by_id(db, project_id, script_id)
+    if not script:
+        raise HTTPException(status_code=404, detail='Script not found')
+    if script.scene_manifest is None:
+        raise HTTPException(status_code=409, detail='Script has not been analysed yet')
+    if against is None:
+        base = crud.get_previous_analysed_script(db, project_id, script_id)
+    else:
+        base = crud.get_script_by_id(db, project_id, against)
+        if not base:
+            raise HTTPException(status_code=404, detail='Base script not found')
+        if base.scene_manifest is None:
+            raise HTTPException(status_code=409, detail='Base script has not been analysed yet')
+    # manifest entries are [content_hash, heading, scene_no]
+    old = json.loads(base.scene_manifest) if base else []
+    new = json.loads(script.scene_manifest)
+    changes = scene_diff.align_scenes([tuple(entry[:2]) for entry in old], [tuple(entry[:2]) for entry in new])
+    # Scene.script_id records which version last wrote each live scene row. Scenes can share
+    # a content hash, so each hash keeps its rows in scene order and hands them out in turn.
+    live = defaultdict(deque)
+    for scene in crud.get_scenes_by_project(db, project_id):
+        live[scene.content_hash].append(scene)
+    payload = []
+    for change in changes:
+        rows = live.get(new[change.new][0]) if change.new is not None else None
+        row = rows.popleft() if rows else None
+        heading = new[change.new][1] if change.new is not None else old[change.old][1]
+        payload.append(
+            schemas.SceneChangeRead(
+                change=change.kind,
+                scene_no=new[change.new][2] if change.new is not None else None,
+                previous_scene_no=old[change.old][2] if change.old is not None else None,
+                heading=heading,
+                scene_id=row.id if row else None,
+                changed_in_script_id=row.script_id if row else None,
+            )
+        )
+    return schemas.ScriptDiff(
+        script_id=script_id,
+        base_script_id=base.id if base else None,
+        summary=scene_diff.summarise(changes),
+        changes=payload,
+    )
+
+
+@app.get("/projects/{project_id}/scripts/{script_id}/preview", response_model=schemas.ScriptPreview)
+def preview_script(project_id: int, script_id: int, limit: int = Query(5, ge=1, le=MAX_PREVIEW_SCENES), db: Session = Depends(get_db), user = Depends(auth_supabase.get_current_user_from_supabase)):
+    project = crud.get_project_by_id(db, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail='Project not found')
+    ensure_project_view_access(user, project)
+    script = crud.get_script_by_id(db, project_id, script_id)
+    if not script:
+        raise HTTPException(status_code=404, detail='Script not found')
+    # only the first scenes are parsed, so this stays cheap for long scripts
+    filepath = script.filepath or str(uploads.uploads_dir() / script.filename)
+    try:
+        preview = ai_integration.preview_script_scenes(filepath, limit)
+    except ai_integration.ScriptExtractionError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return schemas.ScriptPreview(script_id=script_id, **preview)
+
+
+@app.get("/projects/{project_id}/characters", response_model=list[schemas.CharacterRead])
+def get_characters(project_id: int, scene: int | None = None, db: Session = Depends(get_db), user = Depends(auth_supabase.get_current_user_from_supabase)):
+    project = crud.get_project_by_id(db, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail='Project not found')
+    ensure_project_view_access(user, project)
+    registry = crud.get_character_registry(db, project_id)
+    records = registry.most_common()
+    if scene is not None:
+        # cast of one scene: a single bit test per character
+        records = [record for record in records if record.appears_in(scene)]
+    return [
+        schemas.CharacterRead(
+            name=record.name,
+            aliases=sorted(record.aliases),
+            scenes=record.scene_indices,
+            scene_count=record.scene_count,
+            dialogue_lines=record.dialogue_lines,
+            dialogue_by_scene=record.dialogue_by_scene,
+        )
+        for record in records
+    ]
+
+
 @app.get("/projects/{project_id}/snapshot", response_model=schemas.ProjectSnapshot)
 def get_project_snapshot(project_id: int, db: Session = Depends(get_db), user = Depends(auth_supabase.get_current_user_from_supabase)):
     project = crud.get_project_by_id(db, project_id)
@@ -208,35 +565,25 @@ def assign_tasks_ai(project_id: int, db: Session = Depends(get_db), user = Depen
     # require admin
     if not getattr(user, 'is_admin', False):
         raise HTTPException(status_code=403, detail='Admin privileges required')
-    # load task assigner model if present
-    model_path = _Path.cwd() / 'ai' / 'models' / 'task_assigner.pkl'
-    if model_path.exists():
-        try:
-            model = joblib.load(model_path)
-        except Exception:
-            model = None
-    else:
-        model = None
+    # task assigner model, if present (loaded once per process, reloaded when the file changes)
+    try:
+        model_entry = get_registry().get(MODELS_DIR / 'task_assigner.pkl')
+    except Exception:
+        model_entry = None
 
-    scenes = crud.get_scenes_by_project(db, project_id)
+    scenes = list(crud.get_scenes_by_project(db, project_id))
     crews = crud.get_crews(db)
     crew_names = [c.name for c in crews]
-    assignments = []
-    for s in scenes:
-        # simple features
-        X = [[s.word_count or 0, 0.1, 1]]
-        assigned = None
-        if model is not None:
-            try:
-                pred = model.predict(X)
-                idx = int(pred[0]) % max(1, len(crew_names))
-                assigned = crew_names[idx]
-            except Exception:
-                assigned = crew_names[0] if crew_names else None
-        else:
-            assigned = crew_names[0] if crew_names else None
-        assignments.append({'scene_id': s.id, 'assigned': assigned})
-    return {'assignments': assignments}
+    assigned = [crew_names[0] if crew_names else None] * len(scenes)
+    if model_entry is not None and scenes and crew_names:
+        try:
+            # simple features, predicted for every scene in one call
+            preds = model_entry.model.predict([[s.word_count or 0, 0.1, 1] for s in scenes])
+            assigned = [crew_names[int(pred) % len(crew_names)] for pred in preds]
+        except Exception:
+            pass
+    assignments = [{'scene_id': s.id, 'assigned': name} for s, name in zip(scenes, assigned)]
+    return {'assignments': assignments, 'model': model_entry.info() if model_entry else None}
 
 
 @app.put("/todos/{todo_id}", response_model=schemas.ToDoRead)
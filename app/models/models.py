@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Boolean, DateTime, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Column, Integer, String, Float, ForeignKey, Boolean, DateTime, Text, LargeBinary
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 from app.database.database import Base
+from app.services import script_storage
 
 
 class Project(Base):
@@ -11,6 +12,10 @@ class Project(Base):
     description = Column(String)
     budget = Column(Float)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    # Analysis run whose rows readers see (see ``AnalysisRun``); swapped in one UPDATE when a run completes.
+    active_run_id = Column(Integer, nullable=True)
+    # The run being written, if any; claimed atomically by ``bulk.AnalysisWriter.start``.
+    building_run_id = Column(Integer, nullable=True)
     tasks = relationship("Task", back_populates="project")
     scenes = relationship("Scene", back_populates="project")
     actors = relationship("Actor", back_populates="project")
@@ -68,14 +73,83 @@ class Script(Base):
     filename = Column(String)
     filepath = Column(String)
     uploaded_at = Column(DateTime, default=datetime.utcnow)
+    # JSON list of [content_hash, heading, scene index] per scene, written when this version is analysed.
+    scene_manifest = Column(Text, nullable=True)
     project = relationship("Project", back_populates="scripts")
 
 
+class UploadSession(Base):
+    """A resumable upload; bytes live in ``uploads/.sessions/<id>.part`` until it is completed.
+
+    A completed session keeps its row (until it goes stale) with the script it
+    published, so a repeated ``complete`` returns that script.
+    """
+    __tablename__ = "upload_sessions"
+    id = Column(String(32), primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
+    filename = Column(String, nullable=False)
+    total_size = Column(BigInteger, nullable=False)
+    committed_offset = Column(BigInteger, default=0, nullable=False)
+    chunk_count = Column(Integer, default=0, nullable=False)
+    manifest_sha256 = Column(String(64), nullable=True)
+    script_id = Column(Integer, ForeignKey("scripts.id"), nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class AnalysisRun(Base):
+    """One analysis of a project's script.
+
+    Rows an analysis inserts (scenes, to-dos, schedule entries, characters,
+    actors and properties) carry its id in ``run_id`` and rows it replaces
+    or removes get it in ``retired_run_id``; both stay NULL on rows created
+    by hand, and nothing is deleted while the run is written. Readers see
+    the rows of the project's ``active_run_id`` (``crud.live_rows``),
+    which is switched to the run once it is complete. Retired rows are
+    deleted afterwards in the background.
+    """
+    __tablename__ = "analysis_runs"
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
+    script_id = Column(Integer, ForeignKey("scripts.id"), nullable=True)
+    status = Column(String, default="building")  # building, complete, failed
+    scene_count = Column(Integer, default=0)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class AnalysisJob(Base):
+    """A queued script analysis, run by the job workers (``services.analysis_jobs``)."""
+    __tablename__ = "analysis_jobs"
+    id = Column(String(32), primary_key=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
+    script_id = Column(Integer, ForeignKey("scripts.id"), nullable=True)
+    filename = Column(String, nullable=False)
+    status = Column(String, default="queued", index=True)  # queued, running, succeeded, failed
+    stage = Column(String, nullable=True)  # extracting, parsing, predicting, persisting
+    progress = Column(Integer, default=0, nullable=False)  # percent
+    attempts = Column(Integer, default=0, nullable=False)
+    # Analysis run opened by the current attempt, failed if the attempt is lost
+    run_id = Column(Integer, ForeignKey("analysis_runs.id"), nullable=True)
+    result_json = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+
 class Scene(Base):
     __tablename__ = "scenes"
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
+    run_id = Column(Integer, ForeignKey("analysis_runs.id"), nullable=True)
+    retired_run_id = Column(Integer, ForeignKey("analysis_runs.id"), nullable=True, index=True)
+    # Script version whose analysis last (re)wrote this scene's content.
     script_id = Column(Integer, ForeignKey("scripts.id"), nullable=True)
+    content_hash = Column(String(64), nullable=True, index=True)
     index = Column(Integer)
     heading = Column(String)
     description = Column(Text)
@@ -87,15 +161,34 @@ class Scene(Base):
     project = relationship("Project", back_populates="scenes")
 
 
+class Character(Base):
+    """One interned character of a project's latest analysis (see ``services.character_registry``)."""
+    __tablename__ = "characters"
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), index=True)
+    run_id = Column(Integer, ForeignKey("analysis_runs.id"), nullable=True)
+    retired_run_id = Column(Integer, ForeignKey("analysis_runs.id"), nullable=True, index=True)
+    key = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+    aliases_json = Column(Text, default="[]")
+    scene_bits = Column(LargeBinary, nullable=False)  # little-endian bitset, bit n = scene index n
+    dialogue_counts = Column(LargeBinary, nullable=False)  # uint32 per set bit, lowest scene first
+    scene_count = Column(Integer, default=0)
+    dialogue_lines = Column(Integer, default=0)
+
+
 class ToDo(Base):
     __tablename__ = "todos"
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
+    run_id = Column(Integer, ForeignKey("analysis_runs.id"), nullable=True)
+    retired_run_id = Column(Integer, ForeignKey("analysis_runs.id"), nullable=True, index=True)
     title = Column(String)
     description = Column(Text, nullable=True)
     is_post_production = Column(Boolean, default=False)
     status = Column(String, default="pending")
     assigned_crew_id = Column(Integer, ForeignKey("crews.id"), nullable=True)
+    scene_id = Column(Integer, ForeignKey("scenes.id"), nullable=True, index=True)
     project = relationship("Project", back_populates="todos")
 
 
@@ -103,6 +196,8 @@ class Actor(Base):
     __tablename__ = "actors"
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
+    run_id = Column(Integer, ForeignKey("analysis_runs.id"), nullable=True)
+    retired_run_id = Column(Integer, ForeignKey("analysis_runs.id"), nullable=True, index=True)
     name = Column(String)
     cost = Column(Float, default=0.0)
     payment_due = Column(String, nullable=True)
@@ -113,6 +208,8 @@ class Property(Base):
     __tablename__ = "properties"
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
+    run_id = Column(Integer, ForeignKey("analysis_runs.id"), nullable=True)
+    retired_run_id = Column(Integer, ForeignKey("analysis_runs.id"), nullable=True, index=True)
     name = Column(String)
     cost = Column(Float, default=0.0)
     project = relationship("Project", back_populates="properties")
@@ -122,8 +219,11 @@ class ScheduleEntry(Base):
     __tablename__ = "schedules"
     id = Column(Integer, primary_key=True, index=True)
     project_id = Column(Integer, ForeignKey("projects.id"))
+    run_id = Column(Integer, ForeignKey("analysis_runs.id"), nullable=True)
+    retired_run_id = Column(Integer, ForeignKey("analysis_runs.id"), nullable=True, index=True)
     task = Column(String)
     dates_json = Column(Text)  # JSON string of dates
+    scene_id = Column(Integer, ForeignKey("scenes.id"), nullable=True, index=True)
     project = relationship("Project", back_populates="schedule_entries")
 
 
@@ -137,10 +237,35 @@ class Reminder(Base):
     project = relationship("Project", back_populates="reminders")
 
 
+class ScriptBlob(Base):
+    """Compressed cleaned script text, shared by every upload with the same content."""
+    __tablename__ = "script_blobs"
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, index=True, nullable=False)
+    codec = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)  # uncompressed UTF-8 bytes
+    stored_size = Column(Integer, nullable=False)
+    data = deferred(Column(LargeBinary, nullable=False))
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    @property
+    def text(self) -> str:
+        return script_storage.decode_text(self.codec, self.data)
+
+
 class GlobalScript(Base):
     __tablename__ = "global_scripts"
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, unique=True)
-    content = Column(Text)
+    # Legacy uncompressed body; new rows keep their text in ``blob``.
+    content = deferred(Column(Text))
+    blob_id = Column(Integer, ForeignKey("script_blobs.id"), nullable=True, index=True)
     uploaded_at = Column(DateTime, default=datetime.utcnow)
     uploaded_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    blob = relationship("ScriptBlob")
+
+    @property
+    def text(self) -> str:
+        if self.blob_id is not None and self.blob is not None:
+            return self.blob.text
+        return self.content or ""
@@ -1,5 +1,6 @@
 # app/schemas.py
-from typing import Any, Dict, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel
 
@@ -103,6 +104,24 @@ class ScriptRead(BaseModel):
         from_attributes = True
 
 
+class UploadSessionCreate(BaseModel):
+    filename: str
+    total_size: int
+
+class UploadSessionRead(BaseModel):
+    id: str
+    project_id: int
+    filename: str
+    total_size: int
+    committed_offset: int
+    chunk_count: int
+    manifest_sha256: Optional[str] = None
+    script_id: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+
+
 # Scene and Scene analysis
 class SceneCreate(BaseModel):
     project_id: int
@@ -125,6 +144,70 @@ class SceneRead(BaseModel):
         from_attributes = True
 
 
+class SceneChangeRead(BaseModel):
+    change: str  # unchanged, moved, edited, inserted, deleted
+    scene_no: Optional[int] = None
+    previous_scene_no: Optional[int] = None
+    heading: Optional[str] = None
+    # Live scene row with this content, and the script version that last wrote it
+    scene_id: Optional[int] = None
+    changed_in_script_id: Optional[int] = None
+
+
+class ScriptDiff(BaseModel):
+    script_id: int
+    base_script_id: Optional[int]
+    summary: Dict[str, int]
+    changes: List[SceneChangeRead]
+
+
+class ScenePreviewItem(BaseModel):
+    index: int
+    heading: Optional[str] = None
+    location: Optional[str] = None
+    time_of_day: Optional[str] = None
+    characters: List[str]
+    dialogue: Dict[str, int]
+    word_count: int
+    tone: str
+    description: str
+
+
+class ScriptPreview(BaseModel):
+    script_id: int
+    scenes: List[ScenePreviewItem]
+    # True when the whole script was read, making the total exact
+    complete: bool
+    estimated_total_scenes: Optional[int] = None
+
+
+class AnalysisJobRead(BaseModel):
+    id: str
+    project_id: int
+    script_id: Optional[int] = None
+    filename: str
+    status: str
+    stage: Optional[str] = None
+    progress: int
+    attempts: int
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class CharacterRead(BaseModel):
+    name: str
+    aliases: List[str]
+    scenes: List[int]
+    scene_count: int
+    dialogue_lines: int
+    dialogue_by_scene: Dict[int, int]
+
+
 # ToDo
 class ToDoCreate(BaseModel):
     project_id: int
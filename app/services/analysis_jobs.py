@@ -0,0 +1,342 @@
+"""Database-backed queue of script analyses.
+
+Submitting an analysis only records an ``AnalysisJob`` row and returns its
+id. A dispatcher thread in the API process claims queued jobs and runs each
+one on a dedicated process pool, so an analysis never holds a request
+thread. The queue lives in the database, so on a single node jobs survive
+restarts without an external broker:
+
+* a job is claimed with one conditional UPDATE, and only while no other job
+  of its project is running, so two analyses of a project never interleave;
+* a running job records its stage (extracting, parsing, predicting,
+  persisting) and percentage on its row as the analysis moves along, and the
+  dispatcher refreshes its heartbeat while the worker process is busy;
+* a running job whose worker process died, or whose heartbeat is older than
+  ``ANALYSIS_JOB_STALE_SECONDS``, was lost: the analysis run it opened is
+  failed, so the next attempt can open its own, and it is queued again, or
+  failed once it has been claimed ``MAX_ATTEMPTS`` times;
+* a job that finds another analysis of its project being written (e.g. a
+  synchronous ``analyze_script``) goes back to the queue without using up
+  an attempt, and no job of the project is claimed until that run is
+  finished or stale.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from sqlalchemy import exists
+from sqlalchemy.orm import Session, aliased
+
+from app import ai_integration
+from app.crud import bulk
+from app.models.models import AnalysisJob, AnalysisRun, Project
+from app.services import uploads, worker_pool
+
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+# Percentage reported when each stage of ``analyze_and_create`` starts
+STAGE_PROGRESS = {"extracting": 5, "parsing": 25, "predicting": 45, "persisting": 80}
+DEFAULT_JOB_WORKERS = 2
+DEFAULT_POLL_SECONDS = 1.0
+DEFAULT_STALE_SECONDS = 120
+MAX_ATTEMPTS = 3
+
+
+def job_workers() -> int:
+    """Concurrent analyses per API process; ``0`` leaves the queue to other processes."""
+    return max(0, int(os.getenv("ANALYSIS_JOB_WORKERS", DEFAULT_JOB_WORKERS)))
+
+
+def job_stale_seconds() -> float:
+    return float(os.getenv("ANALYSIS_JOB_STALE_SECONDS", DEFAULT_STALE_SECONDS))
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex
+
+
+def claim_next_job(db: Session) -> Optional[AnalysisJob]:
+    """Mark the oldest queued job of an idle project as running and return it.
+
+    A project is busy while one of its jobs runs or while another analysis
+    run of it is being written (and not stale yet, see ``bulk.AnalysisWriter.start``).
+    """
+    other = aliased(AnalysisJob)
+    run_being_written = exists().where(
+        Project.id == AnalysisJob.project_id,
+        AnalysisRun.id == Project.building_run_id,
+        AnalysisRun.status == bulk.RUN_BUILDING,
+        AnalysisRun.started_at > datetime.utcnow() - bulk.STALE_RUN_AFTER,
+    )
+    job_running = exists().where(other.project_id == AnalysisJob.project_id, other.status == RUNNING)
+    project_busy = job_running | run_being_written
+    candidates = (
+        db.query(AnalysisJob.id)
+        .filter(AnalysisJob.status == QUEUED, ~project_busy)
+        .order_by(AnalysisJob.created_at.asc(), AnalysisJob.id.asc())
+        .limit(5)
+        .all()
+    )
+    for (job_id,) in candidates:
+        now = datetime.utcnow()
+        # Re-checked in the UPDATE: another dispatcher may have claimed it, or a job of the same project.
+        claimed = (
+            db.query(AnalysisJob)
+            .filter(AnalysisJob.id == job_id, AnalysisJob.status == QUEUED, ~project_busy)
+            .update(
+                {
+                    AnalysisJob.status: RUNNING,
+                    AnalysisJob.stage: None,
+                    AnalysisJob.progress: 0,
+                    AnalysisJob.attempts: AnalysisJob.attempts + 1,
+                    AnalysisJob.started_at: now,
+                    AnalysisJob.heartbeat_at: now,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if claimed:
+            return db.get(AnalysisJob, job_id, populate_existing=True)
+    return None
+
+
+def report_stage(db: Session, job_id: str, stage: str) -> None:
+    _update_running(
+        db,
+        [job_id],
+        {
+            AnalysisJob.stage: stage,
+            AnalysisJob.progress: STAGE_PROGRESS.get(stage, 0),
+            AnalysisJob.heartbeat_at: datetime.utcnow(),
+        },
+    )
+
+
+def record_run(db: Session, job_id: str, run_id: int) -> None:
+    _update_running(db, [job_id], {AnalysisJob.run_id: run_id, AnalysisJob.heartbeat_at: datetime.utcnow()})
+
+
+def requeue_job(db: Session, job_id: str) -> None:
+    """Put a claimed job back in the queue without counting the attempt."""
+    _update_running(
+        db,
+        [job_id],
+        {
+            AnalysisJob.status: QUEUED,
+            AnalysisJob.stage: None,
+            AnalysisJob.progress: 0,
+            AnalysisJob.attempts: AnalysisJob.attempts - 1,
+            AnalysisJob.run_id: None,
+        },
+    )
+
+
+def heartbeat(db: Session, job_ids: Iterable[str]) -> None:
+    _update_running(db, list(job_ids), {AnalysisJob.heartbeat_at: datetime.utcnow()})
+
+
+def finish_job(db: Session, job_id: str, result: Dict[str, Any]) -> None:
+    _update_running(
+        db,
+        [job_id],
+        {
+            AnalysisJob.status: SUCCEEDED,
+            AnalysisJob.progress: 100,
+            AnalysisJob.result_json: json.dumps(result, default=str),
+            AnalysisJob.finished_at: datetime.utcnow(),
+        },
+    )
+
+
+def fail_job(db: Session, job_id: str, error: str) -> None:
+    _update_running(
+        db,
+        [job_id],
+        {AnalysisJob.status: FAILED, AnalysisJob.error: error, AnalysisJob.finished_at: datetime.utcnow()},
+    )
+
+
+def _update_running(db: Session, job_ids: list, values: Dict[Any, Any]) -> None:
+    if not job_ids:
+        return
+    db.query(AnalysisJob).filter(AnalysisJob.id.in_(job_ids), AnalysisJob.status == RUNNING).update(
+        values, synchronize_session=False
+    )
+    db.commit()
+
+
+def requeue_stale_jobs(db: Session, stale_seconds: Optional[float] = None) -> int:
+    """Return running jobs whose worker stopped reporting to the queue; returns how many were found."""
+    cutoff = datetime.utcnow() - timedelta(seconds=job_stale_seconds() if stale_seconds is None else stale_seconds)
+    stale = db.query(AnalysisJob).filter(AnalysisJob.status == RUNNING, AnalysisJob.heartbeat_at < cutoff)
+    return _return_lost_jobs(db, stale, "Analysis worker was lost too many times")
+
+
+def requeue_lost_job(db: Session, job_id: str, error: str) -> None:
+    """Return a running job whose worker process died, failing it with ``error`` once it is out of attempts."""
+    lost = db.query(AnalysisJob).filter(AnalysisJob.id == job_id, AnalysisJob.status == RUNNING)
+    _return_lost_jobs(db, lost, error)
+
+
+def _return_lost_jobs(db: Session, lost, error: str) -> int:
+    # A lost attempt's run would block the project until it counts as stale itself.
+    for (run_id,) in lost.with_entities(AnalysisJob.run_id).filter(AnalysisJob.run_id.isnot(None)).all():
+        bulk.abandon_run(db, run_id)
+    exhausted = lost.filter(AnalysisJob.attempts >= MAX_ATTEMPTS).update(
+        {AnalysisJob.status: FAILED, AnalysisJob.error: error, AnalysisJob.finished_at: datetime.utcnow()},
+        synchronize_session=False,
+    )
+    requeued = lost.update(
+        {AnalysisJob.status: QUEUED, AnalysisJob.stage: None, AnalysisJob.progress: 0, AnalysisJob.run_id: None},
+        synchronize_session=False,
+    )
+    db.commit()
+    return exhausted + requeued
+
+
+def job_result(job: AnalysisJob) -> Optional[Dict[str, Any]]:
+    return json.loads(job.result_json) if job.result_json else None
+
+
+def run_job(db: Session, job_id: str) -> None:
+    """Run a claimed job to the end, recording its result or error on the row."""
+    job = db.get(AnalysisJob, job_id)
+    if job is None or job.status != RUNNING:
+        return
+    project_id, script_id = job.project_id, job.script_id
+    filepath = uploads.uploads_dir() / job.filename
+    try:
+        if not filepath.exists():
+            raise ai_integration.ScriptExtractionError("Uploaded script file not found on server uploads/ directory")
+        result = ai_integration.analyze_and_create(
+            db,
+            project_id=project_id,
+            script_path=str(filepath),
+            script_id=script_id,
+            progress=lambda stage: report_stage(db, job_id, stage),
+            run_started=lambda run_id: record_run(db, job_id, run_id),
+        )
+    except bulk.AnalysisInProgress:
+        # Another analysis of the project is being written; claim_next_job skips it until that one is done.
+        db.rollback()
+        requeue_job(db, job_id)
+        return
+    except Exception as exc:
+        db.rollback()
+        fail_job(db, job_id, str(exc) or type(exc).__name__)
+        return
+    finish_job(db, job_id, result)
+    # Rows the new run replaced go now, after the job already reports success.
+    bulk.collect_retired_rows(db, project_id)
+
+
+def _run_in_worker(job_id: str) -> None:
+    from app.database.database import SessionLocal
+
+    with SessionLocal() as db:
+        run_job(db, job_id)
+
+
+class JobDispatcher:
+    """Claims queued jobs and runs up to ``workers`` of them at once on a process pool."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        workers: int,
+        poll_seconds: float = DEFAULT_POLL_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self._running: Dict[str, Future] = {}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_heartbeat = 0.0
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="analysis-jobs", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop claiming; jobs already running finish in their processes (or are requeued once stale)."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _loop(self) -> None:
+        with self.session_factory() as db:
+            while not self._stop.is_set():
+                try:
+                    self.tick(db)
+                except Exception:
+                    # The queue is retried on the next tick; a database hiccup must not end the loop.
+                    db.rollback()
+                self._stop.wait(self.poll_seconds)
+
+    def tick(self, db: Session) -> None:
+        now = time.monotonic()
+        if now - self._last_heartbeat >= job_stale_seconds() / 4:
+            heartbeat(db, self._running)
+            requeue_stale_jobs(db)
+            self._last_heartbeat = now
+        self._reap(db)
+        while len(self._running) < self.workers and not self._stop.is_set():
+            job = claim_next_job(db)
+            if job is None:
+                break
+            self._running[job.id] = self._get_executor().submit(_run_in_worker, job.id)
+
+    def _reap(self, db: Session) -> None:
+        for job_id, future in list(self._running.items()):
+            if not future.done():
+                continue
+            del self._running[job_id]
+            error = None if future.cancelled() else future.exception()
+            if future.cancelled() or error is not None:
+                # The worker died before it could record the outcome itself: the job was lost.
+                requeue_lost_job(db, job_id, f"Analysis worker failed: {error or 'cancelled'}")
+            if isinstance(error, BrokenProcessPool) and self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=worker_pool.get_mp_context())
+        return self._executor
+
+
+_dispatcher: Optional[JobDispatcher] = None
+
+
+def start_dispatcher(session_factory: Callable[[], Session]) -> None:
+    global _dispatcher
+    workers = job_workers()
+    if _dispatcher is not None or workers == 0:
+        return
+    _dispatcher = JobDispatcher(session_factory, workers)
+    _dispatcher.start()
+
+
+def stop_dispatcher() -> None:
+    global _dispatcher
+    dispatcher, _dispatcher = _dispatcher, None
+    if dispatcher is not None:
+        dispatcher.stop()
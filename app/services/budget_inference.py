@@ -0,0 +1,134 @@
+"""Scene-level budget inference in one vectorised ``predict`` call.
+
+Budgets used to be predicted one scene at a time, each call paying
+scikit-learn's input validation and dispatch, with a two-column input that
+did not match the stored model, so almost every call failed into the
+word-count heuristic. Here the features of every scene are built as NumPy
+columns from the ``SceneTable``, stacked into one matrix in the order the
+model was fitted with, and predicted in a single call.
+
+The model's schema is checked first: with ``feature_names_in_`` every name
+must be a known scene feature (``SCENE_FEATURES``); without names,
+``n_features_in_`` must match ``DEFAULT_FEATURES``. A model that does not
+fit, fails, or returns a non-finite or non-positive value for a scene falls
+back to the heuristic for those scenes, and the ``InferenceReport`` says how
+many scenes got which.
+"""
+from __future__ import annotations
+
+import time
+from array import array
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from ai.features import count_action_lines
+from app.services.scene_table import SceneTable
+
+
+def _column(values: array) -> np.ndarray:
+    return np.frombuffer(values, dtype=values.typecode).astype(np.float64)
+
+
+def _action_counts(scenes: SceneTable) -> np.ndarray:
+    return np.fromiter((count_action_lines(s.description, s.content) for s in scenes), dtype=np.float64, count=len(scenes))
+
+
+def _dialogue_density(scenes: SceneTable) -> np.ndarray:
+    return _column(scenes.dialogue_line_totals()) / np.maximum(_column(scenes.line_counts()), 1.0)
+
+
+SCENE_FEATURES: Dict[str, Callable[[SceneTable], np.ndarray]] = {
+    "num_scenes": lambda scenes: np.ones(len(scenes)),
+    "num_characters": lambda scenes: _column(scenes.cast_sizes()),
+    "action_count": _action_counts,
+    "dialogue_density": _dialogue_density,
+    "word_count": lambda scenes: _column(scenes.word_counts()),
+    "line_count": lambda scenes: _column(scenes.line_counts()),
+}
+# Column order assumed for models fitted without feature names (that of ai/models/budget_model.pkl)
+DEFAULT_FEATURES = ("num_scenes", "num_characters", "action_count", "dialogue_density")
+
+
+class FeatureSchemaError(ValueError):
+    """The model expects features the scene breakdown cannot provide."""
+
+
+@dataclass
+class InferenceReport:
+    model_scenes: int = 0
+    fallback_scenes: int = 0
+    features: List[str] = field(default_factory=list)
+    # Duration of the single predict call
+    predict_seconds: float = 0.0
+    # Why scenes fell back, when they did
+    reason: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def model_features(model) -> List[str]:
+    """The scene features ``model`` expects, in its column order."""
+    names = getattr(model, "feature_names_in_", None)
+    if names is not None:
+        names = [str(name) for name in names]
+        unknown = [name for name in names if name not in SCENE_FEATURES]
+        if unknown:
+            raise FeatureSchemaError(f"Budget model expects unknown scene features: {', '.join(unknown)}")
+        return names
+    expected = getattr(model, "n_features_in_", None)
+    if expected != len(DEFAULT_FEATURES):
+        raise FeatureSchemaError(
+            f"Budget model expects {expected} unnamed features; scenes provide {', '.join(DEFAULT_FEATURES)}"
+        )
+    return list(DEFAULT_FEATURES)
+
+
+def feature_matrix(scenes: SceneTable, names: List[str]) -> np.ndarray:
+    """One row per scene, one column per feature in ``names``."""
+    if not len(scenes):
+        return np.empty((0, len(names)))
+    return np.column_stack([SCENE_FEATURES[name](scenes) for name in names])
+
+
+def predict_scene_budgets(model, scenes: SceneTable) -> InferenceReport:
+    """Write a budget for every scene into ``scenes.predicted_budget``."""
+    words = _column(scenes.word_counts())
+    if model is None:
+        _store(scenes, np.maximum(1200.0, words * 15.0))
+        return InferenceReport(fallback_scenes=len(scenes), reason="No budget model is available")
+
+    fallback = np.maximum(1000.0, words * 12.0)
+    report = InferenceReport()
+    try:
+        report.features = model_features(model)
+        matrix = feature_matrix(scenes, report.features)
+        if hasattr(model, "feature_names_in_"):
+            import pandas as pd
+
+            # Fitted on a frame: keep the column names so the model can check them.
+            matrix = pd.DataFrame(matrix, columns=report.features)
+        started = time.perf_counter()
+        predicted = np.asarray(model.predict(matrix), dtype=np.float64).reshape(-1) if len(scenes) else np.empty(0)
+        report.predict_seconds = time.perf_counter() - started
+        if predicted.shape != (len(scenes),):
+            raise ValueError(f"Budget model returned {predicted.size} predictions for {len(scenes)} scenes")
+    except Exception as exc:
+        _store(scenes, fallback)
+        report.fallback_scenes = len(scenes)
+        report.reason = str(exc) or type(exc).__name__
+        return report
+
+    usable = np.isfinite(predicted) & (predicted > 0)
+    _store(scenes, np.where(usable, predicted, fallback))
+    report.model_scenes = int(usable.sum())
+    report.fallback_scenes = len(scenes) - report.model_scenes
+    if report.fallback_scenes:
+        report.reason = "Budget model returned non-positive or non-finite predictions"
+    return report
+
+
+def _store(scenes: SceneTable, budgets: np.ndarray) -> None:
+    scenes.predicted_budget = array("d", np.ascontiguousarray(budgets, dtype=np.float64).tobytes())
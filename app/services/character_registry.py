@@ -0,0 +1,204 @@
+"""Per-project character registry built once from a scene breakdown.
+
+Names are interned under an alias key, so "JOHN (V.O.)", "JOHN (CONT'D)" and
+"John" become one character. Each character's appearances are an ``int``
+bitset with bit ``n`` set for scene index ``n``, plus the dialogue-line count
+for each of those scenes in an ``array`` aligned with the set bits. "Which
+scenes feature X", "cast per scene" and day-out-of-days are bit operations on
+those sets and never look at scene descriptions. The registry is persisted as
+one ``characters`` row per name (see ``bulk.AnalysisWriter.replace_characters``).
+"""
+from __future__ import annotations
+
+import json
+import re
+import sys
+from array import array
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set
+
+
+# Trailing cue extensions: (V.O.), (O.S.), (CONT'D), a bare CONT'D and the dual-dialogue caret.
+_EXTENSION = re.compile(r"(?:\s*\([^)]*\)|\s+CONT['’]?D\.?|\s*\^)\s*$", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+_COUNT_TYPE = "I"
+
+
+def character_key(name: str) -> str:
+    """The alias key a cue or name is interned under: extensions dropped, spaces collapsed, upper case."""
+    key = name.strip()
+    while True:
+        stripped = _EXTENSION.sub("", key)
+        if stripped == key:
+            break
+        key = stripped
+    return _SPACES.sub(" ", key).upper()
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    """Positions of the set bits, lowest first."""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+def bits_to_bytes(bits: int) -> bytes:
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+
+def _counts_to_bytes(counts: array) -> bytes:
+    if sys.byteorder == "big":  # pragma: no cover - stored little-endian everywhere
+        counts = array(_COUNT_TYPE, counts)
+        counts.byteswap()
+    return counts.tobytes()
+
+
+def _counts_from_bytes(data: bytes) -> array:
+    counts = array(_COUNT_TYPE)
+    counts.frombytes(data)
+    if sys.byteorder == "big":  # pragma: no cover
+        counts.byteswap()
+    return counts
+
+
+@dataclass
+class CharacterRecord:
+    key: str
+    name: str
+    aliases: Set[str] = field(default_factory=set)
+    scene_bits: int = 0
+    # Dialogue lines per scene index, only for scenes where the character speaks.
+    dialogue_by_scene: Dict[int, int] = field(default_factory=dict, repr=False)
+
+    def add(self, scene_index: int, alias: str, dialogue_lines: int = 0) -> None:
+        self.aliases.add(alias)
+        self.scene_bits |= 1 << scene_index
+        if dialogue_lines:
+            self.dialogue_by_scene[scene_index] = self.dialogue_by_scene.get(scene_index, 0) + dialogue_lines
+
+    def appears_in(self, scene_index: int) -> bool:
+        return scene_index >= 0 and bool(self.scene_bits >> scene_index & 1)
+
+    @property
+    def scene_indices(self) -> List[int]:
+        return list(iter_bits(self.scene_bits))
+
+    @property
+    def scene_count(self) -> int:
+        return self.scene_bits.bit_count()
+
+    @property
+    def dialogue_lines(self) -> int:
+        return sum(self.dialogue_by_scene.values())
+
+    def dialogue_in(self, scene_index: int) -> int:
+        return self.dialogue_by_scene.get(scene_index, 0)
+
+    def dialogue_counts(self) -> array:
+        """Dialogue lines per appearance, in the order of :attr:`scene_indices`."""
+        return array(_COUNT_TYPE, (self.dialogue_by_scene.get(index, 0) for index in iter_bits(self.scene_bits)))
+
+    def to_row(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "name": self.name,
+            "aliases_json": json.dumps(sorted(self.aliases)),
+            "scene_bits": bits_to_bytes(self.scene_bits),
+            "dialogue_counts": _counts_to_bytes(self.dialogue_counts()),
+            "scene_count": self.scene_count,
+            "dialogue_lines": self.dialogue_lines,
+        }
+
+    @classmethod
+    def from_row(cls, row: Any) -> "CharacterRecord":
+        bits = int.from_bytes(row.scene_bits or b"", "little")
+        counts = _counts_from_bytes(row.dialogue_counts or b"")
+        dialogue = {index: lines for index, lines in zip(iter_bits(bits), counts) if lines}
+        return cls(
+            key=row.key,
+            name=row.name,
+            aliases=set(json.loads(row.aliases_json or "[]")),
+            scene_bits=bits,
+            dialogue_by_scene=dialogue,
+        )
+
+
+class CharacterRegistry:
+    def __init__(self, records: Iterable[CharacterRecord] = ()):
+        self._records: Dict[str, CharacterRecord] = {}
+        for record in records:
+            self._records[record.key] = record
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any]) -> "CharacterRegistry":
+        """Rebuild from persisted ``Character`` rows."""
+        return cls(CharacterRecord.from_row(row) for row in rows)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[CharacterRecord]:
+        return iter(self._records.values())
+
+    def intern(self, name: str) -> Optional[CharacterRecord]:
+        key = character_key(name)
+        if not key:
+            return None
+        record = self._records.get(key)
+        if record is None:
+            record = self._records[key] = CharacterRecord(key=key, name=key.title())
+        return record
+
+    def add_scene(self, scene_index: int, names: Iterable[str], dialogue: Optional[Mapping[str, int]] = None) -> None:
+        for name in names:
+            record = self.intern(name)
+            if record is not None:
+                record.add(scene_index, name)
+        for speaker, lines in (dialogue or {}).items():
+            record = self.intern(speaker)
+            if record is not None:
+                record.add(scene_index, speaker, lines)
+
+    def get(self, name: str) -> Optional[CharacterRecord]:
+        return self._records.get(character_key(name))
+
+    def scenes_featuring(self, name: str) -> List[int]:
+        record = self.get(name)
+        return record.scene_indices if record else []
+
+    def cast_for_scene(self, scene_index: int) -> List[str]:
+        return sorted(record.name for record in self if record.appears_in(scene_index))
+
+    def cast_by_scene(self) -> Dict[int, List[str]]:
+        cast: Dict[int, List[str]] = {}
+        for record in self:
+            for index in iter_bits(record.scene_bits):
+                cast.setdefault(index, []).append(record.name)
+        return {index: sorted(names) for index, names in cast.items()}
+
+    def most_common(self, limit: Optional[int] = None) -> List[CharacterRecord]:
+        ranked = sorted(self, key=lambda record: (-record.scene_count, -record.dialogue_lines, record.key))
+        return ranked[:limit] if limit is not None else ranked
+
+    def day_out_of_days(self, shoot_days: Mapping[int, date]) -> Dict[str, Dict[str, Any]]:
+        """First, last and working days per character, given each scene's shoot day."""
+        day_masks: Dict[date, int] = {}
+        for scene_index, day in shoot_days.items():
+            day_masks[day] = day_masks.get(day, 0) | 1 << scene_index
+        ordered = sorted(day_masks.items())
+        report: Dict[str, Dict[str, Any]] = {}
+        for record in self:
+            days = [day for day, mask in ordered if mask & record.scene_bits]
+            if days:
+                report[record.name] = {"start": days[0], "finish": days[-1], "work_days": days}
+        return report
+
+
+def build_registry(scenes: Iterable[Mapping[str, Any]]) -> CharacterRegistry:
+    """Registry from scene breakdown dicts (``characters`` names and ``dialogue`` counts per cue)."""
+    registry = CharacterRegistry()
+    for scene in scenes:
+        registry.add_scene(scene["index"], scene.get("characters") or [], scene.get("dialogue"))
+    return registry
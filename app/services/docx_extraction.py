@@ -0,0 +1,49 @@
+"""Streaming text extraction for ``.docx`` scripts.
+
+``word/document.xml`` is read straight out of the zip archive with
+``iterparse``; each ``w:p`` paragraph is turned into one line as soon as it
+closes and is then discarded, so memory stays flat however long the script is.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterator, List
+from xml.etree import ElementTree
+from zipfile import ZipFile
+
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+DOCUMENT_PART = "word/document.xml"
+
+_BODY = f"{WORD_NAMESPACE}body"
+_PARAGRAPH = f"{WORD_NAMESPACE}p"
+_TEXT = f"{WORD_NAMESPACE}t"
+_SPECIAL_RUNS = {f"{WORD_NAMESPACE}tab": "\t", f"{WORD_NAMESPACE}br": "\n", f"{WORD_NAMESPACE}cr": "\n"}
+
+
+def iter_docx_paragraphs(path: Path) -> Iterator[str]:
+    """Yield the text of each paragraph in document order (empty paragraphs included).
+
+    Raises ``KeyError``, ``zipfile.BadZipFile`` or ``ElementTree.ParseError`` for
+    files that are not readable Word documents.
+    """
+    with ZipFile(path) as docx, docx.open(DOCUMENT_PART) as xml_file:
+        body = None
+        parts: List[str] = []
+        for event, element in ElementTree.iterparse(xml_file, events=("start", "end")):
+            if event == "start":
+                if element.tag == _BODY:
+                    body = element
+                continue
+            tag = element.tag
+            if tag == _TEXT:
+                parts.append(element.text or "")
+            elif tag in _SPECIAL_RUNS:
+                parts.append(_SPECIAL_RUNS[tag])
+            elif tag == _PARAGRAPH:
+                yield "".join(parts)
+                parts.clear()
+                element.clear()
+                if body is not None:
+                    # Detach finished blocks so the tree never grows past one paragraph.
+                    body.clear()
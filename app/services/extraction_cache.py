@@ -0,0 +1,152 @@
+"""Content-addressed, size-bounded disk cache for extracted script text.
+
+Entries are keyed by the SHA-256 of the uploaded bytes plus the extractor
+version, so re-analysing an unchanged upload never re-parses the file while a
+change to the extraction code invalidates every entry at once.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+DEFAULT_CACHE_DIR = Path.cwd() / ".cache" / "extraction"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: Path, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """Hash a file in fixed-size chunks without loading it into memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """Persistent LRU cache of ``{"text", "extractor", "score"}`` payloads.
+
+    Each entry is a JSON file; recency is tracked through the file mtime so the
+    ordering survives restarts and is shared between worker processes.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._index: Optional["OrderedDict[str, int]"] = None
+
+    @staticmethod
+    def make_key(digest: str, kind: str, version: str) -> str:
+        return f"{digest}.{kind.lstrip('.')}.v{version}"
+
+    def _path_for(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        if self._index is None:
+            entries = []
+            if self.directory.exists():
+                for entry in self.directory.glob("*.json"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, entry.stem, stat.st_size))
+            entries.sort()
+            self._index = OrderedDict((key, size) for _, key, size in entries)
+        return self._index
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path_for(key)
+        with self._lock:
+            index = self._load_index()
+            try:
+                payload = json.loads(path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError, OSError):
+                index.pop(key, None)
+                self.misses += 1
+                return None
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            if key in index:
+                index.move_to_end(key)
+            else:
+                index[key] = path.stat().st_size
+            self.hits += 1
+            return payload
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        if self.max_bytes <= 0:
+            return
+        data = json.dumps(payload).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        path = self._path_for(key)
+        with self._lock:
+            index = self._load_index()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            index.pop(key, None)
+            index[key] = len(data)
+            self._evict(index)
+
+    def _evict(self, index: "OrderedDict[str, int]") -> None:
+        total = sum(index.values())
+        while total > self.max_bytes and index:
+            key, size = index.popitem(last=False)
+            total -= size
+            try:
+                self._path_for(key).unlink()
+            except FileNotFoundError:
+                pass
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._load_index()):
+                try:
+                    self._path_for(key).unlink()
+                except FileNotFoundError:
+                    pass
+            self._index = OrderedDict()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            index = self._load_index()
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(index),
+                "bytes": sum(index.values()),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+_default_cache: Optional[ExtractionCache] = None
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Return the process-wide cache configured from the environment."""
+    global _default_cache
+    if _default_cache is None:
+        directory = Path(os.getenv("EXTRACTION_CACHE_DIR", str(DEFAULT_CACHE_DIR)))
+        max_bytes = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES)))
+        _default_cache = ExtractionCache(directory, max_bytes=max_bytes)
+    return _default_cache
@@ -0,0 +1,332 @@
+"""PDF text extractors and the machinery used to run them as a cascade.
+
+Every extractor is a module-level function taking a path and returning raw
+(uncleaned) text, so it can be shipped to a child process by reference.
+``run_with_budget`` executes one of them under a wall-clock budget and kills
+the child if a pathological document makes it hang;
+``iter_pdf_pages_with_budget`` does the same for a page-by-page stream.
+"""
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.services import pdf_raw_decoder, worker_pool
+
+try:
+    import pdfplumber
+except Exception:  # pragma: no cover - optional dependency at runtime
+    pdfplumber = None
+
+try:
+    from PyPDF2 import PdfReader
+except Exception:  # pragma: no cover - fallback if PyPDF2 unavailable
+    PdfReader = None
+
+try:
+    from pdfminer.high_level import extract_text as pdfminer_extract_text
+except Exception:  # pragma: no cover - optional dependency at runtime
+    pdfminer_extract_text = None
+
+
+DEFAULT_BUDGET_SECONDS = 30.0
+DEFAULT_QUALITY_THRESHOLD = 0.75
+# Above this many pages the cheap raw and PyPDF2 passes are tried before pdfplumber.
+DEFAULT_FAST_FIRST_PAGES = 40
+# From this many pages on, pdfplumber pages are sharded across the worker pool.
+DEFAULT_PARALLEL_MIN_PAGES = 24
+
+_PAGE_PATTERN = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+_FONT_PATTERN = re.compile(rb"/Font\b")
+_OBJECT_STREAM_PATTERN = re.compile(rb"/Type\s*/ObjStm\b")
+
+
+class ExtractorTimeout(RuntimeError):
+    """Raised when an extractor exceeds its wall-clock budget and is killed."""
+
+
+@dataclass
+class PdfPrescan:
+    page_count: int
+    has_text_layer: bool
+
+
+def parallel_min_pages() -> int:
+    return int(os.getenv("PDF_PARALLEL_MIN_PAGES", DEFAULT_PARALLEL_MIN_PAGES))
+
+
+def extraction_settings() -> Tuple[float, float, int]:
+    """Return ``(budget_seconds, quality_threshold, fast_first_pages)`` from the environment."""
+    budget = float(os.getenv("PDF_EXTRACTOR_BUDGET_SECONDS", DEFAULT_BUDGET_SECONDS))
+    threshold = float(os.getenv("PDF_QUALITY_THRESHOLD", DEFAULT_QUALITY_THRESHOLD))
+    fast_first = int(os.getenv("PDF_FAST_FIRST_PAGES", DEFAULT_FAST_FIRST_PAGES))
+    return budget, threshold, fast_first
+
+
+def prescan_pdf(path: Path) -> PdfPrescan:
+    """Count page objects and look for font resources, parsing the document only when the bytes cannot tell.
+
+    Dictionaries packed into compressed object streams (the norm since PDF
+    1.5) are invisible to the byte scan. For such files the page count comes
+    from the page tree and a text layer is assumed, so the default cascade
+    order applies.
+    """
+    try:
+        with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            page_count = sum(1 for _ in _PAGE_PATTERN.finditer(data))
+            has_fonts = _FONT_PATTERN.search(data) is not None
+            packed = _OBJECT_STREAM_PATTERN.search(data) is not None
+    except (OSError, ValueError):
+        return PdfPrescan(page_count=0, has_text_layer=False)
+    if packed or not page_count:
+        tree_pages = _page_tree_count(path)
+        if tree_pages:
+            page_count = tree_pages
+            has_fonts = has_fonts or packed
+    return PdfPrescan(page_count=page_count, has_text_layer=has_fonts)
+
+
+def _page_tree_count(path: Path) -> int:
+    """Page count from the trailer and page tree; PyPDF2 loads objects lazily, so no page is parsed."""
+    if PdfReader is None:
+        return 0
+    try:
+        return len(PdfReader(str(path), strict=False).pages)
+    except Exception:
+        return 0
+
+
+def plan_extractor_order(prescan: PdfPrescan, fast_first_pages: int = DEFAULT_FAST_FIRST_PAGES) -> List[str]:
+    """Choose the cascade order so the most likely winner runs first."""
+    if not prescan.has_text_layer:
+        # Image-only or unusual files: nothing will do well, so try the cheap passes first.
+        order = ["raw", "pypdf2", "pdfminer", "pdfplumber"]
+    elif prescan.page_count > fast_first_pages:
+        # The mmap decoder is an order of magnitude faster than pdfminer, so it goes first.
+        order = ["raw", "pypdf2", "pdfplumber", "pdfminer"]
+    else:
+        order = ["pdfplumber", "pypdf2", "pdfminer", "raw"]
+    return [name for name in order if name in available_extractors()]
+
+
+def extract_pdfplumber_pages(path: str, start: int = 0, stop: Optional[int] = None) -> List[str]:
+    """Extract ``pages[start:stop]``; an open-ended ``stop`` reads to the last page."""
+    with pdfplumber.open(path) as pdf:
+        chunks: List[str] = []
+        for page in pdf.pages[start:stop]:
+            chunk = page.extract_text() or ""
+            if not chunk:
+                # retry with looser tolerances
+                chunk = page.extract_text(x_tolerance=2, y_tolerance=2) or ""
+            chunks.append(chunk)
+    return chunks
+
+
+def iter_pdf_pages(path: str, extractor: str = "pdfplumber") -> Iterator[str]:
+    """Yield the text of one page at a time, releasing each page's layout cache."""
+    if extractor == "raw":
+        yield from pdf_raw_decoder.iter_page_text(Path(path))
+        return
+    if extractor == "pypdf2":
+        for page in PdfReader(path).pages:
+            chunk = page.extract_text() or ""
+            if chunk:
+                yield chunk
+        return
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages:
+            chunk = page.extract_text() or ""
+            if not chunk:
+                # retry with looser tolerances
+                chunk = page.extract_text(x_tolerance=2, y_tolerance=2) or ""
+            page.close()
+            if chunk:
+                yield chunk
+
+
+def extract_pdfplumber(path: str) -> str:
+    return "\n".join(filter(None, extract_pdfplumber_pages(path)))
+
+
+def page_shards(page_count: int, workers: int) -> List[Tuple[int, Optional[int]]]:
+    """Split ``page_count`` pages into contiguous ranges, one per worker.
+
+    The final range is open-ended so pages missed by the pre-scan estimate
+    are still extracted.
+    """
+    if page_count <= 0:
+        return [(0, None)]
+    workers = max(1, min(workers, page_count))
+    size = math.ceil(page_count / workers)
+    shards: List[Tuple[int, Optional[int]]] = [
+        (start, start + size) for start in range(0, page_count, size)
+    ]
+    shards[-1] = (shards[-1][0], None)
+    return shards
+
+
+def extract_pdfplumber_parallel(path: str, page_count: int, budget: Optional[float] = None) -> str:
+    """pdfplumber extraction with page ranges spread over worker processes (see ``worker_pool.map_ordered``)."""
+    shards = page_shards(page_count, worker_pool.pool_size())
+    results = worker_pool.map_ordered(
+        extract_pdfplumber_pages,
+        [(path, start, stop) for start, stop in shards],
+        timeout=budget,
+    )
+    return "\n".join(filter(None, (chunk for shard in results for chunk in shard)))
+
+
+def extract_pypdf2(path: str) -> str:
+    reader = PdfReader(path)
+    pieces = [page.extract_text() or "" for page in reader.pages]
+    return "\n".join(filter(None, pieces))
+
+
+def extract_pdfminer(path: str) -> str:
+    return pdfminer_extract_text(path) or ""
+
+
+def extract_raw_operators(path: str) -> str:
+    """Lightweight fallback: decode content streams directly from the memory-mapped file."""
+    return pdf_raw_decoder.extract_text(path)
+
+
+def available_extractors() -> Dict[str, Callable[[str], str]]:
+    extractors: Dict[str, Callable[[str], str]] = {}
+    if pdfplumber is not None:
+        extractors["pdfplumber"] = extract_pdfplumber
+    if PdfReader is not None:
+        extractors["pypdf2"] = extract_pypdf2
+    if pdfminer_extract_text is not None:
+        extractors["pdfminer"] = extract_pdfminer
+    extractors["raw"] = extract_raw_operators
+    return extractors
+
+
+# ---------------------------------------------------------------------------
+# Budgeted execution
+# ---------------------------------------------------------------------------
+
+
+def _budget_child(conn, func: Callable[[str], str], path: str) -> None:
+    try:
+        conn.send(("ok", func(path)))
+    except Exception as exc:  # pragma: no cover - exercised in the child process
+        conn.send(("error", f"{type(exc).__name__}: {exc}"))
+    finally:
+        conn.close()
+
+
+def run_with_budget(func: Callable[[str], str], path: str, budget: Optional[float]) -> str:
+    """Run ``func(path)`` in a child process, killing it after ``budget`` seconds.
+
+    A falsy budget runs the extractor inline, which is what tests and
+    single-user tooling usually want.
+    """
+    if not budget or budget <= 0:
+        return func(path)
+
+    ctx = worker_pool.get_mp_context()
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_budget_child, args=(sender, func, path), daemon=True)
+    process.start()
+    sender.close()
+    timed_out = False
+    try:
+        if not receiver.poll(budget):
+            timed_out = True
+            raise ExtractorTimeout(f"{getattr(func, '__name__', 'extractor')} exceeded {budget:.1f}s budget")
+        try:
+            status, payload = receiver.recv()
+        except EOFError as exc:
+            raise RuntimeError("extractor process exited without a result") from exc
+    finally:
+        receiver.close()
+        _reap_child(process, grace=0 if timed_out else 1)
+    if status != "ok":
+        raise RuntimeError(payload)
+    return payload
+
+
+def _reap_child(process, grace: float) -> None:
+    process.join(grace)
+    if process.is_alive():
+        process.terminate()
+        process.join(1)
+        if process.is_alive():
+            process.kill()
+    process.join()
+
+
+def _page_stream_child(conn, path: str, extractor: str) -> None:
+    try:
+        for page in iter_pdf_pages(path, extractor):
+            conn.send(("page", page))
+        conn.send(("done", None))
+    except Exception as exc:  # pragma: no cover - exercised in the child process
+        conn.send(("error", f"{type(exc).__name__}: {exc}"))
+    finally:
+        conn.close()
+
+
+def iter_pdf_pages_with_budget(path: str, extractor: str, budget: Optional[float]) -> Iterator[str]:
+    """``iter_pdf_pages`` under the same wall-clock budget as ``run_with_budget``.
+
+    Pages are extracted in a child process and yielded as they arrive. Only
+    time spent waiting for the child counts against ``budget``, so a slow
+    consumer does not use it up; once it is spent the child is killed and
+    ``ExtractorTimeout`` raised. Closing the iterator early kills the child
+    too. A falsy budget streams inline.
+    """
+    if not budget or budget <= 0:
+        yield from iter_pdf_pages(path, extractor)
+        return
+
+    ctx = worker_pool.get_mp_context()
+    receiver, sender = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_page_stream_child, args=(sender, path, extractor), daemon=True)
+    process.start()
+    sender.close()
+    remaining = budget
+    finished = False
+    try:
+        while True:
+            started = time.perf_counter()
+            if not receiver.poll(max(0.0, remaining)):
+                raise ExtractorTimeout(f"{extractor} page stream exceeded {budget:.1f}s budget")
+            try:
+                kind, payload = receiver.recv()
+            except EOFError as exc:
+                raise RuntimeError("extractor process exited without a result") from exc
+            remaining -= time.perf_counter() - started
+            if kind == "done":
+                finished = True
+                return
+            if kind == "error":
+                raise RuntimeError(payload)
+            yield payload
+    finally:
+        receiver.close()
+        _reap_child(process, grace=1 if finished else 0)
+
+
+def run_extractor(name: str, path: str, prescan: PdfPrescan, budget: Optional[float]) -> str:
+    """Run one cascade step, sharding pdfplumber across the pool for long scripts."""
+    min_pages = parallel_min_pages()
+    if (
+        name == "pdfplumber"
+        and min_pages > 0
+        and prescan.page_count >= min_pages
+        and worker_pool.pool_size() > 1
+    ):
+        try:
+            return extract_pdfplumber_parallel(path, prescan.page_count, budget)
+        except worker_pool.PoolTimeout as exc:
+            raise ExtractorTimeout(str(exc)) from exc
+    return run_with_budget(available_extractors()[name], path, budget)
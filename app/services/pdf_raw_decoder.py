@@ -0,0 +1,390 @@
+"""Dependency-free text decoder for PDF content streams.
+
+This is the last-resort (and quick pre-pass) extractor. The file is
+memory-mapped and walked object by object; only the dictionaries and the
+individual streams that matter are ever copied out of the map. Flate streams
+are inflated incrementally, ToUnicode CMaps are honoured for composite
+(Identity-H) fonts, and ``Tj``/``TJ``/``'``/``"`` operands are turned into
+lines using the text-positioning operators around them. Font names are
+resolved against each page's own (or inherited) resource dictionary, since
+``/F1`` on one page may be a different font from ``/F1`` on the next.
+"""
+from __future__ import annotations
+
+import mmap
+import re
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+INFLATE_CHUNK = 64 * 1024
+
+_OBJ_HEADER = re.compile(rb"(\d+)\s+\d+\s+obj\b")
+_STREAM_KEYWORD = re.compile(rb"stream\r?\n")
+_REF = re.compile(rb"(\d+)\s+\d+\s+R")
+_CONTENTS = re.compile(rb"/Contents\s*(\[[^\]]*\]|\d+\s+\d+\s+R)")
+_PAGE_TYPE = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+_FONT_DICT = re.compile(rb"/Font\s*<<(.*?)>>", re.DOTALL)
+_FONT_DICT_REF = re.compile(rb"/Font\s+(\d+)\s+\d+\s+R")
+_RESOURCES_REF = re.compile(rb"/Resources\s+(\d+)\s+\d+\s+R")
+_PARENT = re.compile(rb"/Parent\s+(\d+)\s+\d+\s+R")
+_FONT_ENTRY = re.compile(rb"/([^\s/<>\[\]()]+)\s+(\d+)\s+\d+\s+R")
+_TO_UNICODE = re.compile(rb"/ToUnicode\s+(\d+)\s+\d+\s+R")
+_ENCODING = re.compile(rb"/Encoding\s*/([A-Za-z-]+)")
+_FILTER = re.compile(rb"/Filter\s*\[?\s*/(\w+)")
+_TYPE0 = re.compile(rb"/Subtype\s*/Type0")
+
+_TOKEN = re.compile(
+    rb"\((?:[^()\\]|\\.|\((?:[^()\\]|\\.)*\))*\)"  # literal string (one level of nesting)
+    rb"|<[0-9A-Fa-f\s]*>"  # hex string
+    rb"|\[|\]"
+    rb"|/[^\s/\[\]()<>{}%]+"  # name
+    rb"|[-+]?(?:\d+\.?\d*|\.\d+)"  # number
+    rb"|[A-Za-z'\"*]+",  # operator
+    re.DOTALL,
+)
+_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f", b"(": b"(", b")": b")", b"\\": b"\\"}
+_ESCAPE_PATTERN = re.compile(rb"\\([0-7]{1,3}|\r\n|[\r\n]|.)", re.DOTALL)
+_SIMPLE_ENCODINGS = {b"WinAnsiEncoding": "cp1252", b"MacRomanEncoding": "mac_roman"}
+
+# Glyph advance estimate (in text space units per point) and the gap that counts as a word break.
+_ADVANCE_EM = 0.5
+_WORD_GAP_EM = 0.15
+# TJ adjustments below this (thousandths of an em) are rendered as a space.
+_TJ_SPACE = -200
+
+
+@dataclass
+class _PdfObject:
+    number: int
+    header: bytes
+    stream_start: int = -1
+    stream_end: int = -1
+
+
+@dataclass
+class _Font:
+    encoding: str = "latin-1"
+    cmap: Dict[bytes, str] = field(default_factory=dict)
+    code_length: int = 1
+
+    def decode(self, raw: bytes) -> str:
+        if not self.cmap:
+            return raw.decode(self.encoding, errors="ignore")
+        size = self.code_length
+        return "".join(self.cmap.get(raw[i:i + size], "") for i in range(0, len(raw), size))
+
+
+def _scan_objects(data: mmap.mmap) -> Iterator[_PdfObject]:
+    """Walk the file object by object, skipping over stream bodies without copying them."""
+    pos = 0
+    size = len(data)
+    while pos < size:
+        match = _OBJ_HEADER.search(data, pos)
+        if match is None:
+            return
+        body_start = match.end()
+        end_obj = data.find(b"endobj", body_start)
+        stream_match = _STREAM_KEYWORD.search(data, body_start, end_obj if end_obj != -1 else size)
+        obj = _PdfObject(number=int(match.group(1)), header=b"")
+        if stream_match is not None:
+            obj.header = data[body_start:stream_match.start()]
+            obj.stream_start = stream_match.end()
+            obj.stream_end = data.find(b"endstream", obj.stream_start)
+            if obj.stream_end == -1:
+                obj.stream_end = size
+            end_obj = data.find(b"endobj", obj.stream_end)
+        else:
+            obj.header = data[body_start:end_obj if end_obj != -1 else size]
+        yield obj
+        pos = size if end_obj == -1 else end_obj + len(b"endobj")
+
+
+def _read_stream(data: mmap.mmap, obj: _PdfObject) -> Optional[bytes]:
+    """Return the decoded stream body, inflating Flate data a slice at a time."""
+    filter_match = _FILTER.search(obj.header)
+    view = memoryview(data)[obj.stream_start:obj.stream_end]
+    try:
+        if filter_match is None:
+            return bytes(view)
+        if filter_match.group(1) != b"FlateDecode" or b"/DecodeParms" in obj.header:
+            return None
+        inflater = zlib.decompressobj()
+        out = bytearray()
+        for offset in range(0, len(view), INFLATE_CHUNK):
+            out += inflater.decompress(view[offset:offset + INFLATE_CHUNK])
+            if inflater.eof:
+                break
+        out += inflater.flush()
+        return bytes(out)
+    except zlib.error:
+        return None
+    finally:
+        view.release()
+
+
+def _parse_cmap(cmap: bytes) -> Tuple[Dict[bytes, str], int]:
+    mapping: Dict[bytes, str] = {}
+    code_length = 1
+    space = re.search(rb"begincodespacerange\s*<([0-9A-Fa-f]+)>", cmap)
+    if space:
+        code_length = max(1, len(space.group(1)) // 2)
+
+    def utf16(hex_value: bytes) -> str:
+        return bytes.fromhex(hex_value.decode("ascii")).decode("utf-16-be", errors="ignore")
+
+    for block in re.findall(rb"beginbfchar(.*?)endbfchar", cmap, re.DOTALL):
+        for src, dst in re.findall(rb"<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]*)>", block):
+            mapping[bytes.fromhex(src.decode("ascii"))] = utf16(dst)
+    for block in re.findall(rb"beginbfrange(.*?)endbfrange", cmap, re.DOTALL):
+        for lo, hi, dst in re.findall(rb"<([0-9A-Fa-f]+)>\s*<([0-9A-Fa-f]+)>\s*(<[0-9A-Fa-f]*>|\[[^\]]*\])", block):
+            start, stop = int(lo, 16), int(hi, 16)
+            width = len(lo) // 2
+            if dst.startswith(b"["):
+                targets = [utf16(item) for item in re.findall(rb"<([0-9A-Fa-f]*)>", dst)]
+                for offset, target in enumerate(targets[: stop - start + 1]):
+                    mapping[(start + offset).to_bytes(width, "big")] = target
+            else:
+                base = bytes.fromhex(dst[1:-1].decode("ascii"))
+                if not base:
+                    continue
+                head, last = base[:-2], int.from_bytes(base[-2:], "big")
+                for offset in range(stop - start + 1):
+                    target = head + ((last + offset) & 0xFFFF).to_bytes(2, "big")
+                    mapping[(start + offset).to_bytes(width, "big")] = target.decode("utf-16-be", errors="ignore")
+    return mapping, code_length
+
+
+def _unescape_literal(body: bytes) -> bytes:
+    def replace(match: "re.Match[bytes]") -> bytes:
+        token = match.group(1)
+        if token[:1].isdigit():
+            return bytes([int(token, 8) & 0xFF])
+        if token in (b"\r\n", b"\r", b"\n"):
+            return b""
+        return _ESCAPES.get(token, token)
+
+    return _ESCAPE_PATTERN.sub(replace, body)
+
+
+def _string_bytes(token: bytes) -> bytes:
+    if token[:1] == b"(":
+        return _unescape_literal(token[1:-1])
+    digits = re.sub(rb"\s+", b"", token[1:-1])
+    if len(digits) % 2:
+        digits += b"0"
+    return bytes.fromhex(digits.decode("ascii"))
+
+
+def _number(token: bytes) -> float:
+    try:
+        return float(token)
+    except ValueError:
+        return 0.0
+
+
+def _decode_content(content: bytes, fonts: Dict[bytes, _Font], out: List[str]) -> None:
+    """Append the text shown by one content stream to ``out`` as lines."""
+    font = _Font()
+    font_size = 1.0
+    scale = 1.0
+    line_x = x = 0.0
+    y: Optional[float] = None
+    pending_y: Optional[float] = None
+    line: List[str] = []
+    operands: List[object] = []
+    array: Optional[List[object]] = None
+
+    def flush_line() -> None:
+        text = "".join(line).strip()
+        if text:
+            out.append(text)
+        line.clear()
+
+    def show(items: List[object]) -> None:
+        nonlocal x, y, pending_y
+        size = abs(font_size * scale) or 1.0
+        if pending_y is not None:
+            if y is not None and abs(pending_y - y) > size * 0.5:
+                flush_line()
+            elif line and x > end_x[0] + size * _WORD_GAP_EM:
+                line.append(" ")
+            y = pending_y
+            pending_y = None
+        glyphs = 0
+        for item in items:
+            if isinstance(item, bytes):
+                text = font.decode(_string_bytes(item))
+                line.append(text)
+                glyphs += len(text)
+            elif isinstance(item, float) and item < _TJ_SPACE:
+                line.append(" ")
+        x += glyphs * size * _ADVANCE_EM
+        end_x[0] = x
+
+    end_x = [0.0]
+    for match in _TOKEN.finditer(content):
+        token = match.group(0)
+        first = token[:1]
+        if first in (b"(", b"<"):
+            (array if array is not None else operands).append(token)
+        elif first == b"[":
+            array = []
+        elif first == b"]":
+            operands.append(array or [])
+            array = None
+        elif first == b"/":
+            operands.append(token[1:])
+        elif first in b"+-.0123456789":
+            (array if array is not None else operands).append(_number(token))
+        else:
+            op = token
+            if op == b"Tf" and len(operands) >= 2:
+                font = fonts.get(operands[-2], _Font()) if isinstance(operands[-2], bytes) else _Font()
+                font_size = operands[-1] if isinstance(operands[-1], float) else 1.0
+            elif op == b"Tm" and len(operands) >= 6:
+                a, _, _, d, e, f = operands[-6:]
+                scale = abs(d) or abs(a) or 1.0
+                line_x = x = e
+                pending_y = f
+            elif op in (b"Td", b"TD") and len(operands) >= 2:
+                tx, ty = operands[-2], operands[-1]
+                line_x += tx * scale
+                x = line_x
+                pending_y = (pending_y if pending_y is not None else (y or 0.0)) + ty * scale
+            elif op == b"T*":
+                flush_line()
+                x = line_x
+            elif op == b"Tj" and operands:
+                show([operands[-1]])
+            elif op == b"TJ" and operands and isinstance(operands[-1], list):
+                show(operands[-1])
+            elif op in (b"'", b'"') and operands:
+                flush_line()
+                x = line_x
+                show([operands[-1]])
+            elif op == b"ET":
+                end_x[0] = x
+            operands.clear()
+    flush_line()
+
+
+class _FontTable:
+    """Font decoders built once per font object and shared by every page that uses it."""
+
+    def __init__(self, data: mmap.mmap, objects: Dict[int, _PdfObject]):
+        self.data = data
+        self.objects = objects
+        self._fonts: Dict[int, _Font] = {}
+        self._cmaps: Dict[int, Tuple[Dict[bytes, str], int]] = {}
+
+    def font(self, number: int) -> Optional[_Font]:
+        if number in self._fonts:
+            return self._fonts[number]
+        font_obj = self.objects.get(number)
+        if font_obj is None:
+            return None
+        font = _Font()
+        encoding = _ENCODING.search(font_obj.header)
+        if encoding and encoding.group(1) in _SIMPLE_ENCODINGS:
+            font.encoding = _SIMPLE_ENCODINGS[encoding.group(1)]
+        to_unicode = _TO_UNICODE.search(font_obj.header)
+        if to_unicode:
+            cmap_number = int(to_unicode.group(1))
+            if cmap_number not in self._cmaps and cmap_number in self.objects:
+                cmap_data = _read_stream(self.data, self.objects[cmap_number]) or b""
+                self._cmaps[cmap_number] = _parse_cmap(cmap_data)
+            font.cmap, font.code_length = self._cmaps.get(cmap_number, ({}, 1))
+        elif _TYPE0.search(font_obj.header):
+            font.code_length = 2
+        self._fonts[number] = font
+        return font
+
+    def _named(self, entries: List[Tuple[bytes, bytes]], fonts: Dict[bytes, _Font]) -> Dict[bytes, _Font]:
+        for name, number in entries:
+            font = self.font(int(number))
+            if font is not None and name not in fonts:
+                fonts[name] = font
+        return fonts
+
+    def _resource_fonts(self, header: bytes) -> Optional[List[Tuple[bytes, bytes]]]:
+        """Font entries of a page-tree node's ``/Resources``; ``None`` when it has none to inherit from."""
+        ref = _RESOURCES_REF.search(header)
+        if ref is not None:
+            resources = self.objects.get(int(ref.group(1)))
+            header = resources.header if resources is not None else b""
+        elif b"/Resources" not in header:
+            return None
+        font_ref = _FONT_DICT_REF.search(header)
+        if font_ref is not None:
+            font_dict = self.objects.get(int(font_ref.group(1)))
+            return _FONT_ENTRY.findall(font_dict.header) if font_dict is not None else []
+        font_dict = _FONT_DICT.search(header)
+        return _FONT_ENTRY.findall(font_dict.group(1)) if font_dict else []
+
+    def page_fonts(self, page: _PdfObject) -> Dict[bytes, _Font]:
+        """Font resource names (``/F1``) of one page, inheriting resources up the page tree."""
+        node: Optional[_PdfObject] = page
+        seen = set()
+        while node is not None and node.number not in seen:
+            seen.add(node.number)
+            entries = self._resource_fonts(node.header)
+            if entries is not None:
+                return self._named(entries, {})
+            parent = _PARENT.search(node.header)
+            node = self.objects.get(int(parent.group(1))) if parent else None
+        return {}
+
+    def all_fonts(self) -> Dict[bytes, _Font]:
+        """Every font dictionary in the file, first name wins; for files without a readable page tree."""
+        fonts: Dict[bytes, _Font] = {}
+        for obj in self.objects.values():
+            for font_dict in _FONT_DICT.findall(obj.header):
+                self._named(_FONT_ENTRY.findall(font_dict), fonts)
+        return fonts
+
+
+def _page_contents(objects: Dict[int, _PdfObject]) -> List[Tuple[int, Optional[_PdfObject]]]:
+    """Content stream object numbers in page order (file order of the page objects), with their page."""
+    contents: List[Tuple[int, Optional[_PdfObject]]] = []
+    for obj in objects.values():
+        if not _PAGE_TYPE.search(obj.header):
+            continue
+        match = _CONTENTS.search(obj.header)
+        if not match:
+            continue
+        for ref in _REF.findall(match.group(1)):
+            contents.append((int(ref), obj))
+    if contents:
+        return contents
+    # No readable page tree (e.g. compressed object streams): try every plain stream.
+    return [(number, None) for number, obj in objects.items() if obj.stream_start >= 0]
+
+
+def iter_page_text(path: Path) -> Iterator[str]:
+    """Yield the decoded text of each content stream in page order."""
+    with open(path, "rb") as handle:
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            objects = {obj.number: obj for obj in _scan_objects(data)}
+            table = _FontTable(data, objects)
+            page_fonts: Dict[Optional[int], Dict[bytes, _Font]] = {}
+            for number, page in _page_contents(objects):
+                obj = objects.get(number)
+                if obj is None or obj.stream_start < 0:
+                    continue
+                content = _read_stream(data, obj)
+                if not content:
+                    continue
+                key = page.number if page is not None else None
+                if key not in page_fonts:
+                    page_fonts[key] = table.page_fonts(page) if page is not None else table.all_fonts()
+                lines: List[str] = []
+                _decode_content(content, page_fonts[key], lines)
+                if lines:
+                    yield "\n".join(lines)
+
+
+def extract_text(path: str) -> str:
+    return "\n".join(iter_page_text(Path(path)))
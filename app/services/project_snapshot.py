@@ -16,6 +16,8 @@ from app.models.models import Actor, Crew, Finance, Project, Scene, Script, ToDo
 
 CHARACTER_PATTERN = re.compile(r"\b[A-Z][A-Z0-9]{2,}\b")
 LOCATION_SPLIT_PATTERN = re.compile(r"\b(INT\.|EXT\.)\s*(.*)")
+# Reads retried when an analysis is swapped in while a snapshot is being taken.
+SNAPSHOT_ATTEMPTS = 3
 
 
 @dataclass
@@ -27,6 +29,8 @@ class SceneSummary:
     word_count: int
     predicted_budget: float
     suggested_location: Optional[str]
+    # From the project's character registry; None for projects analysed before it existed.
+    characters: Optional[List[str]] = None
 
     def to_dict(self) -> Dict[str, Any]:
         location_guess = self.suggested_location
@@ -35,7 +39,7 @@ class SceneSummary:
             match = LOCATION_SPLIT_PATTERN.search(self.heading)
             if match:
                 location_guess = match.group(2).strip().title()
-        characters = extract_characters(self.description)
+        characters = self.characters if self.characters is not None else extract_characters(self.description)
         props = extract_props(self.description)
         return {
             "id": self.id,
@@ -194,6 +198,7 @@ def build_script_data(
     crew: Iterable[Crew],
     actors: Iterable[Actor],
     schedule_entries: Iterable[Dict[str, Any]],
+    scene_cast: Optional[Dict[int, List[str]]] = None,
 ) -> Dict[str, Any]:
     scene_summaries = [
         SceneSummary(
@@ -204,6 +209,7 @@ def build_script_data(
             word_count=scene.word_count or 0,
             predicted_budget=scene.predicted_budget or 0.0,
             suggested_location=scene.suggested_location,
+            characters=scene_cast.get(scene.index, []) if scene_cast else None,
         ).to_dict()
         for scene in scenes
     ]
@@ -241,18 +247,30 @@ def build_script_data(
 
 
 def build_project_snapshot(db: Session, project: Project) -> Dict[str, Any]:
+    # Every list is read against one active run. If another run is swapped in
+    # meanwhile (and its retired rows collected), the lists are read again.
+    for _ in range(SNAPSHOT_ATTEMPTS):
+        active_run_id = crud.get_active_run_id(db, project.id)
+        snapshot = _project_snapshot(db, project, active_run_id)
+        if crud.get_active_run_id(db, project.id) == active_run_id:
+            break
+    return snapshot
+
+
+def _project_snapshot(db: Session, project: Project, active_run_id: int) -> Dict[str, Any]:
     script = crud.get_latest_script(db, project.id)
-    scenes = list(crud.get_scenes_by_project(db, project.id))
-    todos = list(crud.get_todos_by_project(db, project.id))
+    scenes = list(crud.get_scenes_by_project(db, project.id, active_run_id))
+    todos = list(crud.get_todos_by_project(db, project.id, active_run_id))
     crew = list(crud.get_crews_by_project(db, project.id))
-    actors = list(crud.get_actors_by_project(db, project.id))
+    actors = list(crud.get_actors_by_project(db, project.id, active_run_id))
+    registry = crud.get_character_registry(db, project.id, active_run_id)
     schedule_entries = [
         {
             "id": entry.id,
             "dates_json": entry.dates_json,
             "task": entry.task,
         }
-        for entry in crud.get_schedule_by_project(db, project.id)
+        for entry in crud.get_schedule_by_project(db, project.id, active_run_id)
     ]
 
     script_data = build_script_data(
@@ -263,6 +281,7 @@ def build_project_snapshot(db: Session, project: Project) -> Dict[str, Any]:
         crew=crew,
         actors=actors,
         schedule_entries=schedule_entries,
+        scene_cast=registry.cast_by_scene() if len(registry) else None,
     )
 
     return {
@@ -277,8 +296,9 @@ def build_project_snapshot(db: Session, project: Project) -> Dict[str, Any]:
 
 
 def build_project_reports(db: Session, project: Project) -> Dict[str, Any]:
-    scenes = list(crud.get_scenes_by_project(db, project.id))
-    todos = list(crud.get_todos_by_project(db, project.id))
+    active_run_id = crud.get_active_run_id(db, project.id)
+    scenes = list(crud.get_scenes_by_project(db, project.id, active_run_id))
+    todos = list(crud.get_todos_by_project(db, project.id, active_run_id))
     crew = list(crud.get_crews_by_project(db, project.id))
     project_tasks = list(crud.get_tasks_by_project(db, project.id))
     finances = db.query(Finance).filter(Finance.project_id == project.id).all()
@@ -297,7 +317,7 @@ def build_project_reports(db: Session, project: Project) -> Dict[str, Any]:
         (tasks_completed / tasks_total) * 100.0 if tasks_total else 0.0
     )
 
-    budget_breakdown = crud.get_budget_per_scene(db, project.id)
+    budget_breakdown = crud.get_budget_per_scene(db, project.id, active_run_id)
     location_summary = list(dict.fromkeys(crud.summarise_locations(scenes)))
 
     return {
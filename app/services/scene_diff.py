@@ -0,0 +1,105 @@
+"""Align two scene breakdowns of the same script by per-scene content hashes.
+
+A revision is described scene by scene: ``unchanged`` (same content, in
+order; the number may still shift), ``moved`` (same content, new position),
+``edited`` (same slot, new content), ``inserted`` and ``deleted``. Exact
+content matches are found first with a longest-matching-block alignment of
+the hash sequences; whatever is left is paired up by heading so that a
+rewritten scene keeps its identity (and its to-dos) instead of showing up as
+a delete plus an insert.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+UNCHANGED = "unchanged"
+MOVED = "moved"
+EDITED = "edited"
+INSERTED = "inserted"
+DELETED = "deleted"
+CHANGE_KINDS = (UNCHANGED, MOVED, EDITED, INSERTED, DELETED)
+
+# Placeholder headings given to scenes without one; they follow the scene number, not the content.
+_NUMBERED_HEADING = re.compile(r"^Scene \d+$")
+_SPACES = re.compile(r"\s+")
+
+# (content hash, heading) of one scene, in script order.
+SceneKey = Tuple[str, Optional[str]]
+
+
+def scene_content_hash(heading: Optional[str], description: Optional[str]) -> str:
+    """SHA-256 of a scene's heading and text; scene numbers never enter the hash."""
+    heading = (heading or "").strip()
+    if _NUMBERED_HEADING.match(heading):
+        heading = ""
+    payload = f"{heading.upper()}\n{description or ''}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _heading_key(heading: Optional[str]) -> str:
+    return _SPACES.sub(" ", (heading or "").strip()).upper()
+
+
+@dataclass(frozen=True)
+class SceneChange:
+    kind: str
+    old: Optional[int]  # position in the old breakdown
+    new: Optional[int]  # position in the new breakdown
+
+
+def _match_exact(old: Sequence[str], new: Sequence[str]) -> Tuple[Dict[int, int], Dict[int, int]]:
+    """In-order and out-of-order content matches, as new position -> old position."""
+    in_order: Dict[int, int] = {}
+    matcher = SequenceMatcher(None, old, new, autojunk=False)
+    for block in matcher.get_matching_blocks():
+        for offset in range(block.size):
+            in_order[block.b + offset] = block.a + offset
+
+    matched_old = set(in_order.values())
+    spare: Dict[str, Deque[int]] = defaultdict(deque)
+    for position, digest in enumerate(old):
+        if position not in matched_old:
+            spare[digest].append(position)
+    moved: Dict[int, int] = {}
+    for position, digest in enumerate(new):
+        if position not in in_order and spare.get(digest):
+            moved[position] = spare[digest].popleft()
+    return in_order, moved
+
+
+def align_scenes(old: Sequence[SceneKey], new: Sequence[SceneKey]) -> List[SceneChange]:
+    """Scene-level changes turning ``old`` into ``new``, ordered by new position (deletions last)."""
+    in_order, moved = _match_exact([digest for digest, _ in old], [digest for digest, _ in new])
+    changes = [SceneChange(UNCHANGED, old_position, new_position) for new_position, old_position in in_order.items()]
+    changes.extend(SceneChange(MOVED, old_position, new_position) for new_position, old_position in moved.items())
+
+    matched_old = set(in_order.values()) | set(moved.values())
+    rest_old = [position for position in range(len(old)) if position not in matched_old]
+    rest_new = [position for position in range(len(new)) if position not in in_order and position not in moved]
+    matcher = SequenceMatcher(
+        None,
+        [_heading_key(old[position][1]) for position in rest_old],
+        [_heading_key(new[position][1]) for position in rest_new],
+        autojunk=False,
+    )
+    for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+        old_slice = rest_old[old_start:old_end]
+        new_slice = rest_new[new_start:new_end]
+        # Equal headings, or a rewritten stretch of the same length: the same scenes, edited.
+        paired = min(len(old_slice), len(new_slice))
+        changes.extend(SceneChange(EDITED, old_slice[i], new_slice[i]) for i in range(paired))
+        changes.extend(SceneChange(INSERTED, None, position) for position in new_slice[paired:])
+        changes.extend(SceneChange(DELETED, position, None) for position in old_slice[paired:])
+
+    changes.sort(key=lambda change: (change.new is None, change.new if change.new is not None else change.old))
+    return changes
+
+
+def summarise(changes: Sequence[SceneChange]) -> Dict[str, int]:
+    counts = Counter(change.kind for change in changes)
+    return {kind: counts.get(kind, 0) for kind in CHANGE_KINDS}
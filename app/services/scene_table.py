@@ -0,0 +1,297 @@
+"""Column-oriented storage for a script's scene breakdown.
+
+A breakdown as a list of dicts holds every scene's text twice (``content``
+lines and the joined ``description``) plus a dict, two lists and a dict of
+dialogue counts per scene. ``SceneTable`` keeps instead:
+
+* one text buffer with every content line joined by ``"\\n"``, a start offset
+  per line and the first line of each scene, so ``description`` is a slice of
+  the buffer and ``content`` is split from it on demand;
+* ``array`` columns for ``index``, ``word_count`` and ``predicted_budget``;
+* headings, locations, times of day, tones, character names and dialogue
+  cues interned in one string pool and stored as integer codes, with the
+  per-scene character and dialogue lists flattened into offset-indexed
+  arrays.
+
+``table[i]`` is a ``SceneView``: a read-only mapping with the keys of the
+scene dicts, so code written against ``scene["heading"]`` or
+``scene.get("characters")`` works unchanged, and ``to_dict()`` (or
+``table.to_dicts()``) gives the original shape back for the API.
+"""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Mapping
+from itertools import accumulate
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+SCENE_KEYS = (
+    "index",
+    "heading",
+    "description",
+    "word_count",
+    "content",
+    "location",
+    "time_of_day",
+    "characters",
+    "dialogue",
+    "tone",
+)
+_KEY_SET = frozenset(SCENE_KEYS)
+_NONE = -1  # code for a missing location / time of day
+
+
+class _StringPool:
+    def __init__(self, strings: Sequence[str] = ()):
+        self.strings: List[str] = list(strings)
+        self.codes: Dict[str, int] = {value: code for code, value in enumerate(self.strings)}
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return _NONE
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.strings)
+            self.strings.append(value)
+        return code
+
+
+class SceneView(Mapping):
+    """One row of a ``SceneTable``, readable like the scene dict it replaces."""
+
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: "SceneTable", row: int):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _KEY_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(SCENE_KEYS)
+
+    def __len__(self) -> int:
+        return len(SCENE_KEYS)
+
+    def __repr__(self) -> str:
+        return f"SceneView(index={self.index}, heading={self.heading!r})"
+
+    @property
+    def row(self) -> int:
+        return self._row
+
+    @property
+    def index(self) -> int:
+        return self._table._index[self._row]
+
+    @property
+    def word_count(self) -> int:
+        return self._table._word_count[self._row]
+
+    @property
+    def predicted_budget(self) -> float:
+        return self._table.predicted_budget[self._row]
+
+    @property
+    def heading(self) -> str:
+        return self._table._string(self._table._heading[self._row])
+
+    @property
+    def location(self) -> Optional[str]:
+        return self._table._string(self._table._location[self._row])
+
+    @property
+    def time_of_day(self) -> Optional[str]:
+        return self._table._string(self._table._time_of_day[self._row])
+
+    @property
+    def tone(self) -> str:
+        return self._table._string(self._table._tone[self._row])
+
+    @property
+    def description(self) -> str:
+        return self._table._description(self._row)
+
+    @property
+    def content(self) -> List[str]:
+        return self._table._content(self._row)
+
+    @property
+    def characters(self) -> List[str]:
+        table, row = self._table, self._row
+        strings = table._strings
+        return [strings[code] for code in table._cast[table._cast_offsets[row]:table._cast_offsets[row + 1]]]
+
+    @property
+    def dialogue(self) -> Dict[str, int]:
+        table, row = self._table, self._row
+        start, stop = table._dialogue_offsets[row], table._dialogue_offsets[row + 1]
+        strings = table._strings
+        return {strings[code]: lines for code, lines in zip(table._cues[start:stop], table._dialogue_lines[start:stop])}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in SCENE_KEYS}
+
+
+def _differences(offsets: array) -> array:
+    return array("Q", (stop - start for start, stop in zip(offsets, offsets[1:])))
+
+
+class SceneTable:
+    def __init__(self) -> None:
+        self._text = ""
+        self._line_starts = array("Q")  # char offset of every content line, plus one past the end
+        self._first_line = array("Q", [0])  # per scene, plus a final sentinel
+        self._index = array("I")
+        self._word_count = array("I")
+        self.predicted_budget = array("d")
+        self._strings: List[str] = []
+        self._heading = array("i")
+        self._location = array("i")
+        self._time_of_day = array("i")
+        self._tone = array("i")
+        self._cast_offsets = array("Q", [0])
+        self._cast = array("I")
+        self._dialogue_offsets = array("Q", [0])
+        self._cues = array("I")
+        self._dialogue_lines = array("I")
+
+    @classmethod
+    def from_scenes(cls, scenes: Iterable[Mapping[str, Any]]) -> "SceneTable":
+        """Build from scene dicts, consuming them one at a time (pass a generator to never hold them all)."""
+        table = cls()
+        pool = _StringPool()
+        parts: List[str] = []
+        position = 0
+        line_starts = table._line_starts
+        for scene in scenes:
+            content = scene.get("content") or []
+            description = scene.get("description") or ""
+            if len(description) != sum(map(len, content)) + max(0, len(content) - 1):
+                raise ValueError("scene description must be its content lines joined by newlines")
+            if content:
+                if parts:
+                    position += 1  # the separator before this scene's first line
+                line_starts.extend(accumulate(map(len, content[:-1]), lambda start, size: start + size + 1, initial=position))
+                parts.append(description)
+                position += len(description)
+            table._first_line.append(len(line_starts))
+            table._index.append(scene["index"])
+            table._word_count.append(scene.get("word_count") or 0)
+            table.predicted_budget.append(0.0)
+            table._heading.append(pool.code(scene.get("heading")))
+            table._location.append(pool.code(scene.get("location")))
+            table._time_of_day.append(pool.code(scene.get("time_of_day")))
+            table._tone.append(pool.code(scene.get("tone")))
+            table._cast.extend(map(pool.code, scene.get("characters") or ()))
+            table._cast_offsets.append(len(table._cast))
+            dialogue = scene.get("dialogue") or {}
+            table._cues.extend(map(pool.code, dialogue))
+            table._dialogue_lines.extend(dialogue.values())
+            table._dialogue_offsets.append(len(table._cues))
+        table._text = "\n".join(parts)
+        line_starts.append(len(table._text) + 1)
+        table._strings = pool.strings
+        return table
+
+    @classmethod
+    def concat(cls, tables: Sequence["SceneTable"]) -> "SceneTable":
+        """Tables one after another; each table's scene indices continue from the previous one's count."""
+        result = cls()
+        pool = _StringPool()
+        texts: List[str] = []
+        char_offset = 0
+        scene_offset = 0
+        for table in tables:
+            if not len(table):
+                continue
+            remap = [pool.code(value) for value in table._strings]
+            lines_before = len(result._line_starts)
+            if len(table._line_starts) > 1:
+                if texts:
+                    char_offset += 1
+                texts.append(table._text)
+                result._line_starts.extend(start + char_offset for start in table._line_starts[:-1])
+                char_offset += len(table._text)
+            result._first_line.extend(first + lines_before for first in table._first_line[1:])
+            result._index.extend(index + scene_offset for index in table._index)
+            result._word_count.extend(table._word_count)
+            result.predicted_budget.extend(table.predicted_budget)
+            for column in ("_heading", "_location", "_time_of_day", "_tone"):
+                getattr(result, column).extend(code if code == _NONE else remap[code] for code in getattr(table, column))
+            cast_before, cues_before = len(result._cast), len(result._cues)
+            result._cast.extend(map(remap.__getitem__, table._cast))
+            result._cast_offsets.extend(offset + cast_before for offset in table._cast_offsets[1:])
+            result._cues.extend(map(remap.__getitem__, table._cues))
+            result._dialogue_lines.extend(table._dialogue_lines)
+            result._dialogue_offsets.extend(offset + cues_before for offset in table._dialogue_offsets[1:])
+            scene_offset += len(table)
+        result._text = "\n".join(texts)
+        result._line_starts.append(len(result._text) + 1)
+        result._strings = pool.strings
+        return result
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, row: int) -> SceneView:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("scene row out of range")
+        return SceneView(self, row)
+
+    def __iter__(self) -> Iterator[SceneView]:
+        return (SceneView(self, row) for row in range(len(self)))
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [view.to_dict() for view in self]
+
+    def word_counts(self) -> array:
+        return array("I", self._word_count)
+
+    def line_counts(self) -> array:
+        """Number of content lines of each scene."""
+        return _differences(self._first_line)
+
+    def cast_sizes(self) -> array:
+        """Number of characters in each scene."""
+        return _differences(self._cast_offsets)
+
+    def dialogue_line_totals(self) -> array:
+        """Dialogue lines of each scene, summed over its speakers."""
+        before = array("Q", accumulate(self._dialogue_lines, initial=0))
+        offsets = self._dialogue_offsets
+        return array("Q", (before[offsets[row + 1]] - before[offsets[row]] for row in range(len(self))))
+
+    def nbytes(self) -> int:
+        """Approximate payload size: text buffer, arrays and pooled strings."""
+        arrays = [value for value in vars(self).values() if isinstance(value, array)]
+        return len(self._text) + sum(column.itemsize * len(column) for column in arrays) + sum(map(len, self._strings))
+
+    def _string(self, code: int) -> Optional[str]:
+        return None if code == _NONE else self._strings[code]
+
+    def _span(self, row: int) -> tuple[int, int, int]:
+        first, last = self._first_line[row], self._first_line[row + 1]
+        return first, last, last - first
+
+    def _description(self, row: int) -> str:
+        first, last, count = self._span(row)
+        if not count:
+            return ""
+        return self._text[self._line_starts[first]:self._line_starts[last] - 1]
+
+    def _content(self, row: int) -> List[str]:
+        first, last, count = self._span(row)
+        if not count:
+            return []
+        description = self._text[self._line_starts[first]:self._line_starts[last] - 1]
+        if description.count("\n") == count - 1:
+            return description.split("\n")
+        # A line with an embedded newline (possible from native formats): slice line by line.
+        starts = self._line_starts
+        return [self._text[starts[line]:starts[line + 1] - 1] for line in range(first, last)]
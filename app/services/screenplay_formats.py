@@ -0,0 +1,213 @@
+"""Native readers for Fountain and Final Draft (``.fdx``) screenplays.
+
+Both formats already say which line is a scene heading, a character cue or
+action, so these readers hand scene blocks straight to the breakdown instead
+of round-tripping through PDF text extraction and heuristic re-parsing. The
+FDX reader is a streaming ``iterparse`` over the XML; the Fountain reader
+consumes the file line by line.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+from xml.etree import ElementTree
+
+
+FOUNTAIN_SUFFIXES = {".fountain", ".spmd"}
+FDX_SUFFIXES = {".fdx"}
+NATIVE_SUFFIXES = FOUNTAIN_SUFFIXES | FDX_SUFFIXES
+
+_FOUNTAIN_HEADING = re.compile(r"^(?:INT\.?/EXT|EXT\.?/INT|I/E|INT|EXT|EST)[. ]", re.IGNORECASE)
+_SCENE_NUMBER = re.compile(r"\s*#[\w.-]+#\s*$")
+_TITLE_KEY = re.compile(r"^[A-Za-z][A-Za-z ]*:")
+_NOTE = re.compile(r"\[\[.*?\]\]")
+_EMPHASIS = re.compile(r"(\*{1,3}|_)(?=\S)(.+?)(?<=\S)\1")
+_CUE_EXTENSION = re.compile(r"\s*\(.*?\)\s*$")
+_DUAL_DIALOGUE = re.compile(r"\s*\^\s*$")
+_NON_PRINTING = re.compile(r"^(?:#|=(?!=)|={3,}$)")
+
+
+@dataclass
+class SceneBlock:
+    """One scene as the source file describes it; ``heading`` is None for text before the first scene."""
+
+    heading: Optional[str]
+    lines: List[str] = field(default_factory=list)
+    characters: List[str] = field(default_factory=list)
+    # Dialogue lines per speaker (parentheticals excluded).
+    dialogue: Dict[str, int] = field(default_factory=dict)
+
+    def add_character(self, cue: str) -> str:
+        name = _CUE_EXTENSION.sub("", _DUAL_DIALOGUE.sub("", cue)).strip()
+        if name and name not in self.characters:
+            self.characters.append(name)
+        return name
+
+    def add_dialogue(self, speaker: str) -> None:
+        if speaker:
+            self.dialogue[speaker] = self.dialogue.get(speaker, 0) + 1
+
+
+def _plain(text: str) -> str:
+    return _EMPHASIS.sub(r"\2", _NOTE.sub("", text)).replace("\\", "").strip()
+
+
+def _is_character_cue(line: str) -> bool:
+    name = _CUE_EXTENSION.sub("", _DUAL_DIALOGUE.sub("", line)).strip()
+    return bool(name) and name.upper() == name and any(ch.isalpha() for ch in name)
+
+
+def iter_fountain_blocks(lines: Iterable[str]) -> Iterator[SceneBlock]:
+    """Parse Fountain source into scene blocks, yielding each one when the next heading starts."""
+    source = iter(lines)
+    pending: Optional[str] = None
+    first = next(source, None)
+    if first is not None and _TITLE_KEY.match(first.strip()):
+        # Title page: key/value pairs up to the first blank line.
+        for line in source:
+            if not line.strip():
+                break
+    elif first is not None:
+        pending = first
+
+    def remaining() -> Iterator[str]:
+        if pending is not None:
+            yield pending
+        yield from source
+
+    block = SceneBlock(heading=None)
+    previous_blank = True
+    in_dialogue = False
+    in_boneyard = False
+    buffered: Optional[str] = None
+    speaker = ""
+
+    for raw in remaining():
+        line = raw.rstrip("\r\n")
+        if in_boneyard:
+            if "*/" in line:
+                in_boneyard = False
+                line = line.split("*/", 1)[1]
+            else:
+                continue
+        if "/*" in line:
+            head, _, tail = line.partition("/*")
+            if "*/" in tail:
+                line = head + tail.split("*/", 1)[1]
+            else:
+                line = head
+                in_boneyard = True
+        stripped = line.strip()
+
+        if buffered is not None:
+            # A cue candidate only counts when dialogue follows on the next line.
+            if stripped:
+                cue = buffered.lstrip("@")
+                speaker = block.add_character(cue)
+                block.lines.append(_plain(cue))
+                in_dialogue = True
+            else:
+                block.lines.append(_plain(buffered))
+            buffered = None
+
+        if not stripped:
+            previous_blank = True
+            in_dialogue = False
+            continue
+        if _NON_PRINTING.match(stripped):
+            # sections, synopses and page breaks carry no screen content
+            continue
+
+        forced_heading = stripped.startswith(".") and not stripped.startswith("..")
+        if previous_blank and (forced_heading or _FOUNTAIN_HEADING.match(stripped)):
+            if block.heading is not None or block.lines:
+                yield block
+            heading = stripped[1:] if forced_heading else stripped
+            block = SceneBlock(heading=_plain(_SCENE_NUMBER.sub("", heading)).upper())
+            previous_blank = False
+            in_dialogue = False
+            continue
+
+        if not in_dialogue and previous_blank and (stripped.startswith("@") or _is_character_cue(stripped)):
+            if not stripped.endswith("TO:"):
+                buffered = stripped
+                previous_blank = False
+                continue
+
+        if stripped.startswith(">"):
+            # forced transition (">CUT TO BLACK.") or centred text (">THE END<")
+            stripped = stripped[1:].rstrip("<")
+        elif stripped.startswith("!"):
+            stripped = stripped[1:]
+        text = _plain(stripped)
+        if text:
+            block.lines.append(text)
+            if in_dialogue and not text.startswith("("):
+                block.add_dialogue(speaker)
+        previous_blank = False
+
+    if buffered is not None:
+        block.lines.append(_plain(buffered))
+    if block.heading is not None or block.lines:
+        yield block
+
+
+def _fdx_text(paragraph: ElementTree.Element) -> str:
+    return "".join(node.text or "" for node in paragraph.findall("Text")).strip()
+
+
+def iter_fdx_blocks(path: Path) -> Iterator[SceneBlock]:
+    """Stream ``<Content>`` paragraphs of a Final Draft file into scene blocks.
+
+    Title-page paragraphs are ignored; every paragraph is cleared once read.
+    Raises ``ElementTree.ParseError`` for malformed XML.
+    """
+    block = SceneBlock(heading=None)
+    speaker = ""
+    title_page_depth = 0
+    content: Optional[ElementTree.Element] = None
+    for event, element in ElementTree.iterparse(str(path), events=("start", "end")):
+        tag = element.tag
+        if tag == "TitlePage":
+            title_page_depth += 1 if event == "start" else -1
+            continue
+        if event == "start":
+            if tag == "Content" and not title_page_depth:
+                content = element
+            continue
+        if tag != "Paragraph":
+            continue
+        kind = element.get("Type", "")
+        text = "" if title_page_depth else _fdx_text(element)
+        element.clear()
+        if content is not None:
+            # Detach finished paragraphs so the tree never grows past one of them.
+            content.clear()
+        if not text:
+            continue
+        if kind == "Scene Heading":
+            if block.heading is not None or block.lines:
+                yield block
+            block = SceneBlock(heading=text.upper())
+            speaker = ""
+            continue
+        if kind == "Character":
+            speaker = block.add_character(text)
+        elif kind == "Dialogue":
+            block.add_dialogue(speaker)
+        elif kind != "Parenthetical":
+            speaker = ""
+        block.lines.append(text)
+    if block.heading is not None or block.lines:
+        yield block
+
+
+def iter_native_blocks(path: Path) -> Iterator[SceneBlock]:
+    suffix = path.suffix.lower()
+    if suffix in FDX_SUFFIXES:
+        yield from iter_fdx_blocks(path)
+        return
+    with open(path, encoding="utf-8-sig") as handle:
+        yield from iter_fountain_blocks(handle)
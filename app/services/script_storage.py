@@ -0,0 +1,49 @@
+"""Compressed, content-addressed encoding for stored script text.
+
+Global scripts keep the cleaned text of an upload, not its raw bytes. The
+text is compressed once and identified by the SHA-256 of its UTF-8 form, so
+identical uploads can share a single stored body.
+"""
+from __future__ import annotations
+
+import hashlib
+import lzma
+import os
+import zlib
+from typing import Tuple
+
+
+DEFAULT_CODEC = "zlib"
+ZLIB_LEVEL = 6
+
+
+class UnknownCodec(ValueError):
+    """Raised for a stored body written with a codec this build cannot read."""
+
+
+def storage_codec() -> str:
+    codec = os.getenv("SCRIPT_STORAGE_CODEC", DEFAULT_CODEC)
+    if codec not in ("zlib", "lzma"):
+        raise UnknownCodec(f"Unsupported SCRIPT_STORAGE_CODEC {codec!r}")
+    return codec
+
+
+def text_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def encode_text(text: str, codec: str | None = None) -> Tuple[str, bytes]:
+    """Return ``(codec, payload)`` for ``text``."""
+    codec = codec or storage_codec()
+    raw = text.encode("utf-8")
+    if codec == "lzma":
+        return codec, lzma.compress(raw, preset=6)
+    return "zlib", zlib.compress(raw, ZLIB_LEVEL)
+
+
+def decode_text(codec: str, payload: bytes) -> str:
+    if codec == "zlib":
+        return zlib.decompress(payload).decode("utf-8")
+    if codec == "lzma":
+        return lzma.decompress(payload).decode("utf-8")
+    raise UnknownCodec(f"Unsupported script storage codec {codec!r}")
@@ -0,0 +1,125 @@
+"""Text normalisation and quality counts for extracted scripts.
+
+The whole buffer is cleaned with C-level primitives and no per-character
+Python code: BOMs and CRLFs are removed with ``str.replace``, non-ASCII runs
+are blanked while encoding to ASCII, a 256-entry ``bytes.translate`` table
+folds line endings and control characters, and space runs, line edges and
+blank lines are squeezed with repeated ``bytes.replace``. The letter, space,
+newline and control counts used for quality scoring come from the same ASCII
+buffer via ``bytes.translate``/``count``.
+"""
+from __future__ import annotations
+
+import codecs
+import re
+import string
+from dataclasses import dataclass
+from typing import Iterator, Tuple
+
+
+HEADING_MARKERS = ("INT", "EXT", "SCENE", "FADE")
+
+_BLANK_ERRORS = "text_normalisation.blank"
+# Called with a whole run of unencodable characters; the run becomes one space.
+codecs.register_error(_BLANK_ERRORS, lambda exc: (" ", exc.end))
+
+
+def _fold_table() -> bytes:
+    # Lone \r and form feeds end a line; tabs and the other control characters
+    # become spaces, which are squeezed like the space a non-ASCII run becomes.
+    table = bytearray(range(256))
+    for code in list(range(0x20)) + [0x7F]:
+        if code != 0x0A:
+            table[code] = 0x20
+    table[0x0D] = table[0x0C] = 0x0A
+    return bytes(table)
+
+
+_FOLD_TABLE = _fold_table()
+_NON_ASCII = re.compile(r"[^\x00-\x7F]+")
+_ASCII_LETTERS = string.ascii_letters.encode("ascii")
+_LOW_CONTROLS = bytes(range(9))
+
+
+@dataclass(frozen=True)
+class TextStats:
+    length: int
+    letters: int
+    spaces: int
+    newlines: int
+    replacements: int
+    controls: int
+
+    @property
+    def prose(self) -> int:
+        return self.letters + self.spaces + self.newlines
+
+
+def _squeeze(data: bytes, run: bytes, replacement: bytes) -> bytes:
+    # Each pass shortens every run, so long runs need only a logarithmic number of passes.
+    while run in data:
+        data = data.replace(run, replacement)
+    return data
+
+
+def _fold(text: str) -> bytes:
+    """ASCII bytes with line endings/control characters folded and spaces squeezed."""
+    text = text.replace("\ufeff", "").replace("\r\n", "\n")
+    data = text.encode("ascii", _BLANK_ERRORS).translate(_FOLD_TABLE)
+    return _squeeze(data, b"  ", b" ")
+
+
+def _normalised_bytes(text: str) -> bytes:
+    data = _fold(text).replace(b" \n", b"\n").replace(b"\n ", b"\n")
+    return _squeeze(data, b"\n\n\n", b"\n\n").strip()
+
+
+def _measure_ascii(data: bytes, replacements: int = 0) -> TextStats:
+    letters = len(data) - len(data.translate(None, _ASCII_LETTERS))
+    controls = len(data) - len(data.translate(None, _LOW_CONTROLS))
+    return TextStats(len(data), letters, data.count(b" "), data.count(b"\n"), replacements, controls)
+
+
+def normalise(text: str) -> str:
+    """Clean extracted text: ASCII only, single spaces, trimmed lines, at most one blank line in a row."""
+    if not text:
+        return ""
+    return _normalised_bytes(text).decode("ascii")
+
+
+def iter_normalised_lines(text: str) -> Iterator[str]:
+    """Per-line variant of :func:`normalise` for streaming; blank runs are left alone."""
+    if text:
+        for line in _fold(text).decode("ascii").splitlines():
+            yield line.strip(" ")
+
+
+def measure(text: str) -> TextStats:
+    """Count letters, spaces, newlines, U+FFFD and C0 controls below TAB."""
+    if text.isascii():
+        return _measure_ascii(text.encode("ascii"))
+    stats = _measure_ascii(text.encode("ascii", "ignore"), text.count("\ufffd"))
+    # Only the (usually rare) non-ASCII characters need a Python-level check.
+    extra_letters = sum(1 for ch in "".join(_NON_ASCII.findall(text)) if ch.isalpha())
+    return TextStats(
+        len(text),
+        stats.letters + extra_letters,
+        stats.spaces,
+        stats.newlines,
+        stats.replacements,
+        stats.controls,
+    )
+
+
+def normalise_and_measure(text: str) -> Tuple[str, TextStats]:
+    """Clean ``text`` and count the cleaned result from the same buffer."""
+    if not text:
+        return "", TextStats(0, 0, 0, 0, 0, 0)
+    data = _normalised_bytes(text)
+    return data.decode("ascii"), _measure_ascii(data)
+
+
+def heading_markers(text: str) -> int:
+    """How many of the screenplay markers (INT, EXT, SCENE, FADE) appear, case-insensitively."""
+    upper = text.upper()
+    return sum(1 for marker in HEADING_MARKERS if marker in upper)
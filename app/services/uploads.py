@@ -0,0 +1,232 @@
+"""Streaming persistence of uploaded scripts.
+
+Uploads are copied to disk in fixed-size chunks without blocking the event
+loop, hashed and measured on the fly, and only become visible under their
+final name through an atomic rename once they are complete.
+
+Resumable uploads append byte ranges to a per-session part file. Every range
+is hashed as it is written and folded into a chained manifest digest, so the
+assembled file never has to be read back before it is handed over. Writing a
+range and committing it happen under an exclusive lock on the session, so two
+requests for the same offset can never interleave their bytes.
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import re
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Optional, Set, Tuple
+
+import anyio
+from fastapi import UploadFile
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+DEFAULT_MAX_UPLOAD_BYTES = 100 * 1024 * 1024
+DEFAULT_CHUNK_BYTES = 1024 * 1024
+DEFAULT_SESSION_TTL_HOURS = 24
+UPLOADS_DIR_NAME = "uploads"
+SESSIONS_DIR_NAME = ".sessions"
+
+_CONTENT_RANGE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds ``MAX_UPLOAD_BYTES``."""
+
+
+class ChunkRejected(ValueError):
+    """Raised when a byte range is malformed, out of bounds or fails its checksum."""
+
+
+class SessionBusy(RuntimeError):
+    """Raised when another request holds the lock on an upload session."""
+
+
+class OffsetMismatch(ValueError):
+    """Raised when a range does not start at the session's committed offset."""
+
+    def __init__(self, expected: int):
+        super().__init__(f"Range must start at committed offset {expected}")
+        self.expected = expected
+
+
+@dataclass
+class StoredUpload:
+    path: Path
+    sha256: str
+    size: int
+
+
+def max_upload_bytes() -> int:
+    return int(os.getenv("MAX_UPLOAD_BYTES", DEFAULT_MAX_UPLOAD_BYTES))
+
+
+def upload_chunk_bytes() -> int:
+    return int(os.getenv("UPLOAD_CHUNK_BYTES", DEFAULT_CHUNK_BYTES))
+
+
+def upload_session_ttl_hours() -> float:
+    return float(os.getenv("UPLOAD_SESSION_TTL_HOURS", DEFAULT_SESSION_TTL_HOURS))
+
+
+def uploads_dir() -> Path:
+    return Path.cwd() / UPLOADS_DIR_NAME
+
+
+def new_session_id() -> str:
+    return uuid.uuid4().hex
+
+
+def session_part_path(session_id: str) -> Path:
+    # Inside uploads/ so the final rename never crosses a filesystem boundary.
+    return uploads_dir() / SESSIONS_DIR_NAME / f"{session_id}.part"
+
+
+def session_lock_path(session_id: str) -> Path:
+    return uploads_dir() / SESSIONS_DIR_NAME / f"{session_id}.lock"
+
+
+# Held session ids where ``fcntl`` is missing; that fallback only excludes requests in this process.
+_local_locks: Set[str] = set()
+_local_locks_guard = threading.Lock()
+
+
+@contextlib.asynccontextmanager
+async def lock_session(session_id: str):
+    """Hold an exclusive, non-blocking lock on a session for one write-and-commit (or complete).
+
+    The lock is an ``flock`` on the session's lock file, so it also excludes
+    other API processes and is released if the holder dies. Raises
+    ``SessionBusy`` at once when it is taken.
+    """
+    lock_path = session_lock_path(session_id)
+    await anyio.Path(lock_path.parent).mkdir(parents=True, exist_ok=True)
+    if fcntl is None:  # pragma: no cover
+        with _local_locks_guard:
+            if session_id in _local_locks:
+                raise SessionBusy("Another request is writing to this upload")
+            _local_locks.add(session_id)
+        try:
+            yield
+        finally:
+            with _local_locks_guard:
+                _local_locks.discard(session_id)
+        return
+    with open(lock_path, "a+b") as handle:
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError as exc:
+            raise SessionBusy("Another request is writing to this upload") from exc
+        # Closing the handle releases the lock.
+        yield
+
+
+async def discard_session_files(session_id: str) -> None:
+    await anyio.Path(session_part_path(session_id)).unlink(missing_ok=True)
+    await anyio.Path(session_lock_path(session_id)).unlink(missing_ok=True)
+
+
+def parse_content_range(header: Optional[str], total_size: int) -> Tuple[int, int]:
+    """Parse ``bytes <start>-<end>/<total>`` into ``(start, length)``."""
+    match = _CONTENT_RANGE.match((header or "").strip())
+    if not match:
+        raise ChunkRejected("Content-Range must look like 'bytes <start>-<end>/<total>'")
+    start, end, total = (int(group) for group in match.groups())
+    if total != total_size or end < start or end >= total_size:
+        raise ChunkRejected(f"Content-Range {header!r} does not fit an upload of {total_size} bytes")
+    return start, end - start + 1
+
+
+def chain_digest(previous: Optional[str], chunk_sha256: str) -> str:
+    """Fold one chunk digest into the running manifest digest of a session."""
+    return hashlib.sha256(f"{previous or ''}:{chunk_sha256}".encode("ascii")).hexdigest()
+
+
+async def append_chunk(
+    part_path: Path,
+    offset: int,
+    body: AsyncIterator[bytes],
+    length: int,
+    expected_sha256: Optional[str] = None,
+) -> str:
+    """Write exactly ``length`` bytes from ``body`` at ``offset`` and return their SHA-256.
+
+    Anything past ``offset`` (the tail of an interrupted attempt) is discarded
+    first; on a short body or checksum mismatch the file is cut back again, so
+    the committed prefix is never disturbed. Callers hold ``lock_session`` and
+    pass the committed offset read under it.
+    """
+    await anyio.Path(part_path.parent).mkdir(parents=True, exist_ok=True)
+    if not await anyio.Path(part_path).exists():
+        await anyio.Path(part_path).touch()
+    digest = hashlib.sha256()
+    written = 0
+    async with await anyio.open_file(part_path, "r+b") as out_f:
+        await out_f.truncate(offset)
+        await out_f.seek(offset)
+        try:
+            async for data in body:
+                if not data:
+                    continue
+                written += len(data)
+                if written > length:
+                    raise ChunkRejected(f"Chunk body is longer than the declared {length} bytes")
+                digest.update(data)
+                await out_f.write(data)
+            if written != length:
+                raise ChunkRejected(f"Chunk body has {written} bytes, expected {length}")
+            chunk_sha256 = digest.hexdigest()
+            if expected_sha256 and expected_sha256.lower() != chunk_sha256:
+                raise ChunkRejected("Chunk checksum does not match X-Chunk-SHA256")
+        except BaseException:
+            await out_f.truncate(offset)
+            raise
+    return chunk_sha256
+
+
+def temporary_path_for(destination: Path) -> Path:
+    return destination.with_name(f".{destination.name}.{uuid.uuid4().hex}.part")
+
+
+async def stream_upload_to_disk(
+    upload: UploadFile,
+    destination: Path,
+    max_bytes: int | None = None,
+    chunk_size: int | None = None,
+) -> StoredUpload:
+    """Copy ``upload`` to ``destination`` holding at most one chunk in memory."""
+    max_bytes = max_upload_bytes() if max_bytes is None else max_bytes
+    chunk_size = chunk_size or upload_chunk_bytes()
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLarge(f"Upload exceeds the {max_bytes} byte limit")
+
+    await anyio.Path(destination.parent).mkdir(parents=True, exist_ok=True)
+    tmp_path = temporary_path_for(destination)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with await anyio.open_file(tmp_path, "wb") as out_f:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds the {max_bytes} byte limit")
+                digest.update(chunk)
+                await out_f.write(chunk)
+        await anyio.Path(tmp_path).replace(destination)
+    except BaseException:
+        await anyio.Path(tmp_path).unlink(missing_ok=True)
+        raise
+    return StoredUpload(path=destination, sha256=digest.hexdigest(), size=size)
@@ -0,0 +1,124 @@
+"""Persistent process pool shared by the CPU-bound parts of script analysis.
+
+Workers are started once per API process and import the PDF parsers and the
+scene lexer up front, so sharded work does not pay interpreter start-up or
+import costs on every request. Work with a deadline runs on the same pool; only a task
+still running when the deadline passes gets the pool replaced.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+
+
+DEFAULT_MAX_WORKERS = 4
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+class PoolTimeout(RuntimeError):
+    """Raised when timed work misses its deadline."""
+
+
+def pool_size() -> int:
+    configured = os.getenv("WORKER_POOL_SIZE")
+    if configured:
+        return max(1, int(configured))
+    return max(1, min(DEFAULT_MAX_WORKERS, (os.cpu_count() or 2) - 1))
+
+
+def _warm_worker() -> None:
+    # Import the heavy parsers once per worker instead of once per task.
+    try:
+        import pdfplumber  # noqa: F401
+        import pdfminer.high_level  # noqa: F401
+    except Exception:  # pragma: no cover - optional dependency at runtime
+        pass
+    import app.services.pdf_extraction  # noqa: F401
+
+
+_mp_context: Optional[Any] = None
+
+
+def get_mp_context():
+    """Start-method context shared by the pool and one-off budgeted children."""
+    global _mp_context
+    if _mp_context is None:
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            # Forking from a threaded API worker is unsafe; the fork server is a
+            # clean single-threaded parent that already has the parsers imported.
+            _mp_context = multiprocessing.get_context("forkserver")
+            _mp_context.set_forkserver_preload(["__main__", "app.services.pdf_extraction", "app.ai_integration"])
+        else:
+            _mp_context = multiprocessing.get_context("spawn")
+    return _mp_context
+
+
+def _new_executor(max_workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=get_mp_context(), initializer=_warm_worker)
+
+
+def _kill_workers(pool: ProcessPoolExecutor) -> None:
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        if process.is_alive():
+            process.kill()
+
+
+def _retire_pool(pool: ProcessPoolExecutor) -> None:
+    """Kill ``pool``'s workers; if it is still the shared pool, the next caller gets a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    _kill_workers(pool)
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """The shared pool, replaced by a fresh one if a worker died and broke it."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or getattr(_pool, "_broken", False):
+            _pool = _new_executor(pool_size())
+        return _pool
+
+
+def shutdown_process_pool(kill: bool = False) -> None:
+    """Stop the shared pool; ``kill`` terminates workers that are still busy."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is None:
+        return
+    if kill:
+        _kill_workers(pool)
+    pool.shutdown(wait=not kill, cancel_futures=True)
+
+
+def map_ordered(
+    func: Callable[..., Any],
+    arg_tuples: Iterable[Sequence[Any]],
+    timeout: Optional[float] = None,
+) -> List[Any]:
+    """Run ``func(*args)`` for each tuple on the shared pool and return results in input order.
+
+    When ``timeout`` elapses first, this call's queued futures are cancelled
+    and ``PoolTimeout`` is raised. If one of its tasks is already running,
+    the pool is retired and its workers killed, so a runaway task cannot keep
+    a core busy; other work still on that pool fails with
+    ``BrokenProcessPool``, and the next caller gets a fresh pool.
+    """
+    pool = get_process_pool()
+    futures: List[Future] = [pool.submit(func, *args) for args in arg_tuples]
+    _, pending = wait(futures, timeout=timeout if timeout and timeout > 0 else None)
+    if pending:
+        # cancel() fails only for tasks a worker has already picked up
+        stuck = [future for future in pending if not future.cancel()]
+        if stuck:
+            _retire_pool(pool)
+        raise PoolTimeout(f"{len(pending)} of {len(futures)} tasks missed the {timeout}s deadline")
+    return [future.result() for future in futures]
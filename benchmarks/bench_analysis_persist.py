@@ -0,0 +1,82 @@
+"""Wall time of script analysis against scene count, on a SQLite file.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_analysis_persist [--scenes N ...] [--repeat N]
+
+Each run analyses a generated script (``benchmarks.corpus``) into a new
+project of a fresh SQLite database file, so every commit pays for a real
+journal write and sync as it would in production. The median of
+``--repeat`` runs is reported together with the number of COMMITs and
+statements the analysis issued.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import ai_integration
+from app.database.database import Base
+from app.models.models import Project
+from benchmarks.corpus import CorpusSpec, generate_script
+
+DEFAULT_SCENES = [50, 150, 300]
+
+
+def _analyse_once(workdir: Path, script_path: Path, run: int) -> tuple[float, int, int]:
+    engine = create_engine(f"sqlite:///{workdir / f'bench-{run}.db'}")
+    Base.metadata.create_all(bind=engine)
+    counts = {"commits": 0, "statements": 0}
+
+    @event.listens_for(engine, "commit")
+    def _on_commit(_connection):
+        counts["commits"] += 1
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _on_statement(*_args):
+        counts["statements"] += 1
+
+    with sessionmaker(bind=engine)() as db:
+        project = Project(name="Benchmark", budget=0)
+        db.add(project)
+        db.commit()
+        counts.update(commits=0, statements=0)
+        started = time.perf_counter()
+        ai_integration.analyze_and_create(db, project.id, str(script_path))
+        elapsed = time.perf_counter() - started
+    engine.dispose()
+    return elapsed, counts["commits"], counts["statements"]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenes", type=int, nargs="+", default=DEFAULT_SCENES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    ai_integration.load_budget_model()  # train/load once outside the timings
+    print(f"{'scenes':>6} {'median ms':>10} {'ms/scene':>9} {'commits':>8} {'statements':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        run = 0
+        for scenes in args.scenes:
+            script_path = workdir / f"script-{scenes}.txt"
+            script_path.write_text(generate_script(CorpusSpec(scenes=scenes)), encoding="utf-8")
+            timings = []
+            for _ in range(args.repeat):
+                run += 1
+                elapsed, commits, statements = _analyse_once(workdir, script_path, run)
+                timings.append(elapsed)
+            median = statistics.median(timings)
+            print(f"{scenes:6d} {median * 1000:10.1f} {median * 1000 / scenes:9.2f} {commits:8d} {statements:11d}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,62 @@
+"""Per-scene budget predictions one call at a time vs one vectorised call.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_budget_inference [--scenes N ...] [--repeat N]
+
+For generated scripts (``benchmarks.corpus``) of each size, the stored
+budget model predicts every scene's budget from the same feature rows
+(``services.budget_inference.feature_matrix``), once with a ``predict``
+call per scene, as the analysis used to, and once with a single call for
+all of them. "features" is the time to build the feature matrix from the
+``SceneTable``; times are the best of ``--repeat`` runs.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.ai_integration import load_budget_model, scene_table_breakdown
+from app.services import budget_inference
+from benchmarks.corpus import CorpusSpec, generate_script
+
+
+def _best_ms(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    model = load_budget_model()
+    if model is None:
+        print("no budget model available")
+        return 1
+    names = budget_inference.model_features(model)
+    print(f"model features: {', '.join(names)}")
+    print(f"{'scenes':>6} {'features ms':>12} {'per-scene ms':>13} {'one call ms':>12} {'speed-up':>9}")
+    for count in args.scenes:
+        scenes = scene_table_breakdown(generate_script(CorpusSpec(scenes=count)), parallel=False)
+        features_ms = _best_ms(lambda: budget_inference.feature_matrix(scenes, names), args.repeat)
+        frame = budget_inference.feature_matrix(scenes, names)
+        if hasattr(model, "feature_names_in_"):
+            import pandas as pd
+
+            frame = pd.DataFrame(frame, columns=names)
+        rows = [frame[row:row + 1] for row in range(count)]
+        looped_ms = _best_ms(lambda: [model.predict(row) for row in rows], args.repeat)
+        single_ms = _best_ms(lambda: model.predict(frame), args.repeat)
+        print(f"{count:6} {features_ms:12.1f} {looped_ms:13.1f} {single_ms:12.1f} {looped_ms / single_ms:8.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
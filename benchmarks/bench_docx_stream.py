@@ -0,0 +1,112 @@
+"""Whole-tree vs iterparse DOCX extraction: wall time and peak RSS.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_docx_stream [path/to/script.docx] [--pages N]
+
+Without a path a synthetic screenplay of ``--pages`` pages (about 55
+paragraphs each) is generated. Each implementation runs in a fresh
+interpreter so its peak resident set size is measured in isolation.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+
+PARAGRAPHS_PER_PAGE = 55
+
+
+def legacy_extract(path: Path) -> str:
+    """The previous implementation: read the whole part, build the tree, join every ``w:t``."""
+    with zipfile.ZipFile(path) as docx:
+        with docx.open("word/document.xml") as xml_file:
+            xml_content = xml_file.read()
+    tree = ElementTree.fromstring(xml_content)
+    namespace = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+    return "\n".join(node.text for node in tree.iter(f"{namespace}t") if node.text)
+
+
+def streaming_extract(path: Path) -> str:
+    from app.services.docx_extraction import iter_docx_paragraphs
+
+    return "\n".join(iter_docx_paragraphs(path))
+
+
+IMPLEMENTATIONS = {"legacy": legacy_extract, "iterparse": streaming_extract}
+
+
+def write_synthetic_docx(path: Path, pages: int) -> None:
+    lines = []
+    for scene in range(pages * PARAGRAPHS_PER_PAGE // 11):
+        lines.append(f"INT. LOCATION {scene} - DAY")
+        lines.extend(["", "MARY crosses the room and looks out at the rain for a long while."] * 2)
+        lines.extend(["MARY", "(quietly)", "We should have left an hour ago, before the road flooded.", ""])
+        lines.extend(["JOHN", "Then we wait."])
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as docx:
+        with docx.open("word/document.xml", "w") as part:
+            part.write(
+                b'<?xml version="1.0" encoding="UTF-8"?>'
+                b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+            )
+            for line in lines:
+                runs = "".join(
+                    f'<w:r><w:rPr><w:rFonts w:ascii="Courier"/></w:rPr><w:t xml:space="preserve">{escape(word)} </w:t></w:r>'
+                    for word in line.split()
+                )
+                part.write(f"<w:p><w:pPr><w:spacing w:after=\"0\"/></w:pPr>{runs}</w:p>".encode("utf-8"))
+            part.write(b"</w:body></w:document>")
+
+
+def _worker(name: str, path: str) -> None:
+    started = time.perf_counter()
+    text = IMPLEMENTATIONS[name](Path(path))
+    elapsed = time.perf_counter() - started
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"seconds": elapsed, "peak_kib": peak_kib, "chars": len(text)}))
+
+
+def _measure(name: str, path: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_docx_stream", "--worker", name, path],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("docx", nargs="?")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--worker", choices=sorted(IMPLEMENTATIONS), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        _worker(args.worker, args.docx)
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.docx
+        if path is None:
+            path = str(Path(tmp) / "synthetic.docx")
+            write_synthetic_docx(Path(path), args.pages)
+        print(f"{Path(path).name}: {Path(path).stat().st_size / 1024:.0f} KiB on disk")
+        for name in IMPLEMENTATIONS:
+            result = _measure(name, path)
+            print(f"{name:10} {result['seconds'] * 1000:8.1f} ms  peak RSS {result['peak_kib'] / 1024:7.1f} MiB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
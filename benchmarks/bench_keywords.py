@@ -0,0 +1,72 @@
+"""Per-keyword scans vs the shared keyword automaton as lexicons grow.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_keywords [--terms N ...] [--scenes N] [--repeat N]
+
+Each lexicon size is padded from the built-in tone words with made-up terms.
+"per-keyword" is the previous approach (lower-case the scene, then one
+``str.count`` per term); "automaton" is ``ai.keywords.KeywordAutomaton``,
+scoring the same scenes with whole-word matching.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from ai import keywords
+from benchmarks.bench_scene_lexer import make_script
+from app import ai_integration
+
+
+def lexicon(size: int):
+    labels = {label: list(terms) for label, terms in keywords.TONE_WORDS.items()}
+    names = list(labels)
+    for i in range(max(0, size - sum(map(len, labels.values())))):
+        labels[names[i % len(names)]].append(f"filler{i}")
+    return labels
+
+
+def per_keyword(scenes, labels):
+    for text in scenes:
+        lowered = text.lower()
+        {label: sum(map(lowered.count, terms)) for label, terms in labels.items()}
+
+
+def automaton(scenes, labels):
+    matcher = keywords.KeywordAutomaton({"tone": labels})
+    for text in scenes:
+        matcher.count(text)
+
+
+def _median(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terms", type=int, nargs="+", default=[40, 500, 5000])
+    parser.add_argument("--scenes", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    scenes = [scene["description"] for scene in ai_integration.naive_scene_breakdown(make_script(args.scenes))]
+    for size in args.terms:
+        labels = lexicon(size)
+        old = _median(lambda: per_keyword(scenes, labels), args.repeat)
+        new = _median(lambda: automaton(scenes, labels), args.repeat)
+        print(
+            f"{size:6d} terms  per-keyword {old * 1000:9.1f} ms  automaton {new * 1000:7.1f} ms"
+            f"  speed-up {old / new:6.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
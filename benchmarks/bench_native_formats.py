@@ -0,0 +1,106 @@
+"""Scene breakdown throughput: PDF extraction vs native Fountain / FDX readers.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_native_formats [path/to/script.pdf] [--repeat N]
+
+The PDF is broken down once the usual way; the resulting scenes are written
+back out as Fountain and Final Draft files so all three paths describe the
+same script. The PDF path runs the full extractor cascade (cache bypassed)
+followed by heuristic scene detection.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from app.services import pdf_extraction
+
+
+DEFAULT_PDF = Path(__file__).resolve().parents[1] / "uploads" / "Demo_ Forrest Gump - Filmustage - Script - PDF.pdf"
+
+
+def _is_cue(line: str) -> bool:
+    return line.isupper() and 2 < len(line) <= 35 and not line.endswith(":")
+
+
+def write_fountain(scenes, path: Path) -> None:
+    out = []
+    for scene in scenes:
+        if scene["heading"] != "Opening":
+            out.extend([f".{scene['heading']}", ""])
+        content = scene["content"]
+        for position, line in enumerate(content):
+            speaks = _is_cue(line) and position + 1 < len(content)
+            out.extend([line] if speaks else [line, ""])
+    path.write_text("\n".join(out), encoding="utf-8")
+
+
+def write_fdx(scenes, path: Path) -> None:
+    out = ['<?xml version="1.0" encoding="UTF-8"?>', '<FinalDraft DocumentType="Script" Version="4">', "<Content>"]
+    for scene in scenes:
+        if scene["heading"] != "Opening":
+            out.append(f'<Paragraph Type="Scene Heading"><Text>{escape(scene["heading"])}</Text></Paragraph>')
+        for line in scene["content"]:
+            kind = "Character" if _is_cue(line) else "Action"
+            out.append(f'<Paragraph Type="{kind}"><Text>{escape(line)}</Text></Paragraph>')
+    out.extend(["</Content>", "</FinalDraft>"])
+    path.write_text("\n".join(out), encoding="utf-8")
+
+
+def _median(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdf", nargs="?", default=str(DEFAULT_PDF))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    from app import ai_integration
+
+    pdf_path = Path(args.pdf)
+
+    def pdf_breakdown():
+        return ai_integration.naive_scene_breakdown(ai_integration._extract_pdf(pdf_path).text)
+
+    scenes = pdf_breakdown()
+    pages = pdf_extraction.prescan_pdf(pdf_path).page_count
+    print(f"{pdf_path.name}: {pages} pages, {len(scenes)} scenes")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fountain_path = Path(tmp) / "script.fountain"
+        fdx_path = Path(tmp) / "script.fdx"
+        write_fountain(scenes, fountain_path)
+        write_fdx(scenes, fdx_path)
+
+        results = {
+            "pdf": _median(pdf_breakdown, args.repeat),
+            "fountain": _median(lambda: list(ai_integration._iter_native_scenes(fountain_path)), args.repeat),
+            "fdx": _median(lambda: list(ai_integration._iter_native_scenes(fdx_path)), args.repeat),
+        }
+        for name, path in (("fountain", fountain_path), ("fdx", fdx_path)):
+            native = list(ai_integration._iter_native_scenes(path))
+            if [scene["heading"] for scene in native] != [scene["heading"] for scene in scenes]:
+                print(f"WARNING: {name} headings differ from the PDF breakdown")
+
+    for name, seconds in results.items():
+        print(
+            f"{name:9} median {seconds * 1000:8.1f} ms  {pages / seconds:9.1f} pages/s"
+            f"  {results['pdf'] / seconds:7.1f}x vs pdf"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,62 @@
+"""Serial vs page-sharded pdfplumber extraction.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pdf_parallel [path/to/script.pdf] [--repeat N]
+
+Page sharding is forced on (one shard per pool worker) regardless of
+``PDF_PARALLEL_MIN_PAGES`` so short demo scripts can be measured too. The
+first parallel run is reported separately because it pays for starting the
+pool; later runs reuse the warm workers.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from app.services import pdf_extraction, worker_pool
+
+
+DEFAULT_PDF = Path(__file__).resolve().parents[1] / "uploads" / "Demo_ Forrest Gump - Filmustage - Script - PDF.pdf"
+
+
+def _time(func, *args) -> float:
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdf", nargs="?", default=str(DEFAULT_PDF))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    path = args.pdf
+    page_count = pdf_extraction.prescan_pdf(Path(path)).page_count
+    print(f"{Path(path).name}: {page_count} pages, {worker_pool.pool_size()} pool workers")
+
+    serial_text = pdf_extraction.extract_pdfplumber(path)
+    parallel_text = pdf_extraction.extract_pdfplumber_parallel(path, page_count)
+    if serial_text != parallel_text:
+        print("WARNING: parallel output differs from serial output")
+
+    serial = [_time(pdf_extraction.extract_pdfplumber, path) for _ in range(args.repeat)]
+    worker_pool.shutdown_process_pool()
+    cold = _time(pdf_extraction.extract_pdfplumber_parallel, path, page_count)
+    warm = [_time(pdf_extraction.extract_pdfplumber_parallel, path, page_count) for _ in range(args.repeat)]
+    worker_pool.shutdown_process_pool()
+
+    serial_median = statistics.median(serial)
+    warm_median = statistics.median(warm)
+    print(f"serial        median {serial_median * 1000:8.1f} ms")
+    print(f"parallel cold        {cold * 1000:8.1f} ms (includes pool start-up)")
+    print(f"parallel warm median {warm_median * 1000:8.1f} ms")
+    print(f"speed-up (warm)      {serial_median / warm_median:8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,55 @@
+"""mmap/zlib raw content-stream decoder vs pdfminer.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_raw_decoder [path/to/script.pdf ...] [--repeat N]
+
+Both extractors run inline in this process. The quality column is the same
+score the extraction cascade uses to accept a candidate.
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+
+from app.services import pdf_extraction
+
+
+UPLOADS = Path(__file__).resolve().parents[1] / "uploads"
+
+
+def _median_ms(func, path: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(path)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdfs", nargs="*", default=[str(path) for path in sorted(UPLOADS.glob("*.pdf"))])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    from app.ai_integration import _clean_script_text, _pdf_text_quality
+
+    print(f"{'file':40} {'raw ms':>8} {'pdfminer ms':>12} {'speed-up':>9} {'raw q':>6} {'miner q':>8}")
+    for path in args.pdfs:
+        pages = pdf_extraction.prescan_pdf(Path(path)).page_count
+        raw_quality = _pdf_text_quality(_clean_script_text(pdf_extraction.extract_raw_operators(path)), pages)
+        miner_quality = _pdf_text_quality(_clean_script_text(pdf_extraction.extract_pdfminer(path)), pages)
+        raw_ms = _median_ms(pdf_extraction.extract_raw_operators, path, args.repeat)
+        miner_ms = _median_ms(pdf_extraction.extract_pdfminer, path, args.repeat)
+        print(
+            f"{Path(path).name[:40]:40} {raw_ms:8.1f} {miner_ms:12.1f} {miner_ms / raw_ms:8.1f}x"
+            f" {raw_quality:6.3f} {miner_quality:8.3f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
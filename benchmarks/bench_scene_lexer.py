@@ -0,0 +1,141 @@
+"""Multi-scan vs one-pass scene breakdown.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_scene_lexer [--scenes N ...] [--repeat N]
+
+The input is a synthetic screenplay: headings, action lines, character cues,
+parentheticals and dialogue. "legacy" is the previous breakdown, which grouped
+lines into blocks and then rescanned every block for word counts, characters
+(two regexes per line) and tone keywords. The legacy tone used substring
+counts, so tone is left out of the output comparison.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import statistics
+import time
+
+from app import ai_integration
+
+
+PLACES = ["KITCHEN", "YARD", "OFFICE", "CAR", "ROOFTOP", "HALLWAY"]
+TIMES = ["DAY", "NIGHT", "DUSK", "CONTINUOUS"]
+NAMES = ["MARY", "JOHN", "DETECTIVE ROSS", "DR. KIM", "OLD MAN"]
+ACTION = [
+    "She runs toward the dark shadow by the door.",
+    "They laugh at a funny joke and smile.",
+    "A gun fires; the chase begins.",
+    "He whispers a mystery into the night air.",
+    "Rain taps the window of the FBI van.",
+    "They kiss. Love is in the air.",
+]
+
+
+def make_script(scenes: int, seed: int = 3) -> str:
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(scenes):
+        lines.append(f"{rng.choice(['INT.', 'EXT.'])} {rng.choice(PLACES)} - {rng.choice(TIMES)}")
+        for _ in range(rng.randint(2, 5)):
+            lines.extend([rng.choice(ACTION), "", rng.choice(NAMES)])
+            if rng.random() < 0.3:
+                lines.append("(quietly)")
+            lines.extend(["We should go. " * rng.randint(1, 3), ""])
+    return "\n".join(lines)
+
+
+LEGACY_TONE_MAP = {
+    "action": ("explosion", "chase", "fight", "gun", "run"),
+    "romance": ("kiss", "love", "romantic", "heart"),
+    "drama": ("cry", "tear", "argue", "scream"),
+    "comedy": ("laugh", "joke", "funny", "smile"),
+    "thriller": ("mystery", "dark", "shadow", "whisper"),
+}
+
+
+def _legacy_scene(index, heading, lines):
+    cleaned = [ln.strip() for ln in lines if ln.strip()]
+    description = "\n".join(cleaned)
+    characters = set()
+    for token in cleaned:
+        if ai_integration.SCENE_HEADING_PATTERN.match(token):
+            continue
+        if token.isupper() and 2 < len(token) <= 35:
+            characters.add(token)
+        for candidate in re.findall(r"\b[A-Z][A-Z0-9]{2,}\b", token):
+            if candidate not in {"INT", "EXT"}:
+                characters.add(candidate)
+    joined = " ".join(line.lower() for line in cleaned)
+    scores = {label: sum(joined.count(k) for k in keywords) for label, keywords in LEGACY_TONE_MAP.items()}
+    best = max(scores, key=scores.get)
+    heading = heading or f"Scene {index}"
+    canonical, location, time_of_day = ai_integration._parse_scene_heading(heading)
+    return {
+        "index": index,
+        "heading": (canonical or heading).strip(),
+        "description": description,
+        "word_count": len(re.findall(r"\w+", description)),
+        "content": cleaned,
+        "location": location,
+        "time_of_day": time_of_day,
+        "characters": sorted({c.title() for c in characters}),
+        "tone": best if scores[best] > 0 else "neutral",
+    }
+
+
+def legacy(text: str):
+    scenes, heading, lines = [], None, []
+    for raw in text.splitlines():
+        line = raw.rstrip()
+        match = ai_integration.SCENE_HEADING_PATTERN.match(line)
+        if match:
+            if heading is not None or lines:
+                scenes.append(_legacy_scene(len(scenes) + 1, heading, lines))
+            heading = match.group(0).strip() if match.group(2).strip() else match.group(0).strip().upper()
+            lines = []
+        else:
+            if heading is None and line.strip():
+                heading = "Opening"
+            lines.append(line)
+    if heading is not None or lines:
+        scenes.append(_legacy_scene(len(scenes) + 1, heading, lines))
+    return scenes
+
+
+def _median(func, text: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(text)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenes", type=int, nargs="+", default=[300, 3000])
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    for scenes in args.scenes:
+        text = make_script(scenes)
+        expected = [{**scene, "tone": None} for scene in legacy(text)]
+        lexed = [{**scene, "tone": None} for scene in ai_integration.naive_scene_breakdown(text)]
+        for scene in lexed:
+            del scene["dialogue"]  # the legacy breakdown did not count dialogue lines
+        if expected != lexed:
+            print("WARNING: lexer output differs from the legacy breakdown")
+        old = _median(legacy, text, args.repeat)
+        new = _median(ai_integration.naive_scene_breakdown, text, args.repeat)
+        print(
+            f"{scenes:6d} scenes  legacy {old * 1000:8.1f} ms  lexer {new * 1000:8.1f} ms"
+            f"  speed-up {old / new:5.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,62 @@
+"""Serial vs pool-batched scene breakdown.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_scene_parallel [--scenes N] [--workers N] [--repeat N]
+
+The input is the synthetic screenplay from ``bench_scene_lexer``. The
+parallel run is forced on regardless of ``SCENE_PARALLEL_MIN_SCENES`` and
+uses ``--workers`` pool workers (``WORKER_POOL_SIZE``). The first parallel
+run is reported separately because it pays for starting the pool. Speed-up
+needs as many free cores as workers; on a single core the batches only add
+pickling overhead.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import time
+
+from benchmarks.bench_scene_lexer import make_script
+
+
+def _time(func, *args, **kwargs) -> float:
+    started = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - started
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenes", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    os.environ["WORKER_POOL_SIZE"] = str(args.workers)
+    from app import ai_integration
+    from app.services import worker_pool
+
+    text = make_script(args.scenes)
+    print(f"{args.scenes} scenes, {len(text.splitlines())} lines, {worker_pool.pool_size()} pool workers, {os.cpu_count()} CPUs")
+
+    cold = _time(ai_integration.naive_scene_breakdown, text, parallel=True)
+    if ai_integration.naive_scene_breakdown(text, parallel=True) != ai_integration.naive_scene_breakdown(text, parallel=False):
+        print("WARNING: parallel output differs from serial output")
+
+    serial = [_time(ai_integration.naive_scene_breakdown, text, parallel=False) for _ in range(args.repeat)]
+    warm = [_time(ai_integration.naive_scene_breakdown, text, parallel=True) for _ in range(args.repeat)]
+    worker_pool.shutdown_process_pool()
+
+    serial_median = statistics.median(serial)
+    warm_median = statistics.median(warm)
+    print(f"serial        median {serial_median * 1000:8.1f} ms")
+    print(f"parallel cold        {cold * 1000:8.1f} ms (includes pool start-up)")
+    print(f"parallel warm median {warm_median * 1000:8.1f} ms")
+    print(f"speed-up (warm)      {serial_median / warm_median:8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
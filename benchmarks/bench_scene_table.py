@@ -0,0 +1,80 @@
+"""Memory of a scene breakdown as dicts vs a ``SceneTable``.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_scene_table [--scenes N]
+
+For a generated script (``benchmarks.corpus``) both representations are
+built under tracemalloc: the list of scene dicts from
+``naive_scene_breakdown`` plus the per-scene ``scene_payloads``,
+``budget_details`` and ``created`` lists ``analyze_and_create`` used to keep
+alongside it, and the ``SceneTable`` from ``scene_table_breakdown`` on its
+own. "Retained" is what is still allocated once the build returns, "peak"
+the most allocated at any point during it. Both runs are serial.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from app.ai_integration import naive_scene_breakdown, scene_table_breakdown
+from benchmarks.corpus import CorpusSpec, generate_script
+
+
+def _dict_breakdown(text: str):
+    scenes = naive_scene_breakdown(text, parallel=False)
+    payloads = [
+        {
+            "scene_no": s["index"],
+            "location": s.get("location") or s["heading"].upper(),
+            "characters": s["characters"],
+            "time": s.get("time_of_day") or "UNSPECIFIED",
+            "tone": s["tone"],
+            "word_count": s["word_count"],
+        }
+        for s in scenes
+    ]
+    budgets = [{"scene_no": s["index"], "predicted_budget": 0.0, "suggested_location": ""} for s in scenes]
+    created = [{"scene_id": 0, "predicted_budget": 0.0, "suggested_location": ""} for _ in scenes]
+    return scenes, payloads, budgets, created
+
+
+def _table_breakdown(text: str):
+    return scene_table_breakdown(text, parallel=False)
+
+
+def _measure(func, text: str):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func(text)
+    elapsed = time.perf_counter() - started
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained / 1024 / 1024, peak / 1024 / 1024, elapsed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenes", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    text = generate_script(CorpusSpec(scenes=args.scenes))
+    print(f"{args.scenes} scenes, {len(text) / 1024 / 1024:.1f} MiB of text")
+    print(f"{'representation':16} {'retained MiB':>13} {'peak MiB':>9} {'ms (traced)':>12}")
+    rows = [("dicts + payloads", _dict_breakdown), ("SceneTable", _table_breakdown)]
+    measured = {}
+    for name, func in rows:
+        retained, peak, elapsed = _measure(func, text)
+        measured[name] = (retained, peak)
+        print(f"{name:16} {retained:13.1f} {peak:9.1f} {elapsed * 1000:12.0f}")
+    dicts, table = measured["dicts + payloads"], measured["SceneTable"]
+    print(f"retained {dicts[0] / table[0]:.1f}x smaller, peak {dicts[1] / table[1]:.1f}x smaller")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
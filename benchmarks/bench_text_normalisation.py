@@ -0,0 +1,93 @@
+"""Chained vs single-engine script text cleaning and scoring.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_text_normalisation [--megabytes N] [--repeat N]
+
+The input is extracted-PDF-like text: screenplay lines with CRLF endings,
+form feeds, tab runs, stray control bytes and a sprinkling of non-ASCII
+glyphs. "legacy" is the previous ``_clean_script_text`` plus the generator
+based letter/space/newline counts of ``_is_meaningful``/``_score_pdf_text``.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import statistics
+import time
+
+from app.services import text_normalisation
+
+
+_NON_ASCII_PATTERN = re.compile(r"[^\x09\x0A\x0D\x20-\x7E]+")
+_MULTISPACE_PATTERN = re.compile(r"[ \t]+")
+
+LINES = [
+    "INT. KITCHEN - DAY",
+    "MARY\t\tpours   coffee and looks out of the window.",
+    "  JOHN (V.O.)  ",
+    "We should have left an hour ago — before the road flooded.",
+    "Café lights flicker.\x0c",
+    "",
+    "\x07EXT. YARD - NIGHT \ufffd",
+]
+
+
+def make_text(megabytes: float, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    target = int(megabytes * 1024 * 1024)
+    parts, size = [], 0
+    while size < target:
+        line = rng.choice(LINES)
+        parts.append(line)
+        size += len(line) + 2
+    return "\r\n".join(parts)
+
+
+def legacy(text: str):
+    normalised = text.replace("\ufeff", "").replace("\r\n", "\n").replace("\r", "\n")
+    normalised = normalised.replace("\x0c", "\n")
+    normalised = _NON_ASCII_PATTERN.sub(" ", normalised)
+    normalised = "\n".join(_MULTISPACE_PATTERN.sub(" ", line).strip() for line in normalised.splitlines())
+    normalised = re.sub(r"\n{3,}", "\n\n", normalised).strip()
+    letters = sum(1 for ch in normalised if ch.isalpha())
+    prose = sum(1 for ch in normalised if ch.isalpha() or ch in " \n")
+    return normalised, letters, normalised.count(" "), normalised.count("\n"), prose
+
+
+def engine(text: str):
+    cleaned, stats = text_normalisation.normalise_and_measure(text)
+    return cleaned, stats.letters, stats.spaces, stats.newlines, stats.prose
+
+
+def _median(func, text: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(text)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--megabytes", type=float, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for megabytes in args.megabytes:
+        text = make_text(megabytes)
+        if legacy(text) != engine(text):
+            print("WARNING: engine output differs from the legacy implementation")
+        old = _median(legacy, text, args.repeat)
+        new = _median(engine, text, args.repeat)
+        print(
+            f"{megabytes:5.1f} MiB  legacy {old * 1000:8.1f} ms  engine {new * 1000:8.1f} ms"
+            f"  speed-up {old / new:5.1f}x"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,180 @@
+"""Parser benchmark suite with a JSON baseline.
+
+Run from the repository root:
+
+    python -m benchmarks.suite [--scenes N ...] [--only NAME ...] [--repeat N]
+    python -m benchmarks.suite --update-baseline
+
+Every stage of text analysis runs on generated scripts (``benchmarks.corpus``)
+of each ``--scenes`` size:
+
+    clean      _clean_script_text on the script with CRLF endings
+    breakdown  naive_scene_breakdown (serial)
+    features   ai.features.extract_features_from_text
+    sentiment  _analyze_script_sentiment
+    docx       _extract_text_from_docx on the script written as a DOCX
+
+For each one the fastest of ``--repeat`` timeit samples gives MB/s (of
+script text) and scenes/s, and one extra traced run gives the peak Python
+heap. Results are compared with ``benchmarks/baseline.json``: a case whose
+throughput drops by more than ``--tolerance`` or whose peak memory grows by
+more than ``--memory-tolerance`` is reported as a REGRESSION and the exit
+status is 1. ``--update-baseline`` writes the current results instead.
+Timings only compare well on the host that wrote the baseline (its details
+are stored alongside the numbers); on shared machines run-to-run noise of
+20-30% is normal, hence the default throughput tolerance.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from ai.features import extract_features_from_text
+from app import ai_integration
+from benchmarks.corpus import CorpusSpec, generate_script, write_docx
+
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_SCENES = [500, 3000]
+
+
+def _stages(text: str, docx_path: Path) -> Dict[str, Callable[[], object]]:
+    raw = text.replace("\n", "\r\n")
+    return {
+        "clean": lambda: ai_integration._clean_script_text(raw),
+        "breakdown": lambda: ai_integration.naive_scene_breakdown(text, parallel=False),
+        "features": lambda: extract_features_from_text(text),
+        "sentiment": lambda: ai_integration._analyze_script_sentiment(text),
+        "docx": lambda: ai_integration._extract_text_from_docx(docx_path),
+    }
+
+
+STAGES = ["clean", "breakdown", "features", "sentiment", "docx"]
+
+
+def _best_seconds(func: Callable[[], object], repeat: int) -> float:
+    """Seconds per call: fastest of ``repeat`` samples, each looping for at least 0.2 s (as timeit does)."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def _peak_kib(func: Callable[[], object]) -> float:
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def run(scene_counts: List[int], only: List[str], repeat: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for scenes in scene_counts:
+            text = generate_script(CorpusSpec(scenes=scenes))
+            megabytes = len(text.encode("utf-8")) / 1_000_000
+            docx_path = Path(tmp) / f"corpus-{scenes}.docx"
+            write_docx(docx_path, text)
+            stages = _stages(text, docx_path)
+            for name in only:
+                func = stages[name]
+                seconds = _best_seconds(func, repeat)
+                results[f"{name}@{scenes}"] = {
+                    "seconds": round(seconds, 6),
+                    "mb_per_s": round(megabytes / seconds, 3),
+                    "scenes_per_s": round(scenes / seconds, 1),
+                    "peak_kib": round(_peak_kib(func), 1),
+                }
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+    memory_tolerance: float,
+) -> List[str]:
+    """Human-readable regressions of ``results`` against ``baseline`` (cases missing from either are skipped)."""
+    regressions = []
+    for case, current in results.items():
+        previous = baseline.get(case)
+        if previous is None:
+            continue
+        if current["mb_per_s"] < previous["mb_per_s"] * (1 - tolerance):
+            regressions.append(
+                f"{case}: {current['mb_per_s']:.2f} MB/s vs {previous['mb_per_s']:.2f} MB/s baseline"
+            )
+        if current["peak_kib"] > previous["peak_kib"] * (1 + memory_tolerance):
+            regressions.append(
+                f"{case}: peak {current['peak_kib']:.0f} KiB vs {previous['peak_kib']:.0f} KiB baseline"
+            )
+    return regressions
+
+
+def host_info() -> Dict[str, object]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenes", type=int, nargs="+", default=DEFAULT_SCENES)
+    parser.add_argument("--only", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.35, help="allowed throughput drop (fraction)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25, help="allowed peak memory growth (fraction)")
+    parser.add_argument("--output", type=Path, help="also write this run's results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run(args.scenes, args.only, args.repeat)
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else None
+    previous = (stored or {}).get("results", {})
+
+    print(f"{'case':18} {'ms':>9} {'MB/s':>8} {'scenes/s':>10} {'peak KiB':>10}  vs baseline")
+    for case, current in results.items():
+        change = ""
+        if case in previous:
+            change = f"{current['mb_per_s'] / previous[case]['mb_per_s'] - 1:+.0%}"
+        print(
+            f"{case:18} {current['seconds'] * 1000:9.1f} {current['mb_per_s']:8.2f}"
+            f" {current['scenes_per_s']:10.0f} {current['peak_kib']:10.0f}  {change}"
+        )
+
+    document = {"host": host_info(), "results": results}
+    if args.output:
+        args.output.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n")
+    if args.update_baseline:
+        merged = {**previous, **results}
+        args.baseline.write_text(json.dumps({"host": host_info(), "results": merged}, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if stored is None:
+        print(f"no baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    if stored.get("host") != host_info():
+        print(f"note: baseline was recorded on {stored.get('host')}")
+
+    regressions = compare(results, previous, args.tolerance, args.memory_tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
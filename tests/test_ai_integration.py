@@ -1,8 +1,23 @@
+import random
+import re
 import textwrap
+import zipfile
 
 import pytest
 
-from app.ai_integration import ScriptExtractionError, _read_script_text, naive_scene_breakdown
+from app import ai_integration
+from app.ai_integration import (
+    ScriptExtractionError,
+    _iter_clean_lines,
+    _iter_scenes,
+    _read_script_text,
+    iter_scenes,
+    naive_scene_breakdown,
+    preview_script_scenes,
+    stream_script_scenes,
+)
+from app.services import character_registry
+from app.services.extraction_cache import ExtractionCache
 
 
 def test_naive_scene_breakdown_extracts_multiple_scenes():
@@ -58,7 +73,196 @@ def test_read_script_text_from_pdf(tmp_path):
     assert "JOHN" in text
 
 
+def _write_docx(path, paragraphs):
+    body = "".join(
+        "<w:p>" + "".join(f"<w:r><w:t xml:space=\"preserve\">{run}</w:t></w:r>" for run in runs) + "</w:p>"
+        for runs in paragraphs
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    with zipfile.ZipFile(path, "w") as docx:
+        docx.writestr("word/document.xml", document)
+
+
+def test_read_script_text_from_docx_keeps_paragraphs(tmp_path, monkeypatch):
+    monkeypatch.setattr(ai_integration, "get_extraction_cache", lambda: ExtractionCache(tmp_path / "cache"))
+    docx_path = tmp_path / "script.docx"
+    _write_docx(docx_path, [["INT. ", "KITCHEN - DAY"], [], ["MARY ", "pours coffee."], ["EXT. YARD - NIGHT"]])
+
+    # streamed first, so the scenes come from the paragraph parser rather than the cache
+    streamed = list(stream_script_scenes(str(docx_path)))
+    text = _read_script_text(str(docx_path))
+
+    assert text == "INT. KITCHEN - DAY\n\nMARY pours coffee.\nEXT. YARD - NIGHT"
+    assert streamed == naive_scene_breakdown(text)
+
+
 def test_read_script_text_from_missing_file(tmp_path):
     missing = tmp_path / "ghost.pdf"
     with pytest.raises(ScriptExtractionError):
         _read_script_text(str(missing))
+
+
+def test_stream_script_scenes_matches_breakdown(tmp_path):
+    script = "\r\n\r\nINT. KITCHEN - DAY\r\nMARY\x0cpours   coffee.\r\n\r\n\r\nEXT. YARD - NIGHT\r\nDogs bark.\r\n"
+    path = tmp_path / "script.txt"
+    path.write_bytes(script.encode("utf-8"))
+
+    streamed = list(stream_script_scenes(str(path)))
+
+    assert streamed == naive_scene_breakdown(_read_script_text(str(path)))
+    assert [scene["heading"] for scene in streamed] == ["INT. KITCHEN - DAY", "EXT. YARD - NIGHT"]
+
+
+def test_scene_stream_yields_before_the_rest_is_read():
+    def pages():
+        yield "INT. ONE - DAY\nFirst scene."
+        yield "EXT. TWO - NIGHT\nSecond scene."
+        raise AssertionError("third page should not be needed yet")
+
+    scenes = _iter_scenes(_iter_clean_lines(pages()))
+
+    assert next(scenes)["heading"] == "INT. ONE - DAY"
+
+
+_LEGACY_TONE_KEYWORDS = {
+    "action": ("explosion", "chase", "fight", "gun", "run"),
+    "romance": ("kiss", "love", "romantic", "heart"),
+    "drama": ("cry", "tear", "argue", "scream"),
+    "comedy": ("laugh", "joke", "funny", "smile"),
+    "thriller": ("mystery", "dark", "shadow", "whisper"),
+}
+
+
+def _legacy_breakdown(text):
+    # The multi-scan implementation the lexer replaced, kept frozen as the reference.
+    def finalise(index, heading, lines):
+        cleaned = [ln.strip() for ln in lines if ln.strip()]
+        description = "\n".join(cleaned)
+        characters = set()
+        for token in cleaned:
+            if ai_integration.SCENE_HEADING_PATTERN.match(token):
+                continue
+            # Deliberate changes from the original: cues are named without their extensions,
+            # and parentheticals and CONT'D are not scanned for names.
+            if token.isupper() and 2 < len(token) <= 35:
+                characters.add(character_registry.character_key(token))
+            token = re.sub(r"\([^)]*\)|\bCONT['’]?D\b", " ", token)
+            characters.update(c for c in re.findall(r"\b[A-Z][A-Z0-9]{2,}\b", token) if c not in {"INT", "EXT"})
+        joined = " ".join(line.lower() for line in cleaned)
+        scores = {label: sum(joined.count(k) for k in keywords) for label, keywords in _LEGACY_TONE_KEYWORDS.items()}
+        best = max(scores, key=scores.get)
+        heading = heading or f"Scene {index}"
+        canonical, location, time_of_day = ai_integration._parse_scene_heading(heading)
+        return {
+            "index": index,
+            "heading": (canonical or heading).strip(),
+            "description": description,
+            "word_count": len(re.findall(r"\w+", description)),
+            "content": cleaned,
+            "location": location,
+            "time_of_day": time_of_day,
+            "characters": sorted({c.title() for c in characters if c}),
+            "tone": best if scores[best] > 0 else "neutral",
+        }
+
+    blocks, heading, lines = [], None, []
+    for raw in text.splitlines():
+        line = raw.rstrip()
+        match = ai_integration.SCENE_HEADING_PATTERN.match(line)
+        if match:
+            if heading is not None or lines:
+                blocks.append((heading, lines))
+            heading = match.group(0).strip() if match.group(2).strip() else match.group(0).strip().upper()
+            lines = []
+        else:
+            if heading is None and line.strip():
+                heading = "Opening"
+            lines.append(line)
+    if heading is not None or lines:
+        blocks.append((heading, lines))
+    return [finalise(index, heading, block) for index, (heading, block) in enumerate(blocks, start=1)]
+
+
+def test_scene_lexer_matches_legacy_breakdown():
+    pieces = [
+        "INT. A - DAY", "ext", "EXT:", "int/ext. ROOF - NIGHT", "MARY", "(beat)", "We run.", "", "  ",
+        "Zoë meets KIM", "CAFÉ NOIR", "FBI_AGENT x_1 R2D2", " INT. B", "iNT-", "DR. KIM", "a dark heart",
+        "JOHN (V.O.)", "JOHN (CONT'D)", "MARY  CONT'D", "(WHISPERS)", "KIM ^", "Then JOHN (O.S.) calls (LOUDLY)",
+    ]
+    rng = random.Random(11)
+    for _ in range(3000):
+        text = "\n".join(rng.choice(pieces) for _ in range(rng.randint(0, 10)))
+        scenes = [{key: value for key, value in scene.items() if key != "dialogue"} for scene in naive_scene_breakdown(text)]
+        assert scenes == _legacy_breakdown(text), repr(text)
+
+
+def test_classify_line_tracks_dialogue_after_a_cue():
+    kinds = []
+    previous = ai_integration.LINE_BLANK
+    for line in ["INT. ROOM - DAY", "Rain falls.", "MARY", "(quietly)", "Go.", "", "She leaves."]:
+        previous = ai_integration.classify_line(line, previous)
+        kinds.append(previous)
+
+    assert kinds == ["heading", "action", "cue", "parenthetical", "dialogue", "blank", "action"]
+
+
+def test_scene_breakdown_counts_dialogue_lines_per_cue():
+    script = "INT. ROOM - DAY\nMARY\n(quietly)\nGo.\nNow.\n\nJOHN (V.O.)\nNo.\n\nShe leaves.\nEXT. YARD - DAY\nMARY\nBye."
+
+    scenes = naive_scene_breakdown(script)
+
+    assert scenes[0]["dialogue"] == {"MARY": 2, "JOHN (V.O.)": 1}
+    assert scenes[1]["dialogue"] == {"MARY": 1}
+
+
+def test_parallel_breakdown_matches_serial(monkeypatch):
+    monkeypatch.setenv("WORKER_POOL_SIZE", "2")
+    monkeypatch.setattr(ai_integration, "PARALLEL_MIN_BATCH_LINES", 5)
+    pieces = ["INT. A - DAY", "EXT. B", "", "MARY", "(beat)", "We run.", "Opening words", "JOHN (V.O.)", "No."]
+    rng = random.Random(5)
+    try:
+        for prefix in ["", "\n\n", "Before any heading.\n"]:
+            text = prefix + "\n".join(rng.choice(pieces) for _ in range(400))
+            serial = naive_scene_breakdown(text, parallel=False)
+            assert naive_scene_breakdown(text, parallel=True) == serial
+            assert [scene["index"] for scene in serial] == list(range(1, len(serial) + 1))
+    finally:
+        ai_integration.worker_pool.shutdown_process_pool()
+
+
+def test_scene_batches_start_on_headings(monkeypatch):
+    monkeypatch.setattr(ai_integration, "PARALLEL_MIN_BATCH_LINES", 1)
+
+    batches = ai_integration._scene_batches(40, [0, 3, 9, 10, 30, 31], 4)
+
+    assert batches == [(0, 10), (10, 30), (30, 40)]
+
+
+def test_iter_scenes_accepts_text_lines_and_page_chunks(tmp_path):
+    script = "Cold open.\n\nINT. KITCHEN - DAY\nMARY\nMorning.\r\nEXT. YARD - NIGHT\nDogs bark.\n"
+    path = tmp_path / "script.txt"
+    path.write_text(script, encoding="utf-8", newline="")
+    expected = naive_scene_breakdown(script)
+
+    assert list(iter_scenes(script)) == expected
+    with open(path, encoding="utf-8", newline="") as handle:
+        assert list(iter_scenes(handle)) == expected
+    assert list(iter_scenes([script[:30], script[30:]])) == naive_scene_breakdown(script[:30] + "\n" + script[30:])
+
+
+def test_preview_stops_early_and_estimates_the_total(tmp_path):
+    path = tmp_path / "long.txt"
+    path.write_text("".join(f"INT. ROOM {n} - DAY\nSomething happens.\n\n" for n in range(1, 401)), encoding="utf-8")
+
+    preview = preview_script_scenes(str(path), 3)
+
+    assert [scene["heading"] for scene in preview["scenes"]] == ["INT. ROOM 1 - DAY", "INT. ROOM 2 - DAY", "INT. ROOM 3 - DAY"]
+    assert not preview["complete"]
+    assert 300 <= preview["estimated_total_scenes"] <= 500
+
+    short = preview_script_scenes(str(path), 500)
+    assert short["complete"] and short["estimated_total_scenes"] == 400
@@ -0,0 +1,41 @@
+from ai.features import extract_features_from_scenes, extract_features_from_text
+from app.ai_integration import _analyze_script_sentiment, naive_scene_breakdown
+from app.services import character_registry
+from benchmarks import suite
+from benchmarks.corpus import CorpusSpec, character_names, generate_script
+
+
+def test_corpus_is_deterministic_per_seed():
+    spec = CorpusSpec(scenes=40, seed=9)
+
+    assert generate_script(spec) == generate_script(CorpusSpec(scenes=40, seed=9))
+    assert generate_script(spec) != generate_script(CorpusSpec(scenes=40, seed=10))
+
+
+def test_corpus_honours_its_shape_parameters():
+    exteriors = naive_scene_breakdown(generate_script(CorpusSpec(scenes=60, interior_ratio=0.0, dialogue_ratio=0.0)))
+    talky = naive_scene_breakdown(generate_script(CorpusSpec(scenes=60, characters=4, dialogue_ratio=1.0)))
+
+    assert len(exteriors) == 60
+    assert all(scene["heading"].startswith("EXT.") for scene in exteriors)
+    assert not any(scene["dialogue"] for scene in exteriors)
+    assert all(scene["dialogue"] for scene in talky)
+    speakers = {character_registry.character_key(cue) for scene in talky for cue in scene["dialogue"]}
+    assert speakers == set(character_names(4, seed=1))
+
+
+def test_pipeline_on_generated_script():
+    text = generate_script(CorpusSpec(scenes=300, action_density=1.0, seed=4))
+    scenes = naive_scene_breakdown(text)
+
+    assert [scene["index"] for scene in scenes] == list(range(1, 301))
+    assert extract_features_from_scenes(scenes) == extract_features_from_text(text)
+    assert _analyze_script_sentiment(text)["estimated_genre"] == "action"
+
+
+def test_suite_flags_throughput_and_memory_regressions():
+    baseline = {"breakdown@10": {"mb_per_s": 10.0, "peak_kib": 100.0}}
+    current = {"breakdown@10": {"mb_per_s": 6.0, "peak_kib": 150.0}, "docx@10": {"mb_per_s": 1.0, "peak_kib": 1.0}}
+
+    assert len(suite.compare(current, baseline, tolerance=0.25, memory_tolerance=0.25)) == 2
+    assert suite.compare(current, baseline, tolerance=0.5, memory_tolerance=0.6) == []
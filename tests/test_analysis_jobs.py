@@ -0,0 +1,177 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import auth_supabase, main
+from app.crud import bulk, crud
+from app.database.database import Base
+from app.main import app
+from app.models.models import AnalysisJob, AnalysisRun, Project
+from app.services import analysis_jobs
+from benchmarks.corpus import CorpusSpec, generate_script
+
+
+@pytest.fixture
+def job_client(tmp_path, monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        db.add_all([Project(name="Feature", budget=0), Project(name="Short", budget=0)])
+        db.commit()
+
+    def override_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "uploads").mkdir()
+    (tmp_path / "uploads" / "feature.txt").write_text(generate_script(CorpusSpec(scenes=8, seed=3)), encoding="utf-8")
+    app.dependency_overrides[main.get_db] = override_db
+    app.dependency_overrides[auth_supabase.get_current_user_from_supabase] = lambda: SimpleNamespace(id=None, is_admin=True)
+    try:
+        yield TestClient(app), session_factory
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+
+def test_submitted_job_runs_to_a_retrievable_result(job_client, monkeypatch):
+    client, session_factory = job_client
+    submitted = client.post("/projects/1/analysis_jobs", json={"filename": "feature.txt"})
+    assert submitted.status_code == 202
+    job_id = submitted.json()["id"]
+    assert submitted.json()["status"] == analysis_jobs.QUEUED
+    assert client.get(f"/projects/1/analysis_jobs/{job_id}/result").status_code == 409
+
+    stages = []
+    report_stage = analysis_jobs.report_stage
+    monkeypatch.setattr(
+        analysis_jobs, "report_stage", lambda db, job_id, stage: (stages.append(stage), report_stage(db, job_id, stage))
+    )
+    with session_factory() as db:
+        assert analysis_jobs.claim_next_job(db).id == job_id
+        analysis_jobs.run_job(db, job_id)
+        assert len(crud.get_scenes_by_project(db, 1)) == 8
+
+    assert stages == ["extracting", "parsing", "predicting", "persisting"]
+    status = client.get(f"/projects/1/analysis_jobs/{job_id}").json()
+    assert (status["status"], status["progress"], status["attempts"]) == (analysis_jobs.SUCCEEDED, 100, 1)
+    result = client.get(f"/projects/1/analysis_jobs/{job_id}/result").json()
+    assert len(result["scenes"]) == 8
+    assert result["budget_model"]["version"]
+    assert result["snapshot"]["project"]["id"] == 1
+
+
+def test_failed_job_reports_its_error(job_client):
+    client, session_factory = job_client
+    job_id = client.post("/projects/1/analysis_jobs", json={"filename": "feature.txt"}).json()["id"]
+    (main.uploads.uploads_dir() / "feature.txt").unlink()
+
+    with session_factory() as db:
+        analysis_jobs.run_job(db, analysis_jobs.claim_next_job(db).id)
+
+    status = client.get(f"/projects/1/analysis_jobs/{job_id}").json()
+    assert status["status"] == analysis_jobs.FAILED
+    assert "not found" in status["error"]
+    assert "failed" in client.get(f"/projects/1/analysis_jobs/{job_id}/result").json()["detail"]
+
+
+def test_claims_hold_one_running_job_per_project(job_client):
+    _, session_factory = job_client
+    with session_factory() as db:
+        first, second, other = (
+            crud.create_analysis_job(db, analysis_jobs.new_job_id(), project_id, "feature.txt").id
+            for project_id in (1, 1, 2)
+        )
+
+        assert analysis_jobs.claim_next_job(db).id == first
+        assert analysis_jobs.claim_next_job(db).id == other
+        assert analysis_jobs.claim_next_job(db) is None
+
+        analysis_jobs.finish_job(db, first, {})
+        assert analysis_jobs.claim_next_job(db).id == second
+
+
+def test_stale_running_jobs_are_requeued_then_failed(job_client):
+    _, session_factory = job_client
+    with session_factory() as db:
+        job_id = crud.create_analysis_job(db, analysis_jobs.new_job_id(), 1, "feature.txt").id
+        for _ in range(analysis_jobs.MAX_ATTEMPTS):
+            assert analysis_jobs.claim_next_job(db).id == job_id
+            assert analysis_jobs.requeue_stale_jobs(db) == 0
+            db.query(AnalysisJob).update({AnalysisJob.heartbeat_at: datetime.utcnow() - timedelta(hours=1)})
+            db.commit()
+            assert analysis_jobs.requeue_stale_jobs(db) == 1
+
+        job = db.get(AnalysisJob, job_id, populate_existing=True)
+        assert (job.status, job.attempts) == (analysis_jobs.FAILED, analysis_jobs.MAX_ATTEMPTS)
+
+
+def test_attempt_lost_after_opening_its_run_does_not_block_the_retry(job_client):
+    _, session_factory = job_client
+    with session_factory() as db:
+        job_id = crud.create_analysis_job(db, analysis_jobs.new_job_id(), 1, "feature.txt").id
+        analysis_jobs.claim_next_job(db)
+        # The worker opens its run, then dies before writing it.
+        lost_run = bulk.AnalysisWriter.start(db, 1).run_id
+        analysis_jobs.record_run(db, job_id, lost_run)
+        db.query(AnalysisJob).update({AnalysisJob.heartbeat_at: datetime.utcnow() - timedelta(hours=1)})
+        db.commit()
+
+        assert analysis_jobs.requeue_stale_jobs(db) == 1
+        assert db.get(AnalysisRun, lost_run).status == bulk.RUN_FAILED
+
+        analysis_jobs.run_job(db, analysis_jobs.claim_next_job(db).id)
+        job = db.get(AnalysisJob, job_id, populate_existing=True)
+        assert (job.status, job.attempts) == (analysis_jobs.SUCCEEDED, 2)
+        assert db.get(Project, 1).active_run_id == job.run_id != lost_run
+
+
+def test_job_is_requeued_while_another_analysis_holds_the_project(job_client):
+    _, session_factory = job_client
+    with session_factory() as db, session_factory() as other:
+        job_id = crud.create_analysis_job(db, analysis_jobs.new_job_id(), 1, "feature.txt").id
+        claimed = analysis_jobs.claim_next_job(db).id
+        synchronous = bulk.AnalysisWriter.start(other, 1)
+
+        analysis_jobs.run_job(db, claimed)
+        job = db.get(AnalysisJob, job_id, populate_existing=True)
+        assert (job.status, job.attempts, job.error) == (analysis_jobs.QUEUED, 0, None)
+        # not claimed again (and re-analysed up to the claim) while the other run is written
+        assert analysis_jobs.claim_next_job(db) is None
+
+        synchronous.abort()
+        analysis_jobs.run_job(db, analysis_jobs.claim_next_job(db).id)
+        assert db.get(AnalysisJob, job_id, populate_existing=True).status == analysis_jobs.SUCCEEDED
+
+
+def test_job_of_a_dead_worker_releases_its_run_and_is_requeued(job_client):
+    _, session_factory = job_client
+    with session_factory() as db:
+        job_id = crud.create_analysis_job(db, analysis_jobs.new_job_id(), 1, "feature.txt").id
+        analysis_jobs.claim_next_job(db)
+        lost_run = bulk.AnalysisWriter.start(db, 1).run_id
+        analysis_jobs.record_run(db, job_id, lost_run)
+        dispatcher = analysis_jobs.JobDispatcher(session_factory, workers=1)
+        died = Future()
+        died.set_exception(BrokenProcessPool("worker died"))
+        dispatcher._running[job_id] = died
+
+        dispatcher._reap(db)
+
+        job = db.get(AnalysisJob, job_id, populate_existing=True)
+        assert (job.status, job.attempts, job.run_id) == (analysis_jobs.QUEUED, 1, None)
+        assert db.get(AnalysisRun, lost_run, populate_existing=True).status == bulk.RUN_FAILED
+        assert db.get(Project, 1, populate_existing=True).building_run_id is None
+        assert analysis_jobs.claim_next_job(db).id == job_id
@@ -0,0 +1,63 @@
+import numpy as np
+
+from app.ai_integration import load_budget_model, scene_table_breakdown
+from app.services import budget_inference
+from app.services.scene_table import SceneTable
+from benchmarks.corpus import CorpusSpec, generate_script
+
+
+class _Model:
+    def __init__(self, predictions, **schema):
+        self.predictions = predictions
+        self.calls = []
+        for name, value in schema.items():
+            setattr(self, name, value)
+
+    def predict(self, matrix):
+        self.calls.append(matrix)
+        return np.asarray(self.predictions, dtype=float)
+
+
+def _scenes():
+    return SceneTable.from_scenes(
+        [
+            {"index": 1, "heading": "INT. A", "description": "MARY\nHi.", "content": ["MARY", "Hi."], "word_count": 100,
+             "characters": ["MARY", "JOHN"], "dialogue": {"MARY": 1}},
+            {"index": 2, "heading": "EXT. B", "description": "Cars CHASE.", "content": ["Cars CHASE."], "word_count": 10},
+        ]
+    )
+
+
+def test_features_follow_the_models_column_order():
+    scenes = _scenes()
+    model = _Model([5000.0, float("nan")], feature_names_in_=np.array(["dialogue_density", "num_characters", "action_count"]))
+
+    report = budget_inference.predict_scene_budgets(model, scenes)
+
+    assert len(model.calls) == 1
+    assert model.calls[0].to_numpy().tolist() == [[0.5, 2.0, 0.0], [0.0, 0.0, 1.0]]
+    assert list(scenes.predicted_budget) == [5000.0, 1000.0]
+    assert (report.model_scenes, report.fallback_scenes) == (1, 1)
+
+
+def test_schema_mismatch_falls_back_without_predicting():
+    scenes = _scenes()
+    unnamed = _Model([1.0, 1.0], n_features_in_=2)
+    unknown = _Model([1.0, 1.0], feature_names_in_=np.array(["num_scenes", "budget_last_year"]))
+
+    for model in (unnamed, unknown):
+        report = budget_inference.predict_scene_budgets(model, scenes)
+        assert not model.calls
+        assert (report.model_scenes, report.fallback_scenes) == (0, 2)
+        assert list(scenes.predicted_budget) == [1200.0, 1000.0]
+    assert "budget_last_year" in report.reason
+    assert budget_inference.predict_scene_budgets(None, scenes).fallback_scenes == 2
+
+
+def test_stored_model_predicts_every_scene_in_one_call():
+    scenes = scene_table_breakdown(generate_script(CorpusSpec(scenes=200, seed=6)), parallel=False)
+
+    report = budget_inference.predict_scene_budgets(load_budget_model(), scenes)
+
+    assert (report.model_scenes, report.fallback_scenes, report.reason) == (200, 0, None)
+    assert all(budget > 0 for budget in scenes.predicted_budget)
@@ -0,0 +1,186 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import ai_integration
+from app.crud import crud
+from app.crud.bulk import (
+    RUN_COMPLETE,
+    RUN_FAILED,
+    STALE_RUN_AFTER,
+    AnalysisInProgress,
+    AnalysisRunAbandoned,
+    AnalysisWriter,
+    collect_retired_rows,
+)
+from app.database.database import Base
+from app.models.models import Actor, AnalysisRun, Project, ScheduleEntry, Scene, ToDo
+from app.services import project_snapshot
+from benchmarks.corpus import CorpusSpec, generate_script
+
+
+@pytest.fixture
+def session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(Project(name="Bulk", budget=0))
+        db.commit()
+        yield db
+    engine.dispose()
+
+
+def _count_commits(db):
+    commits = []
+    event.listen(db.get_bind(), "commit", lambda _connection: commits.append(1))
+    return commits
+
+
+def test_analysis_commits_a_constant_number_of_times(session, tmp_path):
+    commits = _count_commits(session)
+    counts = []
+    for scenes in (10, 60):
+        path = tmp_path / f"script-{scenes}.txt"
+        path.write_text(generate_script(CorpusSpec(scenes=scenes, seed=scenes)), encoding="utf-8")
+        commits.clear()
+        ai_integration.analyze_and_create(session, 1, str(path))
+        counts.append(len(commits))
+
+    assert counts[0] == counts[1]
+    scenes = crud.get_scenes_by_project(session, 1)
+    assert len(scenes) == 60
+    assert sum(todo.scene_id is not None for todo in crud.get_todos_by_project(session, 1)) == 120
+    assert len(crud.get_schedule_by_project(session, 1)) == 60
+    assert all(scene.predicted_budget > 0 and scene.suggested_location for scene in scenes)
+
+
+def test_writer_links_children_and_rolls_back_as_a_whole(session):
+    writer = AnalysisWriter.start(session, 1)
+    first = writer.add_scene(1, "INT. A", "a", 1, 100.0, "Studio/Interior")
+    second = writer.add_scene(2, "EXT. B", "b", 1, 200.0, "Exterior/On-location")
+    writer.add_todo(second, "Prep B", None, is_post_production=False)
+    writer.add_schedule_entry(first, "INT. A", "[]")
+    writer.sync_actors([("Mary", 10.0)])
+
+    ids = writer.commit()
+
+    assert session.query(ToDo).one().scene_id == ids[1]
+    assert session.query(ScheduleEntry).one().scene_id == ids[0]
+    assert [(actor.name, actor.cost) for actor in session.query(Actor)] == [("Mary", 10.0)]
+
+    # the scene is inserted before the to-do with a bad slot fails; neither is kept
+    writer = AnalysisWriter.start(session, 1)
+    writer.add_scene(3, "INT. C", "c", 1, 1.0, None)
+    writer.add_todo(5, "orphan", None, is_post_production=False)
+    with pytest.raises(IndexError):
+        writer.commit()
+    assert session.query(Scene).count() == 2
+    assert session.get(AnalysisRun, writer.run_id).status == RUN_FAILED
+
+
+def _analyze(session, tmp_path, scenes, seed):
+    path = tmp_path / f"script-{seed}.txt"
+    path.write_text(generate_script(CorpusSpec(scenes=scenes, seed=seed)), encoding="utf-8")
+    return ai_integration.analyze_and_create(session, 1, str(path))
+
+
+def test_analysis_assigns_each_scene_to_the_project_crew(session, tmp_path):
+    crud.create_crew(session, "Ana", "Editor", project_id=1)
+
+    result = _analyze(session, tmp_path, scenes=5, seed=3)
+
+    crew_ids = [crew.id for crew in crud.get_crews_by_project(session, 1)]
+    assignments = result["crew_assignments"]
+    assert [a["scene_index"] for a in assignments] == list(range(5))
+    assert [a["assigned_to"] for a in assignments] == [crew_ids[i % len(crew_ids)] for i in range(5)]
+    assert {a["role"] for a in assignments} <= {"VFX Lead", "Audio Lead", "Editor", "Grip", "General"}
+
+
+def test_readers_see_the_active_run_until_the_next_one_swaps_in(session, tmp_path):
+    first = _analyze(session, tmp_path, scenes=5, seed=1)
+    before = [scene.id for scene in crud.get_scenes_by_project(session, 1)]
+
+    writer = AnalysisWriter.start(session, 1)
+    writer.replace_project_analysis()
+    writer.add_scene(1, "INT. NEW", "new", 1, 1.0, None)
+    # Inserted and committed, but not active yet
+    writer._insert_rows()
+    session.commit()
+    assert [scene.id for scene in crud.get_scenes_by_project(session, 1)] == before
+    with pytest.raises(AnalysisInProgress):
+        AnalysisWriter.start(session, 1)
+
+    writer.abort()
+    assert [scene.id for scene in crud.get_scenes_by_project(session, 1)] == before
+    assert session.get(Project, 1).active_run_id == first["run_id"]
+
+    second = _analyze(session, tmp_path, scenes=3, seed=2)
+    assert session.get(Project, 1).active_run_id == second["run_id"]
+    assert session.get(AnalysisRun, second["run_id"]).status == RUN_COMPLETE
+    assert len(crud.get_scenes_by_project(session, 1)) == 3
+
+
+def test_a_run_taken_over_as_stale_is_never_swapped_in(session):
+    stale = AnalysisWriter.start(session, 1)
+    stale.add_scene(1, "INT. OLD", "old", 1, 1.0, None)
+    session.query(AnalysisRun).filter(AnalysisRun.id == stale.run_id).update(
+        {AnalysisRun.started_at: datetime.utcnow() - 2 * STALE_RUN_AFTER}
+    )
+    session.commit()
+    fresh = AnalysisWriter.start(session, 1)
+
+    with pytest.raises(AnalysisRunAbandoned):
+        stale.commit()
+
+    assert session.get(AnalysisRun, stale.run_id).status == RUN_FAILED
+    assert session.get(Project, 1).building_run_id == fresh.run_id
+    fresh.add_scene(1, "INT. NEW", "new", 1, 1.0, None)
+    fresh.commit()
+    assert [scene.heading for scene in crud.get_scenes_by_project(session, 1)] == ["INT. NEW"]
+    assert session.get(Project, 1).building_run_id is None
+
+
+def test_collect_retired_rows_deletes_replaced_and_failed_rows(session, tmp_path):
+    _analyze(session, tmp_path, scenes=6, seed=1)
+    _analyze(session, tmp_path, scenes=4, seed=2)
+    failed = AnalysisWriter.start(session, 1)
+    failed.add_scene(1, "INT. LOST", "lost", 1, 1.0, None)
+    failed._insert_rows()
+    failed.abort()
+    live = {model: session.query(model).filter(model.retired_run_id.is_(None)).count() for model in (Scene, ToDo, ScheduleEntry)}
+
+    assert collect_retired_rows(session, 1) > 0
+
+    for model, count in live.items():
+        assert session.query(model).count() == count
+    assert session.query(Scene).count() == len(crud.get_scenes_by_project(session, 1)) == 4
+    assert collect_retired_rows(session, 1) == 0
+
+
+def test_snapshot_lists_come_from_one_run_even_if_a_swap_lands_midway(session, tmp_path, monkeypatch):
+    _analyze(session, tmp_path, scenes=5, seed=1)
+    read_todos = crud.get_todos_by_project
+    reads = []
+
+    def todos_during_a_swap(db, project_id, active_run_id=None):
+        if active_run_id is None:  # the analysis' own reads
+            return read_todos(db, project_id)
+        if not reads:
+            # another request swaps in a new analysis and collects the old rows
+            with sessionmaker(bind=session.get_bind())() as other:
+                _analyze(other, tmp_path, scenes=3, seed=2)
+                collect_retired_rows(other, 1)
+        todos = read_todos(db, project_id, active_run_id)
+        reads.append((active_run_id, len(todos)))
+        return todos
+
+    monkeypatch.setattr(crud, "get_todos_by_project", todos_during_a_swap)
+
+    snapshot = project_snapshot.build_project_snapshot(session, session.get(Project, 1))
+
+    active = session.get(Project, 1).active_run_id
+    assert [run for run, _ in reads] == [active - 1, active]
+    assert len(snapshot["scriptData"]["sceneData"]) == 3
+    assert reads[-1][1] == 6  # two to-dos per scene of the run the scenes came from
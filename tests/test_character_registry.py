@@ -0,0 +1,93 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.ai_integration import naive_scene_breakdown
+from app.crud import crud
+from app.crud.bulk import AnalysisWriter
+from app.database.database import Base
+from app.models.models import Project
+from app.services import character_registry
+from app.services.screenplay_formats import iter_fountain_blocks
+
+
+SCRIPT = """INT. KITCHEN - DAY
+JOHN (V.O.)
+Morning.
+MARY
+(quietly)
+Coffee?
+Is it ready?
+
+EXT. YARD - DAY
+JOHN (CONT'D)
+Outside now.
+
+INT. OFFICE - NIGHT
+Mary works late.
+"""
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def test_character_key_merges_cue_extensions():
+    keys = {character_registry.character_key(name) for name in ["JOHN (V.O.)", "JOHN (CONT'D)", "John", "john  cont'd", "JOHN ^"]}
+
+    assert keys == {"JOHN"}
+
+
+def test_registry_answers_scene_queries_from_bitsets():
+    scenes = naive_scene_breakdown(SCRIPT)
+    registry = character_registry.build_registry(scenes)
+    john = registry.get("John (O.S.)")
+
+    assert [scene["characters"] for scene in scenes] == [["John", "Mary"], ["John"], []]
+    assert john.aliases == {"John", "JOHN (V.O.)", "JOHN (CONT'D)"}
+    assert registry.scenes_featuring("JOHN") == [1, 2]
+    assert registry.cast_for_scene(1) == ["John", "Mary"]
+    assert registry.cast_by_scene()[2] == ["John"]
+    assert (john.dialogue_in(1), john.dialogue_in(2), registry.get("MARY").dialogue_lines) == (1, 1, 2)
+    schedule = registry.day_out_of_days({1: date(2026, 1, 5), 2: date(2026, 1, 7), 3: date(2026, 1, 6)})
+    assert schedule["John"] == {"start": date(2026, 1, 5), "finish": date(2026, 1, 7), "work_days": [date(2026, 1, 5), date(2026, 1, 7)]}
+    assert schedule["Mary"] == {"start": date(2026, 1, 5), "finish": date(2026, 1, 5), "work_days": [date(2026, 1, 5)]}
+
+
+def test_registry_round_trips_through_the_database(db):
+    project = Project(name="Registry", budget=0)
+    db.add(project)
+    db.commit()
+    registry = character_registry.build_registry(naive_scene_breakdown(SCRIPT * 30))
+
+    writer = AnalysisWriter.start(db, project.id)
+    writer.replace_characters(registry)
+    writer.commit()
+    loaded = crud.get_character_registry(db, project.id)
+
+    assert [(r.key, r.aliases, r.scene_bits, r.dialogue_by_scene) for r in loaded] == [
+        (r.key, r.aliases, r.scene_bits, r.dialogue_by_scene) for r in registry
+    ]
+    assert loaded.scenes_featuring("Mary") == list(range(1, 90, 3))
+    writer = AnalysisWriter.start(db, project.id)
+    writer.replace_project_analysis()
+    writer.commit()
+    assert len(crud.get_character_registry(db, project.id)) == 0
+
+
+def test_fountain_blocks_count_dialogue_lines():
+    source = "INT. ROOM - DAY\n\nMARY\n(beat)\nHello.\nAgain.\n\nJOHN ^\nHi.\n"
+
+    block = next(iter_fountain_blocks(source.splitlines()))
+
+    assert block.dialogue == {"MARY": 2, "JOHN": 1}
@@ -0,0 +1,70 @@
+import json
+from pathlib import Path
+
+from app import ai_integration
+from app.services.extraction_cache import ExtractionCache
+
+from tests.test_ai_integration import MINIMAL_PDF_BYTES
+
+
+def test_cache_round_trip_and_lru_eviction(tmp_path):
+    payload = {"text": "x" * 60, "extractor": "pdfplumber", "score": 60}
+    entry_size = len(json.dumps(payload))
+    cache = ExtractionCache(tmp_path, max_bytes=entry_size * 2)
+
+    cache.put("a", payload)
+    cache.put("b", payload)
+    # reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == payload
+    cache.put("c", payload)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == payload
+    assert cache.get("c") == payload
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3 and stats["misses"] == 1
+    assert stats["bytes"] <= entry_size * 2
+
+
+def test_repeat_read_skips_pdf_parsing(tmp_path, monkeypatch):
+    cache = ExtractionCache(tmp_path / "cache")
+    monkeypatch.setattr(ai_integration, "get_extraction_cache", lambda: cache)
+    pdf_path = tmp_path / "sample.pdf"
+    pdf_path.write_bytes(MINIMAL_PDF_BYTES)
+
+    calls = []
+    real_extract = ai_integration._extract_pdf
+
+    def counting_extract(path):
+        calls.append(path)
+        return real_extract(path)
+
+    monkeypatch.setitem(ai_integration._CACHED_EXTRACTORS, ".pdf", counting_extract)
+    hashed = []
+    real_sha256 = ai_integration.file_sha256
+    monkeypatch.setattr(ai_integration, "file_sha256", lambda path: hashed.append(path) or real_sha256(path))
+
+    first = ai_integration._read_script_text(str(pdf_path))
+    second = ai_integration._read_script_text(str(pdf_path))
+
+    assert first == second
+    assert "INT. ROOM - DAY" in second
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+    # one hash of the upload per read, hit or miss
+    assert len(hashed) == 2
+
+
+def test_completed_page_stream_fills_the_cache(tmp_path, monkeypatch):
+    cache = ExtractionCache(tmp_path / "cache")
+    monkeypatch.setattr(ai_integration, "get_extraction_cache", lambda: cache)
+    pdf_path = tmp_path / "demo.pdf"
+    pdf_path.write_bytes((Path(__file__).resolve().parents[1] / "uploads" / "demo_script.pdf").read_bytes())
+
+    streamed = list(ai_integration.stream_script_scenes(str(pdf_path)))
+    monkeypatch.setitem(ai_integration._CACHED_EXTRACTORS, ".pdf", lambda path: 1 / 0)
+    text = ai_integration._read_script_text(str(pdf_path))
+
+    assert cache.stats()["hits"] == 1
+    assert [scene["heading"] for scene in ai_integration.iter_scenes(text)] == [scene["heading"] for scene in streamed]
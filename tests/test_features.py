@@ -0,0 +1,30 @@
+from pathlib import Path
+
+import pytest
+
+from ai.features import extract_features_from_scenes, extract_features_from_text
+from app import ai_integration
+from app.services.extraction_cache import ExtractionCache
+
+
+UPLOADS = Path(__file__).resolve().parents[1] / "uploads"
+SAMPLES = sorted(path for path in UPLOADS.iterdir() if path.suffix.lower() in {".pdf", ".txt", ".docx"})
+
+
+@pytest.mark.parametrize("sample", SAMPLES, ids=lambda path: path.name)
+def test_scene_features_match_text_features_on_sample_scripts(sample, tmp_path, monkeypatch):
+    monkeypatch.setattr(ai_integration, "get_extraction_cache", lambda: ExtractionCache(tmp_path / "cache"))
+    text = ai_integration.read_script_text(str(sample))
+
+    scenes = ai_integration.naive_scene_breakdown(text)
+
+    assert extract_features_from_scenes(scenes) == extract_features_from_text(text)
+
+
+def test_scene_features_count_heading_lines_and_opening_text():
+    text = "Cold open: they RUN.\nINT KITCHEN\nMARY\nWe fight.\nINT. KITCHEN - DAY\nint. kitchen - day\nEXT. YARD\nA CHASE\n"
+
+    features = extract_features_from_scenes(ai_integration.naive_scene_breakdown(text))
+
+    assert features == extract_features_from_text(text)
+    assert features[1] == features[4] == 2
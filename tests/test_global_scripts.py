@@ -0,0 +1,74 @@
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import crud
+from app.database.database import Base
+from app.models.models import GlobalScript, ScriptBlob
+
+
+SCRIPT_TEXT = "INT. KITCHEN - DAY\nMARY pours coffee and looks out of the window.\n" * 200
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def test_identical_uploads_share_one_compressed_blob(db):
+    first = crud.create_global_script(db, "draft.txt", SCRIPT_TEXT)
+    second = crud.create_global_script(db, "draft-copy.txt", SCRIPT_TEXT)
+
+    assert first.blob_id == second.blob_id
+    blob = db.query(ScriptBlob).one()
+    assert blob.stored_size < blob.size / 10
+    assert second.text == SCRIPT_TEXT
+
+
+def test_reupload_replaces_and_prunes_the_old_blob(db):
+    crud.create_global_script(db, "draft.txt", SCRIPT_TEXT)
+    updated = crud.create_global_script(db, "draft.txt", SCRIPT_TEXT + "EXT. YARD - NIGHT\n")
+
+    assert db.query(ScriptBlob).count() == 1
+    assert updated.text.endswith("EXT. YARD - NIGHT\n")
+
+
+def test_listing_does_not_load_script_bodies(db):
+    crud.create_global_script(db, "draft.txt", SCRIPT_TEXT)
+    db.expunge_all()
+
+    listed = crud.get_all_global_scripts(db)
+
+    state = inspect(listed[0])
+    assert {"content", "blob"} <= state.unloaded
+    assert isinstance(listed[0], GlobalScript)
+
+
+def test_losing_the_blob_insert_race_keeps_the_callers_pending_work(db, monkeypatch):
+    db.add(GlobalScript(filename="notes.txt"))
+    db.flush()
+    encode_text = crud.script_storage.encode_text
+
+    def encode_after_a_concurrent_insert(text):
+        codec, payload = encode_text(text)
+        # Another request stores the same body between the lookup and the insert.
+        db.connection().execute(
+            ScriptBlob.__table__.insert().values(
+                sha256=crud.script_storage.text_digest(text), codec=codec, size=len(text), stored_size=len(payload), data=payload
+            )
+        )
+        return codec, payload
+
+    monkeypatch.setattr(crud.script_storage, "encode_text", encode_after_a_concurrent_insert)
+    blob = crud.get_or_create_script_blob(db, SCRIPT_TEXT)
+    db.commit()
+
+    assert db.query(ScriptBlob).one().id == blob.id
+    assert [script.filename for script in db.query(GlobalScript)] == ["notes.txt"]
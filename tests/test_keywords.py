@@ -0,0 +1,80 @@
+import pytest
+
+from ai import keywords
+from ai.features import extract_features_from_text
+from app import ai_integration
+from ai.keywords import KeywordAutomaton
+
+
+def test_keywords_match_whole_words_only():
+    hits = keywords.keyword_hits("They had begun brunch. RUN! The gun, the Gun; running late.")
+
+    assert hits["tone"]["action"] == 4  # RUN, gun, Gun, running
+    assert hits["action"]["action"] == 1
+    assert hits["genre"]["comedy"] == 0
+    assert keywords.has_keyword("Shots are fired.", "action") is False
+    assert keywords.has_keyword("They shoot.", "action") is True
+
+
+def test_phrases_and_overlapping_terms_are_all_counted():
+    automaton = KeywordAutomaton(
+        {
+            "places": {"street": ("main street", "street"), "square": ("town square",)},
+            "mood": {"night": ("dark night", "night")},
+        }
+    )
+
+    hits = automaton.count("Main street at dark night; a dark main STREET by the town square at night.")
+
+    assert hits["places"] == {"street": 4, "square": 1}
+    assert hits["mood"] == {"night": 3}
+
+
+def test_large_lexicons_count_like_a_word_tally():
+    vocabulary = [f"term{i}" for i in range(5000)]
+    automaton = KeywordAutomaton({"big": {"even": vocabulary[::2], "odd": vocabulary[1::2]}})
+    text = " ".join(vocabulary[:40] * 3) + " unrelated words"
+
+    assert automaton.count(text)["big"] == {"even": 60, "odd": 60}
+
+
+def test_sentiment_genre_and_features_share_the_lexicons():
+    sentiment = ai_integration._analyze_script_sentiment("Love and hope win. The darkness begins; a detective waits.")
+
+    assert sentiment["positive"] == 4.0
+    assert sentiment["negative"] == 1.0  # darkness
+    assert sentiment["estimated_genre"] == "thriller"
+    assert ai_integration._infer_scene_tone(["We brunch by the heart-shaped pool."]) == "romance"
+    assert extract_features_from_text("INT. ROOM - DAY\nThey run.\nA rerun plays.\n")[2] == 1
+
+
+def _legacy_sentiment(text):
+    # The substring scorer the automaton replaced, kept frozen as the recall reference.
+    lower = text.lower()
+    positive = sum(lower.count(word) * weight for word, weight in keywords.POSITIVE_WEIGHTS.items())
+    negative = sum(lower.count(word) * weight for word, weight in keywords.NEGATIVE_WEIGHTS.items())
+    genres = {
+        "action": ("explosion", "chase", "gun"),
+        "romance": ("romance", "kiss", "wedding"),
+        "thriller": ("mystery", "detective", "shadow"),
+        "comedy": ("laugh", "funny", "joke"),
+    }
+    genre = next((label for label, words in genres.items() if any(word in lower for word in words)), "drama")
+    return round(positive, 2), round(negative, 2), genre
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "She loved him; hopeful winners laughed with joyful, successful friends.",
+        "Fearful and angered, they wander the darkness; deaths mount for the losers.",
+        "Guns and explosions; the car chased them.",
+        "They kissed at the weddings.",
+        "Shadowy detectives follow.",
+        "Jokes and laughter fill the room.",
+    ],
+)
+def test_inflected_words_score_like_the_legacy_substring_matcher(text):
+    sentiment = ai_integration._analyze_script_sentiment(text)
+
+    assert (sentiment["positive"], sentiment["negative"], sentiment["estimated_genre"]) == _legacy_sentiment(text)
@@ -0,0 +1,72 @@
+import os
+
+import pandas as pd
+import pytest
+from sklearn.dummy import DummyClassifier
+from sklearn.linear_model import LinearRegression
+
+from ai.model_registry import ModelRegistry, save_model
+from ai.task_assigner import assign_tasks_from_breakdown
+
+
+def _model(slope):
+    return LinearRegression().fit([[0.0], [1.0]], [0.0, slope])
+
+
+def _bump_mtime(path, seconds=10):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + seconds * 1_000_000_000))
+
+
+def test_model_is_loaded_once_and_hot_swapped_on_new_content(tmp_path):
+    path = save_model(_model(2.0), tmp_path / "budget.pkl")
+    registry = ModelRegistry()
+
+    first = registry.get(path)
+    assert registry.get(path) is first
+    assert first.model.predict([[1.0]])[0] == pytest.approx(2.0)
+
+    # Touched but identical: same model, no load
+    _bump_mtime(path)
+    assert registry.get(path).version == first.version
+    assert registry.loads == 1
+
+    save_model(_model(5.0), path)
+    _bump_mtime(path, 20)
+    second = registry.get(path)
+    assert second.version != first.version
+    assert second.model.predict([[1.0]])[0] == pytest.approx(5.0)
+    # whoever still holds the previous model keeps a working one
+    assert first.model.predict([[1.0]])[0] == pytest.approx(2.0)
+    assert (registry.loads, registry.reloads) == (2, 1)
+    assert [info["version"] for info in registry.stats()["models"]] == [second.version]
+
+
+def test_unloadable_file_keeps_the_previous_model(tmp_path):
+    path = save_model(_model(3.0), tmp_path / "budget.pkl")
+    registry = ModelRegistry()
+    loaded = registry.get(path)
+
+    path.write_bytes(b"half a pickle")
+    _bump_mtime(path)
+
+    assert registry.get(path) is loaded
+    assert registry.get(path) is loaded
+    assert registry.failures == 1
+    with pytest.raises(Exception):
+        ModelRegistry().get(path)
+
+
+def test_crew_assignments_cover_every_scene_round_robin(tmp_path):
+    features = pd.DataFrame({"scene_length": [1, 2], "action_density": [0.0, 1.0], "num_chars": [1, 1]})
+    path = save_model(DummyClassifier(strategy="constant", constant=2).fit(features, [2, 0]), tmp_path / "tasks.pkl")
+    scenes = [{"content": ["They run.", "MARY", "Go."]}, {"content": []}, {"content": ["A fight."]}]
+
+    assignments = assign_tasks_from_breakdown({"scenes": scenes}, [{"crew_id": 7}, {"crew_id": 9}], str(path))
+
+    assert assignments == [
+        {"scene_index": 0, "role": "Editor", "assigned_to": 7},
+        {"scene_index": 1, "role": "Editor", "assigned_to": 9},
+        {"scene_index": 2, "role": "Editor", "assigned_to": 7},
+    ]
+    assert assign_tasks_from_breakdown({"scenes": []}, [{"crew_id": 7}], str(path)) == []
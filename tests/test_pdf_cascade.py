@@ -0,0 +1,211 @@
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+
+import pytest
+
+from app import ai_integration
+from app.services import pdf_extraction, pdf_raw_decoder, worker_pool
+
+from tests.test_ai_integration import MINIMAL_PDF_BYTES
+
+
+SCREENPLAY_PAGE = "INT. KITCHEN - DAY\nMARY pours coffee and looks out of the window.\n" * 20
+
+
+def _hang(path):
+    time.sleep(30)
+    return ""
+
+
+def _packed_pdf(pages):
+    """A PDF 1.5 file whose catalog, page tree, pages and font live in a compressed object stream."""
+    count = len(pages)
+    packed = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % (4 + i) for i in range(count)), count),
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier >>",
+    }
+    for i in range(count):
+        packed[4 + i] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792]"
+            b" /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (4 + count + i)
+        )
+    objstm, xref = 4 + 2 * count, 5 + 2 * count
+    out, offsets = b"%PDF-1.5\n", {}
+    for i, text in enumerate(pages):
+        lines = b" ".join(b"(%s) '" % line.encode() for line in text.splitlines())
+        stream = zlib.compress(b"BT /F1 12 Tf 72 720 Td 14 TL " + lines + b" ET")
+        offsets[4 + count + i] = len(out)
+        out += b"%d 0 obj\n<< /Length %d /Filter /FlateDecode >>\nstream\n" % (4 + count + i, len(stream))
+        out += stream + b"\nendstream\nendobj\n"
+    header, body = [], b""
+    for number, data in packed.items():
+        header.append(b"%d %d" % (number, len(body)))
+        body += data + b"\n"
+    first = b" ".join(header) + b"\n"
+    stream = zlib.compress(first + body)
+    offsets[objstm] = len(out)
+    out += b"%d 0 obj\n<< /Type /ObjStm /N %d /First %d /Length %d /Filter /FlateDecode >>\nstream\n" % (
+        objstm, len(packed), len(first), len(stream)
+    )
+    out += stream + b"\nendstream\nendobj\n"
+    rows = [struct.pack(">BIH", 0, 0, 65535)]
+    for number in range(1, xref + 1):
+        if number in packed:
+            rows.append(struct.pack(">BIH", 2, objstm, list(packed).index(number)))
+        else:
+            rows.append(struct.pack(">BIH", 1, offsets.get(number, len(out)), 0))
+    stream = zlib.compress(b"".join(rows))
+    xref_at = len(out)
+    out += b"%d 0 obj\n<< /Type /XRef /Size %d /W [1 4 2] /Root 1 0 R /Length %d /Filter /FlateDecode >>\nstream\n" % (
+        xref, xref + 1, len(stream)
+    )
+    return out + stream + b"\nendstream\nendobj\nstartxref\n%d\n%%%%EOF\n" % xref_at
+
+
+def test_run_with_budget_kills_slow_extractor(tmp_path):
+    started = time.perf_counter()
+    with pytest.raises(pdf_extraction.ExtractorTimeout):
+        pdf_extraction.run_with_budget(_hang, str(tmp_path / "slow.pdf"), 0.5)
+    assert time.perf_counter() - started < 10
+
+
+def test_cascade_stops_at_first_good_candidate(tmp_path, monkeypatch):
+    monkeypatch.setenv("PDF_EXTRACTOR_BUDGET_SECONDS", "0")
+    pdf_path = tmp_path / "script.pdf"
+    pdf_path.write_bytes(MINIMAL_PDF_BYTES)
+    calls = []
+
+    def fake(name, text):
+        def extractor(path):
+            calls.append(name)
+            return text
+        return extractor
+
+    monkeypatch.setattr(
+        pdf_extraction,
+        "available_extractors",
+        lambda: {
+            "pdfplumber": fake("pdfplumber", SCREENPLAY_PAGE),
+            "pypdf2": fake("pypdf2", SCREENPLAY_PAGE * 2),
+            "pdfminer": fake("pdfminer", ""),
+            "raw": fake("raw", ""),
+        },
+    )
+
+    result = ai_integration._extract_pdf(pdf_path)
+
+    assert calls == ["pdfplumber"]
+    assert result.extractor == "pdfplumber"
+    assert [attempt["status"] for attempt in result.attempts] == ["accepted"]
+
+
+def test_prescan_orders_cheap_extractors_first_without_text_layer():
+    prescan = pdf_extraction.PdfPrescan(page_count=3, has_text_layer=False)
+    assert pdf_extraction.plan_extractor_order(prescan)[0] == "raw"
+    long_script = pdf_extraction.PdfPrescan(page_count=120, has_text_layer=True)
+    assert pdf_extraction.plan_extractor_order(long_script, fast_first_pages=40)[0] == "raw"
+
+
+def test_prescan_counts_pages_packed_in_object_streams(tmp_path):
+    pdf_path = tmp_path / "packed.pdf"
+    pdf_path.write_bytes(_packed_pdf(["INT. ROOM - DAY\nJOHN waits.", "EXT. PARK - NIGHT\nMARY runs."]))
+
+    prescan = pdf_extraction.prescan_pdf(pdf_path)
+
+    assert prescan == pdf_extraction.PdfPrescan(page_count=2, has_text_layer=True)
+    assert pdf_extraction.plan_extractor_order(prescan)[0] == "pdfplumber"
+    # without a page count no candidate covers the document well enough to stop the cascade
+    assert ai_integration._pdf_text_quality(SCREENPLAY_PAGE, 0) == 0.0
+
+
+def test_page_shards_cover_every_page():
+    assert pdf_extraction.page_shards(10, 3) == [(0, 4), (4, 8), (8, None)]
+    assert pdf_extraction.page_shards(2, 8) == [(0, 1), (1, None)]
+    assert pdf_extraction.page_shards(0, 4) == [(0, None)]
+
+
+def test_parallel_extraction_matches_serial(monkeypatch):
+    monkeypatch.setenv("WORKER_POOL_SIZE", "2")
+    path = str(Path(__file__).resolve().parents[1] / "uploads" / "demo_script.pdf")
+    try:
+        parallel = pdf_extraction.extract_pdfplumber_parallel(path, 5, budget=60)
+    finally:
+        worker_pool.shutdown_process_pool()
+    assert parallel == pdf_extraction.extract_pdfplumber(path)
+
+
+def test_timed_map_runs_on_the_warm_pool_until_a_task_overruns(monkeypatch):
+    monkeypatch.setenv("WORKER_POOL_SIZE", "2")
+    try:
+        shared = worker_pool.get_process_pool()
+        assert set(worker_pool.map_ordered(os.getpid, [(), ()], timeout=10)) <= set(shared._processes)
+        assert worker_pool.get_process_pool() is shared
+
+        started = time.perf_counter()
+        with pytest.raises(worker_pool.PoolTimeout):
+            worker_pool.map_ordered(_hang, [("a.pdf",), ("b.pdf",)], timeout=0.5)
+        assert time.perf_counter() - started < 10
+        assert worker_pool.get_process_pool() is not shared
+        assert worker_pool.map_ordered(len, [("abc",), ("de",)], timeout=10) == [3, 2]
+    finally:
+        worker_pool.shutdown_process_pool()
+
+
+def test_raw_decoder_reads_plain_content_streams(tmp_path):
+    pdf_path = tmp_path / "plain.pdf"
+    pdf_path.write_bytes(MINIMAL_PDF_BYTES)
+
+    assert pdf_raw_decoder.extract_text(str(pdf_path)) == "INT. ROOM - DAY\nJOHN"
+
+
+def test_raw_decoder_inflates_streams_and_applies_tounicode(tmp_path):
+    cmap = (
+        b"begincmap\n1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n"
+        b"1 beginbfrange\n<0021> <005A> <0041>\nendbfrange\n"
+        b"1 beginbfchar\n<0003> <0020>\nendbfchar\nendcmap"
+    )
+    content = zlib.compress(
+        b"BT /F0 12 Tf 1 0 0 -1 72 700 Tm [<0028002D0033>-50<0003002C0026002D>]TJ "
+        b"/F9 12 Tf 1 0 0 -1 72 712 Tm (\\(skip\\)) Tj ET"
+    )
+    body = b"".join([
+        b"%PDF-1.4\n",
+        b"1 0 obj\n<< /Type /Page /Contents 2 0 R /Resources << /Font << /F0 3 0 R >> >> >>\nendobj\n",
+        b"2 0 obj\n<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content), content, b"\nendstream\nendobj\n",
+        b"3 0 obj\n<< /Type /Font /Subtype /Type0 /ToUnicode 4 0 R >>\nendobj\n",
+        b"4 0 obj\n<< /Length %d >>\nstream\n" % len(cmap), cmap, b"\nendstream\nendobj\n%%EOF",
+    ])
+    pdf_path = tmp_path / "flate.pdf"
+    pdf_path.write_bytes(body)
+
+    text = pdf_raw_decoder.extract_text(str(pdf_path))
+
+    assert text.splitlines() == ["HMS LFM", "(skip)"]
+
+
+def test_raw_decoder_resolves_font_names_per_page(tmp_path):
+    cmap = b"begincmap\n1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n1 beginbfrange\n<0001> <0002> <0048>\nendbfrange\nendcmap"
+    first = b"BT /F0 12 Tf 1 0 0 1 72 700 Tm <00010002> Tj ET"
+    second = b"BT /F0 12 Tf 1 0 0 1 72 700 Tm (JOHN) Tj ET"
+    body = b"".join([
+        b"%PDF-1.4\n",
+        b"1 0 obj\n<< /Type /Page /Parent 9 0 R /Contents 2 0 R /Resources << /Font << /F0 3 0 R >> >> >>\nendobj\n",
+        b"2 0 obj\n<< /Length %d >>\nstream\n" % len(first), first, b"\nendstream\nendobj\n",
+        b"3 0 obj\n<< /Type /Font /Subtype /Type0 /ToUnicode 4 0 R >>\nendobj\n",
+        b"4 0 obj\n<< /Length %d >>\nstream\n" % len(cmap), cmap, b"\nendstream\nendobj\n",
+        # The second page inherits its resources, where /F0 is a different, single-byte font.
+        b"5 0 obj\n<< /Type /Page /Parent 9 0 R /Contents 6 0 R >>\nendobj\n",
+        b"6 0 obj\n<< /Length %d >>\nstream\n" % len(second), second, b"\nendstream\nendobj\n",
+        b"7 0 obj\n<< /Type /Font /Subtype /Type1 /Encoding /WinAnsiEncoding >>\nendobj\n",
+        b"9 0 obj\n<< /Type /Pages /Kids [1 0 R 5 0 R] /Count 2 /Resources 10 0 R >>\nendobj\n",
+        b"10 0 obj\n<< /Font 11 0 R >>\nendobj\n",
+        b"11 0 obj\n<< /F0 7 0 R >>\nendobj\n%%EOF",
+    ])
+    pdf_path = tmp_path / "fonts.pdf"
+    pdf_path.write_bytes(body)
+
+    assert list(pdf_raw_decoder.iter_page_text(pdf_path)) == ["HI", "JOHN"]
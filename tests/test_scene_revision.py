@@ -0,0 +1,166 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import auth_supabase, main
+from app.database.database import Base
+from app.main import app
+from app.models.models import GlobalScript, Project, Scene, ScheduleEntry, ToDo
+from app.services import scene_diff
+
+
+def _keys(*scenes):
+    return [(scene_diff.scene_content_hash(heading, body), heading) for heading, body in scenes]
+
+
+def test_align_scenes_classifies_every_kind_of_revision():
+    old = _keys(("INT. A", "1"), ("INT. B", "2"), ("INT. C", "3"), ("INT. D", "4"), ("INT. E", "5"), ("INT. F", "6"))
+    new = _keys(("INT. A", "1"), ("INT. C", "3"), ("INT. D", "4"), ("INT. X", "new"), ("INT. B", "2"), ("INT. E", "5 and more"))
+
+    changes = scene_diff.align_scenes(old, new)
+
+    assert [(change.kind, change.old, change.new) for change in changes] == [
+        ("unchanged", 0, 0),
+        ("unchanged", 2, 1),
+        ("unchanged", 3, 2),
+        ("inserted", None, 3),
+        ("moved", 1, 4),
+        ("edited", 4, 5),
+        ("deleted", 5, None),
+    ]
+    assert scene_diff.summarise(changes) == {"unchanged": 3, "moved": 1, "edited": 1, "inserted": 1, "deleted": 1}
+
+
+def test_scene_hash_ignores_placeholder_numbering():
+    assert scene_diff.scene_content_hash("Scene 3", "text") == scene_diff.scene_content_hash("Scene 7", "text")
+    assert scene_diff.scene_content_hash("INT. A", "text") != scene_diff.scene_content_hash("INT. B", "text")
+
+
+VERSION_ONE = """INT. KITCHEN - DAY
+Mary pours coffee.
+
+EXT. YARD - DAY
+John rakes leaves.
+
+INT. GARAGE - NIGHT
+The car will not start.
+
+EXT. ROOF - NIGHT
+Stars overhead.
+"""
+
+VERSION_TWO = """INT. KITCHEN - DAY
+Mary pours coffee.
+
+INT. HALLWAY - DAY
+A new corridor scene.
+
+EXT. YARD - DAY
+John rakes leaves.
+
+INT. GARAGE - NIGHT
+The car finally starts.
+"""
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        db.add(Project(name="Revisions", budget=0))
+        db.commit()
+
+    def override_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("EXTRACTION_CACHE_MAX_BYTES", "0")
+    app.dependency_overrides[main.get_db] = override_db
+    app.dependency_overrides[auth_supabase.get_current_user_from_supabase] = lambda: SimpleNamespace(id=None, is_admin=True)
+    try:
+        yield TestClient(app), session_factory
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+
+def _upload_and_analyse(client, text):
+    script = client.post("/projects/1/upload_script", files={"file": ("draft.txt", text)}).json()
+    analysis = client.post("/projects/1/analyze_script", json={"filename": "draft.txt"})
+    assert analysis.status_code == 200
+    return script["id"], analysis.json()
+
+
+def test_reanalysis_keeps_unchanged_scenes_and_their_todos(client):
+    client, session_factory = client
+    first_id, first = _upload_and_analyse(client, VERSION_ONE)
+    assert first["revision"]["summary"]["inserted"] == 4
+    with session_factory() as db:
+        yard = db.query(Scene).filter(Scene.heading.like("EXT. YARD%")).one()
+        yard_id = yard.id
+        db.query(ToDo).filter(ToDo.scene_id == yard_id).update({ToDo.status: "done"})
+        db.commit()
+
+    second_id, second = _upload_and_analyse(client, VERSION_TWO)
+
+    assert second["revision"]["summary"] == {"unchanged": 2, "moved": 0, "edited": 1, "inserted": 1, "deleted": 1}
+    with session_factory() as db:
+        scenes = db.query(Scene).order_by(Scene.index).all()
+        assert [scene.heading for scene in scenes] == ["INT. KITCHEN - DAY", "INT. HALLWAY - DAY", "EXT. YARD - DAY", "INT. GARAGE - NIGHT"]
+        assert [scene.script_id for scene in scenes] == [first_id, second_id, first_id, second_id]
+        yard_todos = db.query(ToDo).filter(ToDo.scene_id == yard_id).all()
+        assert [(todo.status, todo.title) for todo in yard_todos] == [
+            ("done", "Prep Scene 3: EXT. YARD - DAY"),
+            ("done", "Post: VFX/Editing Scene 3"),
+        ]
+        assert db.query(ToDo).count() == 8
+        assert db.query(ScheduleEntry).count() == 4
+
+    diff = client.get(f"/projects/1/scripts/{second_id}/diff").json()
+    assert diff["base_script_id"] == first_id
+    assert [(change["change"], change["previous_scene_no"], change["scene_no"]) for change in diff["changes"]] == [
+        ("unchanged", 1, 1),
+        ("inserted", None, 2),
+        ("unchanged", 2, 3),
+        ("edited", 3, 4),
+        ("deleted", 4, None),
+    ]
+    assert diff["changes"][2]["scene_id"] == yard_id
+    assert diff["changes"][2]["changed_in_script_id"] == first_id
+
+
+def test_diff_maps_identical_scenes_to_their_own_rows(client):
+    client, session_factory = client
+    repeated = "INT. HALL - DAY\nSilence.\n\nEXT. YARD - DAY\nWind.\n\nINT. HALL - DAY\nSilence.\n"
+    _upload_and_analyse(client, repeated)
+    second_id, _ = _upload_and_analyse(client, repeated + "\nEXT. ROOF - NIGHT\nStars.\n")
+
+    diff = client.get(f"/projects/1/scripts/{second_id}/diff").json()
+
+    with session_factory() as db:
+        scene_ids = [scene.id for scene in db.query(Scene).order_by(Scene.index)]
+    assert [change["change"] for change in diff["changes"]] == ["unchanged", "unchanged", "unchanged", "inserted"]
+    assert [change["scene_id"] for change in diff["changes"]] == scene_ids
+
+
+def test_global_script_text_is_filled_in_by_analysis_not_upload(client):
+    client, session_factory = client
+    client.post("/projects/1/upload_script", files={"file": ("draft.txt", VERSION_ONE)})
+    with session_factory() as db:
+        assert db.query(GlobalScript).filter(GlobalScript.filename == "draft.txt").one().blob_id is None
+
+    assert client.post("/projects/1/analyze_script", json={"filename": "draft.txt"}).status_code == 200
+
+    with session_factory() as db:
+        stored = db.query(GlobalScript).filter(GlobalScript.filename == "draft.txt").one()
+        assert stored.text.startswith("INT. KITCHEN - DAY")
@@ -0,0 +1,69 @@
+import pytest
+
+from ai.features import extract_features_from_scenes
+from app.ai_integration import naive_scene_breakdown, scene_table_breakdown
+from app.services.scene_table import SceneTable
+from benchmarks.corpus import CorpusSpec, generate_script
+
+
+def _scene(index, content, **extra):
+    scene = {
+        "index": index,
+        "heading": f"INT. ROOM {index} - DAY",
+        "description": "\n".join(content),
+        "word_count": sum(len(line.split()) for line in content),
+        "content": content,
+        "location": f"ROOM {index}",
+        "time_of_day": "DAY",
+        "characters": [],
+        "dialogue": {},
+        "tone": "neutral",
+    }
+    scene.update(extra)
+    return scene
+
+
+def test_table_round_trips_scene_dicts():
+    scenes = [
+        _scene(1, ["MARY", "Hello.", "", "John waves."], characters=["Mary"], dialogue={"MARY": 1}),
+        _scene(2, [], location=None, time_of_day=None),
+        _scene(3, ["A line with\nan embedded newline", "", "last"], heading="Scene 3"),
+        _scene(4, [""]),
+    ]
+    table = SceneTable.from_scenes(iter(scenes))
+
+    assert len(table) == 4
+    assert table.to_dicts() == scenes
+    assert table[-1]["content"] == [""]
+    assert table[1].get("location") is None
+    assert dict(table[0]) == scenes[0]
+    with pytest.raises(KeyError):
+        table[0]["predicted_budget"]
+
+
+def test_table_rejects_description_that_is_not_the_joined_content():
+    with pytest.raises(ValueError):
+        SceneTable.from_scenes([_scene(1, ["one", "two"], description="one")])
+
+
+def test_concat_continues_indices_and_remaps_strings():
+    first = SceneTable.from_scenes([_scene(1, ["a"]), _scene(2, ["b", "c"], characters=["Mary"])])
+    second = SceneTable.from_scenes([_scene(1, [], characters=["John", "Mary"], dialogue={"JOHN": 2})])
+    second.predicted_budget[0] = 12.5
+    combined = SceneTable.concat([first, SceneTable(), second])
+
+    assert [scene.index for scene in combined] == [1, 2, 3]
+    assert combined[2]["characters"] == ["John", "Mary"]
+    assert combined[2]["dialogue"] == {"JOHN": 2}
+    assert combined[1]["content"] == ["b", "c"]
+    assert combined[2].predicted_budget == 12.5
+
+
+def test_scene_table_breakdown_matches_dict_breakdown():
+    text = generate_script(CorpusSpec(scenes=120, seed=3))
+    table = scene_table_breakdown(text, parallel=False)
+    scenes = naive_scene_breakdown(text, parallel=False)
+
+    assert table.to_dicts() == scenes
+    assert extract_features_from_scenes(list(table)) == extract_features_from_scenes(scenes)
+    assert table.nbytes() < len(text.encode("utf-8")) * 2
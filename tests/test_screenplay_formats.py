@@ -0,0 +1,80 @@
+from app import ai_integration
+from app.services import screenplay_formats
+
+
+FOUNTAIN_SCRIPT = """Title: The Kitchen
+Author: Someone
+
+/* cut for time */
+.COLD OPEN
+
+Rain on the window.
+
+INT. KITCHEN - DAY #1#
+
+MARY pours coffee. [[check prop list]]
+
+MARY (V.O.)
+(quietly)
+We should have left.
+
+@McCLANE
+Then we wait.
+
+CUT TO:
+
+EXT. YARD - NIGHT
+
+= Dogs bark at nothing
+Dogs bark.
+"""
+
+FDX_SCRIPT = """<?xml version="1.0" encoding="UTF-8" standalone="no" ?>
+<FinalDraft DocumentType="Script" Template="No" Version="4">
+  <Content>
+    <Paragraph Type="Scene Heading"><Text>int. kitchen - day</Text></Paragraph>
+    <Paragraph Type="Action"><Text>MARY pours </Text><Text Style="Bold">coffee.</Text></Paragraph>
+    <Paragraph Type="Character"><Text>MARY (CONT'D)</Text></Paragraph>
+    <Paragraph Type="Dialogue"><Text>We should have left.</Text></Paragraph>
+    <Paragraph Type="Scene Heading"><Text>EXT. YARD - NIGHT</Text></Paragraph>
+    <Paragraph Type="Action"><Text>Dogs bark.</Text></Paragraph>
+  </Content>
+  <TitlePage>
+    <Content>
+      <Paragraph Type="Title"><Text>THE KITCHEN</Text></Paragraph>
+    </Content>
+  </TitlePage>
+</FinalDraft>
+"""
+
+
+def test_fountain_blocks_follow_the_markup():
+    blocks = list(screenplay_formats.iter_fountain_blocks(FOUNTAIN_SCRIPT.splitlines(keepends=True)))
+
+    assert [block.heading for block in blocks] == ["COLD OPEN", "INT. KITCHEN - DAY", "EXT. YARD - NIGHT"]
+    kitchen = blocks[1]
+    assert kitchen.characters == ["MARY", "McCLANE"]
+    assert kitchen.lines == [
+        "MARY pours coffee.",
+        "MARY (V.O.)",
+        "(quietly)",
+        "We should have left.",
+        "McCLANE",
+        "Then we wait.",
+        "CUT TO:",
+    ]
+    assert blocks[2].lines == ["Dogs bark."]
+
+
+def test_fdx_scenes_match_breakdown_shape(tmp_path):
+    path = tmp_path / "script.fdx"
+    path.write_text(FDX_SCRIPT, encoding="utf-8")
+
+    scenes = ai_integration.script_scene_breakdown(str(path), ai_integration._read_script_text(str(path)))
+
+    assert [scene["heading"] for scene in scenes] == ["INT. KITCHEN - DAY", "EXT. YARD - NIGHT"]
+    assert scenes[0]["location"] == "KITCHEN" and scenes[0]["time_of_day"] == "DAY"
+    assert scenes[0]["characters"] == ["Mary"]
+    assert scenes[0]["content"] == ["MARY pours coffee.", "MARY (CONT'D)", "We should have left."]
+    assert set(scenes[0]) == set(ai_integration.naive_scene_breakdown("INT. A - DAY\nx")[0])
+    assert list(ai_integration.stream_script_scenes(str(path))) == scenes
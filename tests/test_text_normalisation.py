@@ -0,0 +1,33 @@
+import random
+import re
+
+from app.services import text_normalisation
+
+
+def _legacy_clean(text):
+    # The chained implementation the engine replaced, kept as the reference.
+    if not text:
+        return ""
+    normalised = text.replace("\ufeff", "").replace("\r\n", "\n").replace("\r", "\n").replace("\x0c", "\n")
+    normalised = re.sub(r"[^\x09\x0A\x0D\x20-\x7E]+", " ", normalised)
+    normalised = "\n".join(re.sub(r"[ \t]+", " ", line).strip() for line in normalised.splitlines())
+    normalised = re.sub(r"\n{3,}", "\n\n", normalised)
+    return normalised.strip()
+
+
+def test_normalise_matches_legacy_cleaning_on_noisy_input():
+    alphabet = list("ab Z.\t\n\r\x0c\x0b\x00\x08\x7f\ufeff\ufffd\x85\xa0 é漢")
+    rng = random.Random(7)
+    for _ in range(5000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        assert text_normalisation.normalise(text) == _legacy_clean(text), repr(text)
+
+
+def test_measure_counts_match_character_loops():
+    text = "INT. CAFÉ - DAY\r\n\tZoë waits.\x01\ufffd\n\n漢字 "
+    stats = text_normalisation.measure(text)
+
+    assert stats.letters == sum(1 for ch in text if ch.isalpha())
+    assert stats.controls == sum(1 for ch in text if ord(ch) < 9)
+    assert (stats.spaces, stats.newlines, stats.replacements) == (text.count(" "), text.count("\n"), 1)
+    assert text_normalisation.heading_markers(text) == 1
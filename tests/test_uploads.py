@@ -0,0 +1,150 @@
+import hashlib
+import io
+from types import SimpleNamespace
+
+import anyio
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import auth_supabase, main
+from app.database.database import Base
+from app.main import app
+from app.models.models import Project
+from app.services import uploads
+
+
+def test_stream_upload_hashes_and_renames_atomically(tmp_path):
+    payload = b"INT. ROOM - DAY\n" * 1000
+    destination = tmp_path / "script.txt"
+    upload = UploadFile(io.BytesIO(payload), filename="script.txt")
+
+    stored = anyio.run(uploads.stream_upload_to_disk, upload, destination, None, 64)
+
+    assert stored.size == len(payload)
+    assert stored.sha256 == hashlib.sha256(payload).hexdigest()
+    assert destination.read_bytes() == payload
+    assert [p.name for p in tmp_path.iterdir()] == ["script.txt"]
+
+
+def test_stream_upload_enforces_size_limit(tmp_path):
+    destination = tmp_path / "big.pdf"
+    upload = UploadFile(io.BytesIO(b"x" * 1000), filename="big.pdf")
+
+    with pytest.raises(uploads.UploadTooLarge):
+        anyio.run(uploads.stream_upload_to_disk, upload, destination, 500, 64)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_upload_endpoint_rejects_declared_oversize(monkeypatch):
+    monkeypatch.setenv("MAX_UPLOAD_BYTES", "100")
+    client = TestClient(app)
+
+    resp = client.post("/projects/1/upload_script", files={"file": ("big.txt", b"x" * 500)})
+
+    assert resp.status_code == 413
+
+
+@pytest.fixture
+def upload_client(tmp_path, monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        db.add(Project(name="Bundle", budget=0))
+        db.commit()
+
+    def override_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.chdir(tmp_path)
+    app.dependency_overrides[main.get_db] = override_db
+    app.dependency_overrides[auth_supabase.get_current_user_from_supabase] = lambda: SimpleNamespace(id=None, is_admin=True)
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+
+def _put_range(client, upload_id, payload, start, total, **headers):
+    end = start + len(payload) - 1
+    return client.put(
+        f"/projects/1/uploads/{upload_id}",
+        content=payload,
+        headers={"Content-Range": f"bytes {start}-{end}/{total}", **headers},
+    )
+
+
+def test_resumable_upload_recovers_from_a_failed_chunk(upload_client, tmp_path):
+    payload = b"INT. ROOM - DAY\nA long script bundle.\n" * 4000
+    first, second = payload[:65536], payload[65536:]
+    created = upload_client.post("/projects/1/uploads", json={"filename": "bundle.txt", "total_size": len(payload)})
+    assert created.status_code == 201
+    upload_id = created.json()["id"]
+
+    assert _put_range(upload_client, upload_id, first, 0, len(payload)).json()["committed_offset"] == len(first)
+    # a corrupted retry of the second range is rejected and leaves the committed prefix alone
+    bad = _put_range(upload_client, upload_id, second, len(first), len(payload), **{"X-Chunk-SHA256": "0" * 64})
+    assert bad.status_code == 400
+    assert upload_client.get(f"/projects/1/uploads/{upload_id}").json()["committed_offset"] == len(first)
+    # ranges must continue from the committed offset
+    assert _put_range(upload_client, upload_id, second, 0, len(payload)).status_code == 409
+
+    good = _put_range(
+        upload_client, upload_id, second, len(first), len(payload),
+        **{"X-Chunk-SHA256": hashlib.sha256(second).hexdigest()},
+    )
+    assert good.json()["committed_offset"] == len(payload)
+    assert good.json()["chunk_count"] == 2
+
+    completed = upload_client.post(f"/projects/1/uploads/{upload_id}/complete")
+    assert completed.status_code == 200
+    assert completed.json()["filename"] == "bundle.txt"
+    assert (tmp_path / "uploads" / "bundle.txt").read_bytes() == payload
+    assert list((tmp_path / "uploads" / ".sessions").iterdir()) == []
+
+    repeated = upload_client.post(f"/projects/1/uploads/{upload_id}/complete")
+    assert repeated.status_code == 200
+    assert repeated.json()["id"] == completed.json()["id"]
+    assert _put_range(upload_client, upload_id, second, len(first), len(payload)).status_code == 409
+
+
+def test_range_written_while_the_session_is_locked_is_refused(upload_client, tmp_path):
+    payload = b"EXT. YARD - NIGHT\n" * 100
+    upload_id = upload_client.post("/projects/1/uploads", json={"filename": "yard.txt", "total_size": len(payload)}).json()["id"]
+
+    async def put_while_locked():
+        async with uploads.lock_session(upload_id):
+            return await anyio.to_thread.run_sync(_put_range, upload_client, upload_id, payload, 0, len(payload))
+
+    busy = anyio.run(put_while_locked)
+
+    assert busy.status_code == 409
+    assert busy.json()["committed_offset"] == 0
+    assert not uploads.session_part_path(upload_id).exists()
+    assert _put_range(upload_client, upload_id, payload, 0, len(payload)).json()["committed_offset"] == len(payload)
+
+
+def test_script_preview_endpoint(upload_client):
+    text = "".join(f"EXT. FIELD {n} - DAY\nWind.\n\n" for n in range(1, 21))
+    script = upload_client.post("/projects/1/upload_script", files={"file": ("field.txt", text)}).json()
+
+    preview = upload_client.get(f"/projects/1/scripts/{script['id']}/preview", params={"limit": 2})
+
+    assert preview.status_code == 200
+    body = preview.json()
+    assert [scene["index"] for scene in body["scenes"]] == [1, 2]
+    assert body["scenes"][0]["description"] == "Wind."
+    assert body["complete"] is False and body["estimated_total_scenes"] > 2
+    assert upload_client.get(f"/projects/1/scripts/{script['id']}/preview", params={"limit": 0}).status_code == 422
+    assert upload_client.get("/projects/1/scripts/999/preview").status_code == 404
+
@@ -139,12 +139,12 @@ const ScriptManager = () => {
           >
             <FaFileUpload className="upload-icon" />
             <span>Click to Upload Script</span>
-            <p className="upload-info">.txt, .pdf, .docx</p>
+            <p className="upload-info">.txt, .pdf, .docx, .fountain, .fdx</p>
           </label>
           <input
             type="file"
             id="script-upload"
-            accept=".pdf,.docx,.txt"
+            accept=".pdf,.docx,.txt,.fountain,.fdx"
             onChange={handleFileUpload}
             style={{ display: "none" }}
             disabled={isBusy || !authToken}